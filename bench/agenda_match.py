@@ -0,0 +1,91 @@
+# bench/agenda_match.py
+"""
+Benchmark : association blocs gras → Events JSON-LD de la page /agenda.
+
+Compare l'ancien _best_event_match (pour chaque bloc : normalisation de tous les events
+puis recherche de sous-chaîne mot par mot) à routes/infos_agenda.LdEventMatcher (events
+normalisés et indexés par trigrammes une fois par page). Vérifie que les deux renvoient
+les mêmes events, puis mesure à tailles d'agenda croissantes.
+
+Usage :
+    python bench/agenda_match.py [--sizes 10,50,100,300,600] [--repeat N]
+"""
+from __future__ import annotations
+import argparse, os, random, re, sys, time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from solea_api.routes.infos_agenda import LdEventMatcher, _norm  # noqa: E402
+
+def legacy_best_event_match(desc_lower: str, evs: list[dict]) -> dict | None:
+    """Version d'origine de routes/infos_agenda._best_event_match (référence)."""
+    if not evs:
+        return None
+    import unicodedata
+    def strip_acc(s):
+        return "".join(ch for ch in unicodedata.normalize("NFKD", s or "") if not unicodedata.combining(ch))
+
+    q_tokens = [t for t in re.findall(r"[a-z0-9]+", strip_acc(desc_lower.lower())) if len(t) >= 3]
+    if not q_tokens:
+        return None
+
+    best, best_score = None, 0
+    for ev in evs:
+        name = strip_acc((_norm(ev.get("name"))).lower())
+        desc = strip_acc((_norm(ev.get("description"))).lower())
+        hay = f"{name} {desc}"
+        score = sum(1 for t in q_tokens if t in hay)
+        if score > best_score:
+            best_score, best = score, ev
+    return best if best_score > 0 else None
+
+KINDS = ["Stage de bulerías", "Tablao flamenco", "Masterclass de jaleos", "Soirée sévillanes",
+         "Atelier d'immersion", "Festival Azul", "Cours d'essai", "Spectacle de fin d'année"]
+ARTISTS = ["Ana", "José", "Lucía", "Manuel", "Carmen", "Rocío", "Paco", "Inés", "Tomás"]
+WORDS = ("compas palmas jaleo guitare cante baile technique zapateado braceo soleá alegrías "
+         "tangos tientos seguiriya farruca rumba niveau débutant intermédiaire avancé").split()
+
+def synthetic_agenda(n: int, seed: int = 1) -> tuple[list[dict], list[str]]:
+    """n Events JSON-LD façon Wix et n textes de blocs gras (minuscules, comme dans la route)."""
+    rnd = random.Random(seed)
+    evs, blocks = [], []
+    for i in range(n):
+        kind, artist = rnd.choice(KINDS), rnd.choice(ARTISTS)
+        name = f"{kind} avec {artist} n°{i}"
+        desc = " ".join(rnd.choice(WORDS) for _ in range(40))
+        evs.append({"@type": "Event", "name": name, "description": desc,
+                    "startDate": f"2030-{1 + i % 12:02d}-{1 + i % 28:02d}T20:00:00+01:00"})
+        blocks.append(f"{kind.lower()} avec {artist.lower()} - {' '.join(rnd.choice(WORDS) for _ in range(12))}")
+    return evs, blocks
+
+def _time(fn, repeat: int) -> tuple[float, list]:
+    best, out = float("inf"), []
+    for _ in range(repeat):
+        t0 = time.perf_counter()
+        out = fn()
+        best = min(best, time.perf_counter() - t0)
+    return best, out
+
+def main(argv=None) -> int:
+    ap = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    ap.add_argument("--sizes", default="10,50,100,300,600")
+    ap.add_argument("--repeat", type=int, default=3)
+    args = ap.parse_args(argv)
+
+    print(f"{'events':>8}{'legacy (ms)':>14}{'index (ms)':>14}{'accélération':>15}")
+    for n in [int(x) for x in args.sizes.split(",") if x]:
+        evs, blocks = synthetic_agenda(n)
+        t_old, old = _time(lambda: [legacy_best_event_match(b, evs) for b in blocks], args.repeat)
+
+        def indexed():
+            m = LdEventMatcher(evs)   # construction comprise : une fois par page
+            return [m.best(b) for b in blocks]
+        t_new, new = _time(indexed, args.repeat)
+        if [id(e) for e in old] != [id(e) for e in new]:
+            print(f"ÉCART de résultat pour n={n}")
+            return 1
+        print(f"{n:8d}{t_old * 1000:14.2f}{t_new * 1000:14.2f}{'x%.1f' % (t_old / t_new):>15}")
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
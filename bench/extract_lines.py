@@ -0,0 +1,87 @@
+# bench/extract_lines.py
+"""
+Benchmark : extraction des lignes de texte d'une page "stages".
+
+Compare l'ancien extract_lines (get_text() sur chaque h1..h4/p/li/span/div, donc
+re-extraction du texte à chaque div ancêtre) à utils.extract_block_lines (une passe).
+
+Usage :
+    python bench/extract_lines.py [page_stages.html] [--repeat N] [--depth D] [--sections S]
+
+Sans fichier, une page synthétique façon Wix (divs imbriquées) est générée.
+Pour une copie réelle : curl -o stages.html https://www.centresolea.org/stages
+"""
+from __future__ import annotations
+import argparse, os, sys, time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from solea_api.utils import soup_from_html, normalize_text, extract_block_lines  # noqa: E402
+
+def legacy_extract_lines(soup):
+    """Version d'origine de routes/infos_stage.extract_lines (référence)."""
+    for tag in soup(["script", "style", "noscript", "iframe", "svg"]):
+        tag.decompose()
+    lines = []
+    for el in soup.find_all(["h1", "h2", "h3", "h4", "p", "li", "span", "div"]):
+        t = normalize_text(el.get_text(" ", strip=True))
+        if t:
+            lines.append(t)
+    dedup, prev = [], None
+    for t in lines:
+        if t != prev:
+            dedup.append(t)
+        prev = t
+    return dedup
+
+def synthetic_stages_page(sections: int = 40, depth: int = 14) -> str:
+    """Page façon Wix : chaque bloc de stage est enfoui sous `depth` divs."""
+    out = ["<html><head><script>var wix = {};</script></head><body>"]
+    for i in range(sections):
+        out.append("<div class='comp'>" * depth)
+        out.append(
+            f"<h2><span>STAGE DE BULERIAS n°{i}</span></h2>"
+            f"<p><span>Du {1 + i % 27} au {2 + i % 27} novembre 2030</span></p>"
+            f"<p><span>Samedi 10h - 13h</span><br><span>Dimanche 14h30 - 17h</span></p>"
+            f"<p><span>Adhérents 60 € / Non adhérents 75 €</span></p>"
+            f"<p><span>Un stage pour approfondir le compas avec une artiste invitée, "
+            f"travail de la technique, des palmas et du jaleo.</span></p>"
+        )
+        out.append("</div>" * depth)
+    out.append("</body></html>")
+    return "".join(out)
+
+def _time(fn, html: str, repeat: int) -> tuple[float, list[str]]:
+    best, lines = float("inf"), []
+    for _ in range(repeat):
+        soup = soup_from_html(html)       # parse hors mesure : même coût pour les deux
+        t0 = time.perf_counter()
+        lines = fn(soup)
+        best = min(best, time.perf_counter() - t0)
+    return best, lines
+
+def main(argv=None) -> int:
+    ap = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    ap.add_argument("html", nargs="?", help="copie locale de la page /stages")
+    ap.add_argument("--repeat", type=int, default=5)
+    ap.add_argument("--depth", type=int, default=14)
+    ap.add_argument("--sections", type=int, default=40)
+    args = ap.parse_args(argv)
+
+    if args.html:
+        with open(args.html, encoding="utf-8") as f:
+            html, label = f.read(), args.html
+    else:
+        html, label = synthetic_stages_page(args.sections, args.depth), f"synthétique ({args.sections}×depth {args.depth})"
+
+    t_old, old = _time(legacy_extract_lines, html, args.repeat)
+    t_new, new = _time(extract_block_lines, html, args.repeat)
+    print(f"page : {label} — {len(html) / 1024:.0f} Kio")
+    print(f"{'':24}{'temps (ms)':>12}{'lignes':>10}{'caractères':>14}")
+    print(f"{'legacy extract_lines':24}{t_old * 1000:12.2f}{len(old):10d}{sum(map(len, old)):14d}")
+    print(f"{'extract_block_lines':24}{t_new * 1000:12.2f}{len(new):10d}{sum(map(len, new)):14d}")
+    print(f"accélération : x{t_old / t_new:.1f}" if t_new else "")
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,58 @@
+# bench/fixtures.py
+"""
+Fixtures des pages amont (voir solea_api/replay.py) : enregistrement, liste, serveur local.
+
+Usage :
+    python bench/fixtures.py record                 # scrape toutes les routes, écrit fixtures/
+    python bench/fixtures.py list
+    python bench/fixtures.py serve --port 8765 --latency 0.3 --jitter 0.2 --error-rate 0.1
+
+Puis, sans réseau :
+    SOLEA_REPLAY=replay gunicorn wsgi:app                          # rejeu en process
+    SOLEA_UPSTREAM=http://127.0.0.1:8765 gunicorn wsgi:app         # via le serveur local
+"""
+from __future__ import annotations
+import argparse, json, os, sys, time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from solea_api import replay  # noqa: E402
+
+def main(argv=None) -> int:
+    ap = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    ap.add_argument("--dir", default=replay.FIXTURES_DIR, help="répertoire des fixtures (SOLEA_FIXTURES)")
+    sub = ap.add_subparsers(dest="cmd", required=True)
+    sub.add_parser("record", help="scrape toutes les routes et enregistre les pages")
+    sub.add_parser("list", help="liste les fixtures")
+    sp = sub.add_parser("serve", help="sert les fixtures en HTTP")
+    sp.add_argument("--host", default="127.0.0.1")
+    sp.add_argument("--port", type=int, default=8765)
+    sp.add_argument("--latency", type=float, default=0.0, help="latence fixe (s)")
+    sp.add_argument("--jitter", type=float, default=0.0, help="latence aléatoire ajoutée (s, max)")
+    sp.add_argument("--error-rate", type=float, default=0.0, help="proportion de réponses 503")
+    sp.add_argument("--seed", type=int, default=None)
+    args = ap.parse_args(argv)
+    replay.FIXTURES_DIR = args.dir
+
+    if args.cmd == "record":
+        for name in replay.record_all():
+            print(name)
+    elif args.cmd == "list":
+        names = sorted(os.listdir(args.dir)) if os.path.isdir(args.dir) else []
+        for f in names:
+            if f.endswith(".json"):
+                with open(os.path.join(args.dir, f), encoding="utf-8") as fh:
+                    print(f"{f[:-5]}  {json.load(fh)['url']}")
+    else:
+        srv = replay.serve(args.host, args.port, latency=args.latency, jitter=args.jitter,
+                           error_rate=args.error_rate, seed=args.seed)
+        print(f"fixtures {args.dir} sur http://{args.host}:{srv.server_address[1]} (Ctrl-C pour arrêter)")
+        try:
+            while True:
+                time.sleep(3600)
+        except KeyboardInterrupt:
+            srv.shutdown()
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
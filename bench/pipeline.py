@@ -0,0 +1,263 @@
+# bench/pipeline.py
+"""
+Benchmark : pipeline scrape → parse → rendu de chaque route, étape par étape.
+
+Pour chaque route (cours, agenda, stage, tablao) et chaque facteur de taille, mesure
+séparément : parse HTML, extraction des lignes, extraction regex, construction du payload,
+rendu vocal et sérialisation JSON. Temps (meilleur et médiane sur --repeat passes),
+mémoire allouée restante et pic (tracemalloc, passe séparée).
+
+Entrées : pages synthétiques façon Wix (taille × --scales), ou fixtures enregistrées
+(bench/fixtures.py record, option --fixtures) pour les vraies pages.
+
+Usage :
+    python bench/pipeline.py [--scales 1,10,100] [--routes cours,agenda] [--repeat 5]
+                             [--fixtures fixtures/] [--out resultats.json] [--compare avant.json]
+
+Le JSON écrit (--out) se compare à un run précédent avec --compare.
+"""
+from __future__ import annotations
+import argparse, json, os, platform, random, statistics, subprocess, sys, time, tracemalloc
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from solea_api.utils import (  # noqa: E402
+    Page, soup_from_html, extract_block_lines, extract_ldjson_events, sanitize_for_voice,
+    ddmmyyyy_to_spoken, remplacer_h_par_heure,
+)
+from solea_api.routes import infos_cours, infos_agenda, infos_stage, infos_tablao  # noqa: E402
+from bench.extract_lines import synthetic_stages_page  # noqa: E402
+
+# =========================
+# Pages synthétiques (taille de base ≈ site actuel, × scale)
+# =========================
+DAYS = ["Lundi", "Mardi", "Mercredi", "Jeudi", "Vendredi", "Samedi"]
+WIX_DEPTH = 8
+
+def _wix(block: str) -> str:
+    return "<div class='comp'>" * WIX_DEPTH + block + "</div>" * WIX_DEPTH
+
+def synthetic_cours(scale: int = 1) -> str:
+    out = ["<html><body>"]
+    for i in range(3 * scale):
+        out.append(_wix(
+            f"<h2>DANSE FLAMENCO ADULTES {i}</h2><p>Débutants</p><p>{DAYS[i % 6]} : 18h30 – 20h00</p>"
+            f"<p>Inter 1</p><p>{DAYS[(i + 1) % 6]} : 19h - 20h30</p>"
+            f"<h2>DANSE FLAMENCO ENFANTS et T'CAP</h2><p>Ados</p><p>Samedi : 10h - 11h30</p>"
+            f"<h2>DANSE SÉVILLANE</h2><p>Avancés</p><p>Jeudi : 20h - 21h</p>"
+        ))
+    out.append(_wix(
+        "<p>TARIFS AU TRIMESTRE</p><p>150 € | 120 €</p><p>270 € | 230 €</p><p>Adhésion annuelle : 30 €</p>"
+        "<p>Tarif réduit pour étudiants et RSA</p><p>Paiement par chèques ou espèces</p>"
+        "<table><tr><td>Adhérents 100 €</td><td>Non adhérents 130 €</td></tr></table>"
+    ))
+    out.append("</body></html>")
+    return "".join(out)
+
+def synthetic_agenda(scale: int = 1, seed: int = 1) -> str:
+    rnd = random.Random(seed)
+    kinds = ["Stage de bulerías", "Tablao flamenco", "Masterclass de jaleos", "Soirée sévillanes", "Festival Azul"]
+    evs, blocks = [], []
+    for i in range(12 * scale):
+        kind, d, m = rnd.choice(kinds), 1 + i % 28, 1 + i % 12
+        evs.append({"@type": "Event", "name": f"{kind} n°{i}", "description": f"{kind.lower()} au centre",
+                    "startDate": f"2030-{m:02d}-{d:02d}T20:00:00"})
+        blocks.append(_wix(f"<p><strong>{d} {infos_agenda.ddmmyyyy_to_spoken(f'{d}/{m}/2030').split()[1]}</strong>"
+                           f" : {kind.lower()} n°{i} avec le centre</p>"))
+    ld = json.dumps({"@context": "https://schema.org", "@graph": evs}, ensure_ascii=False)
+    return (f'<html><head><script type="application/ld+json">{ld}</script></head><body>'
+            + "".join(blocks) + "</body></html>")
+
+def synthetic_stages(scale: int = 1) -> str:
+    return synthetic_stages_page(sections=8 * scale, depth=WIX_DEPTH)
+
+def synthetic_home(n_events: int) -> str:
+    links = "".join(f'<a href="/events/tablao-flamenco-{i}">Tablao flamenco</a>' for i in range(n_events))
+    return f"<html><body>{_wix(links)}</body></html>"
+
+def synthetic_event(i: int) -> str:
+    d = 1 + i % 28
+    return ("<html><body>" + _wix(
+        f"<h1>TABLAO FLAMENCO n°{i}</h1><p>Heure et lieu</p><p>{d} sept. 2030, 20:30 – 23:00</p>"
+        "<p>Centre Soléa, 12 Rue du Flamenco, 13001 Marseille, France</p>"
+    ) + "</body></html>")
+
+def synthetic_inputs(scale: int) -> dict:
+    n = 4 * scale
+    return {
+        "cours": synthetic_cours(scale),
+        "agenda": synthetic_agenda(scale),
+        "stage": synthetic_stages(scale),
+        "tablao": (synthetic_home(n), [synthetic_event(i) for i in range(n)]),
+    }
+
+def fixture_inputs(directory: str) -> dict:
+    from solea_api import replay
+    replay.FIXTURES_DIR = directory
+    def page(path):
+        fx = replay.load_fixture(path)
+        if fx is None:
+            raise SystemExit(f"pas de fixture pour {path} dans {directory}")
+        return fx[1]
+    home = page("/")
+    links = infos_tablao._find_tablao_event_links(soup_from_html(home))
+    events = [fx[1] for fx in (replay.load_fixture(u) for u in links) if fx]
+    return {"cours": page("/horaires-et-tarifs"), "agenda": page("/agenda"),
+            "stage": page("/stages"), "tablao": (home, events)}
+
+# =========================
+# Étapes par route : (nom, préparation non mesurée, fonction mesurée)
+# =========================
+def _page(url: str, html: str) -> Page:
+    page = Page(url, html)
+    page.__dict__["soup"] = soup_from_html(html)   # soup neuve : certaines routes la modifient
+    return page
+
+def _dump(payload) -> bytes:
+    return json.dumps(payload, ensure_ascii=False, separators=(",", ":"), sort_keys=True).encode("utf-8")
+
+def stages_cours(html: str):
+    soup = soup_from_html(html)
+    lines = list(dict.fromkeys(extract_block_lines(soup)))
+    payload = infos_cours._payload_from_page(_page("cours", html))
+    return [
+        ("parse", lambda: (html,), soup_from_html),
+        ("lines", lambda: (soup,), extract_block_lines),
+        ("regex", lambda: (lines,), infos_cours.parse_structured_horaires),
+        ("payload", lambda: (_page("cours", html),), infos_cours._payload_from_page),
+        ("voice", lambda: (payload["horaires_vocal"],), lambda xs: [sanitize_for_voice(x) for x in xs]),
+        ("json", lambda: (payload,), _dump),
+    ]
+
+def stages_agenda(html: str):
+    soup = soup_from_html(html)
+    payload = infos_agenda._payload_from_page(_page("agenda", html))
+    texts = [e["texte"] for e in payload["evenements"]]
+    evs = extract_ldjson_events(html)
+    def match(texts):
+        m = infos_agenda.LdEventMatcher(evs)
+        return [m.best(t) for t in texts]
+    return [
+        ("parse", lambda: (html,), soup_from_html),
+        ("lines", lambda: (soup,), extract_block_lines),
+        ("regex", lambda: (html,), extract_ldjson_events),
+        ("match", lambda: (texts,), match),
+        ("payload", lambda: (_page("agenda", html),), infos_agenda._payload_from_page),
+        ("voice", lambda: (payload["evenements"],), lambda es: [ddmmyyyy_to_spoken(e["date_start"]) for e in es]),
+        ("json", lambda: (payload,), _dump),
+    ]
+
+def stages_stage(html: str):
+    soup = soup_from_html(html)
+    payload = infos_stage._payload_from_page(_page("stage", html))
+    def voice(items):
+        return [(infos_stage.tts_jota(it.get("titre", "")), [infos_stage.heure_vocale(h) for h in it.get("heures", [])])
+                for it in items]
+    return [
+        ("parse", lambda: (html,), soup_from_html),
+        ("lines", lambda: (soup,), infos_stage.extract_lines),
+        ("payload", lambda: (_page("stage", html),), infos_stage._payload_from_page),
+        ("voice", lambda: (payload["items"],), voice),
+        ("json", lambda: (payload,), _dump),
+    ]
+
+def stages_tablao(inputs):
+    home, events = inputs
+    parsed = [infos_tablao._parse_event_doc(_page("event", h)) for h in events]
+    def voice(rows):
+        return [sanitize_for_voice(f"Tablao le {ddmmyyyy_to_spoken(d[0]) if d else ''} à "
+                                   f"{remplacer_h_par_heure(hr)} au {lieu} : {titre}")
+                for titre, d, hr, lieu in rows]
+    return [
+        ("parse", lambda: (events,), lambda hs: [soup_from_html(h) for h in hs]),
+        ("links", lambda: (_page("home", home),), infos_tablao._event_links_from_page),
+        ("payload", lambda: ([_page("event", h) for h in events],),
+         lambda ps: [infos_tablao._parse_event_doc(p) for p in ps]),
+        ("voice", lambda: (parsed,), voice),
+        ("json", lambda: (parsed,), _dump),
+    ]
+
+ROUTES = {"cours": stages_cours, "agenda": stages_agenda, "stage": stages_stage, "tablao": stages_tablao}
+
+# =========================
+# Mesure
+# =========================
+def measure(setup, fn, repeat: int) -> dict:
+    times = []
+    for _ in range(repeat):
+        args = setup()
+        t0 = time.perf_counter()
+        fn(*args)
+        times.append(time.perf_counter() - t0)
+    args = setup()
+    tracemalloc.start()
+    before = tracemalloc.get_traced_memory()[0]
+    result = fn(*args)
+    current, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    del result
+    return {"ms_best": min(times) * 1000, "ms_median": statistics.median(times) * 1000,
+            "kib_retained": (current - before) / 1024, "kib_peak": (peak - before) / 1024}
+
+def _input_size(inputs) -> int:
+    if isinstance(inputs, tuple):
+        return len(inputs[0]) + sum(len(h) for h in inputs[1])
+    return len(inputs)
+
+def _git_rev() -> str:
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True,
+                              cwd=os.path.dirname(os.path.abspath(__file__))).stdout.strip()
+    except Exception:
+        return ""
+
+def run(routes, scales, repeat, fixtures=None) -> dict:
+    results = []
+    for scale in ([None] if fixtures else scales):
+        inputs = fixture_inputs(fixtures) if fixtures else synthetic_inputs(scale)
+        for route in routes:
+            kib = _input_size(inputs[route]) / 1024
+            for stage, setup, fn in ROUTES[route](inputs[route]):
+                r = measure(setup, fn, repeat)
+                results.append({"route": route, "scale": scale or "fixtures", "stage": stage,
+                                "input_kib": round(kib, 1), **{k: round(v, 3) for k, v in r.items()}})
+                print(f"{route:8}{str(scale or 'fx'):>6}{stage:>10}{kib:10.0f}{r['ms_best']:12.2f}"
+                      f"{r['ms_median']:12.2f}{r['kib_peak']:12.0f}{r['kib_retained']:12.0f}")
+    return {"meta": {"python": platform.python_version(), "platform": platform.platform(),
+                     "git": _git_rev(), "timestamp": time.time(), "repeat": repeat,
+                     "input": fixtures or "synthetic"},
+            "results": results}
+
+def compare(new: dict, old_path: str) -> None:
+    with open(old_path, encoding="utf-8") as f:
+        old = {(r["route"], str(r["scale"]), r["stage"]): r for r in json.load(f)["results"]}
+    print(f"\ncomparaison avec {old_path} (ms_best, ratio nouveau/ancien)")
+    for r in new["results"]:
+        o = old.get((r["route"], str(r["scale"]), r["stage"]))
+        if o and o["ms_best"]:
+            print(f"{r['route']:8}{str(r['scale']):>6}{r['stage']:>10}{o['ms_best']:12.2f}{r['ms_best']:12.2f}"
+                  f"{r['ms_best'] / o['ms_best']:9.2f}x")
+
+def main(argv=None) -> int:
+    ap = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    ap.add_argument("--routes", default=",".join(ROUTES))
+    ap.add_argument("--scales", default="1,10,100")
+    ap.add_argument("--repeat", type=int, default=5)
+    ap.add_argument("--fixtures", help="répertoire de fixtures (au lieu des pages synthétiques)")
+    ap.add_argument("--out", help="fichier JSON de résultats")
+    ap.add_argument("--compare", help="résultats JSON d'un run précédent")
+    args = ap.parse_args(argv)
+
+    routes = [r for r in args.routes.split(",") if r in ROUTES]
+    scales = [int(s) for s in args.scales.split(",") if s]
+    print(f"{'route':8}{'×':>6}{'étape':>10}{'Kio':>10}{'ms best':>12}{'ms méd.':>12}{'Kio pic':>12}{'Kio gardés':>12}")
+    res = run(routes, scales, args.repeat, args.fixtures)
+    if args.out:
+        with open(args.out, "w", encoding="utf-8") as f:
+            json.dump(res, f, ensure_ascii=False, indent=1)
+    if args.compare:
+        compare(res, args.compare)
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -1,16 +1,6 @@
 # solea_api/__init__.py
-from flask import Flask, Response
-import requests
-from bs4 import BeautifulSoup
-
-# si tu as utils.normalize_text, on l'importe, sinon on fait un fallback local
-try:
-    from .utils import normalize_text
-except Exception:
-    def normalize_text(s: str) -> str:
-        return " ".join((s or "").replace("\r", "\n").replace("\t", " ").split())
-
-SRC = "https://www.centresolea.org/stages"
+import time
+from flask import Flask, Response, jsonify, request, g
 
 def create_app():
     app = Flask(__name__)
@@ -29,8 +19,7 @@ def create_app():
         pass
 
     try:
-        # tu peux garder ton blueprint infos_stage si tu veux,
-        # mais la route /infos-stage ci-dessous suffira de toute façon
+        # JSON par défaut, texte brut si le client demande text/plain
         from .routes.infos_stage import bp as infos_stage_bp
         app.register_blueprint(infos_stage_bp)
     except Exception:
@@ -42,6 +31,24 @@ def create_app():
     except Exception:
         pass
 
+    try:
+        # agrégat des quatre sections (mêmes constructeurs et même cache)
+        from .routes.infos_all import bp as infos_all_bp
+        app.register_blueprint(infos_all_bp)
+    except Exception:
+        pass
+
+    try:
+        # store unifié agenda + stages + tablaos
+        from .routes.infos_events import bp as infos_events_bp
+        app.register_blueprint(infos_events_bp)
+    except Exception:
+        pass
+
+    # derniers payloads valides depuis le disque : pas de démarrage à froid
+    from .utils import load_snapshot
+    load_snapshot()
+
     # 2) éviter les 404 liés au slash final
     app.url_map.strict_slashes = False
 
@@ -49,21 +56,8 @@ def create_app():
     def home():
         return "API Centre Soléa — OK"
 
-    # 3) ✅ Route TEXTE pour le voicebot (direct, sans blueprint)
-    @app.get("/infos-stage")
-    def infos_stage_plain():
-        r = requests.get(SRC, timeout=10)
-        r.raise_for_status()
-        soup = BeautifulSoup(r.text, "lxml")
-        for tag in soup(["script", "style", "noscript", "iframe", "svg"]):
-            tag.decompose()
-        lines = []
-        for el in soup.find_all(["h1", "h2", "h3", "h4", "p", "li"]):
-            t = el.get_text(" ", strip=True)
-            if t:
-                lines.append(t)
-        text = normalize_text("\n".join(lines))
-        return Response(text, mimetype="text/plain; charset=utf-8")
+    # 3) ✅ Texte pour le voicebot : /infos-stage avec "Accept: text/plain" (même vue que le JSON,
+    #    voir routes/infos_stage.py ; une seconde règle sur la même URL serait masquée)
 
     # 4) ❌ On écrase l’ancienne URL pour la rendre indisponible
     @app.get("/infos-stage-solea")
@@ -78,7 +72,34 @@ def create_app():
             body.append(f"{','.join(rule.methods)}  {rule.rule}  -> {rule.endpoint}")
         return Response("\n".join(body), mimetype="text/plain; charset=utf-8")
 
+    # 6) 📈 Métriques (format texte Prometheus) : étapes, amont, cache, requêtes
+    from . import metrics
+
+    @app.before_request
+    def _metrics_start():
+        g.metrics_t0 = time.perf_counter()
+
+    @app.after_request
+    def _metrics_observe(resp):
+        t0 = g.pop("metrics_t0", None)
+        if t0 is not None:
+            metrics.HTTP_SECONDS.observe(time.perf_counter() - t0, request.endpoint or "404", str(resp.status_code))
+        return resp
+
+    @app.get("/metrics")
+    def metrics_route():
+        return Response(metrics.render(metrics.runtime_lines()), content_type="text/plain; version=0.0.4; charset=utf-8")
+
+    # 7) 🔎 Debug : efficacité du mémo de parsing (empreinte du HTML)
+    @app.get("/debug-parse-memo")
+    def debug_parse_memo():
+        from .utils import parse_memo_stats
+        return jsonify(parse_memo_stats())
+
+    # 8) Profilage à la demande (SOLEA_PROFILE_TOKEN ; rien n'est installé sans jeton)
+    from .profiling import install as install_profiling
+    install_profiling(app)
+
     return app
 
-# pour gunicorn (wsgi:app)
-app = create_app()
+# l'app WSGI est créée par wsgi.py (gunicorn wsgi:app) ; l'entrée ASGI est main.py
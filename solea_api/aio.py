@@ -0,0 +1,204 @@
+# solea_api/aio.py
+"""
+Cœur asynchrone pour le point d'entrée ASGI (main.py).
+
+Mêmes pages, mêmes parseurs, même cache que le chemin Flask : seule l'attente réseau
+change. Les GET amont passent par un client httpx.AsyncClient (pool keep-alive partagé),
+le parsing (CPU, BeautifulSoup) tourne dans un thread pour ne pas bloquer la boucle, et
+les payloads sont lus / écrits dans utils._CACHE avec les mêmes clés, TTL et métadonnées.
+
+Un worker ASGI garde ainsi des centaines de requêtes en attente d'un scrape à froid :
+elles attendent toutes la même tâche (single-flight par clé) au lieu d'occuper chacune
+un worker.
+"""
+from __future__ import annotations
+import asyncio, os, time
+
+try:
+    import httpx
+except Exception:
+    httpx = None
+
+from . import replay
+from .metrics import UPSTREAM_SECONDS, UPSTREAM_RESPONSES, UPSTREAM_ERRORS, FETCH_FALLBACK, STAGE_SECONDS, CACHE_REQUESTS
+from .utils import (
+    HEADERS_A, HEADERS_B, REQ_TIMEOUT, HTTP_RETRIES, REVALIDATE, _CACHE,
+    Page, build_memoized, visible_text_length, revalidation_state, remember_revalidated,
+    reusable_result, revalidated_html,
+    cache_get, cache_set, cache_is_fresh, cache_meta, _with_validators, _remember_validators,
+)
+
+ASYNC_MAX_CONNECTIONS = int(os.environ.get("SOLEA_ASYNC_MAX_CONNECTIONS", "32"))
+RETRY_STATUSES = (500, 502, 503, 504)
+RETRY_BACKOFF = 0.3
+
+# =========================
+# Client HTTP asynchrone
+# =========================
+_CLIENT: dict = {"client": None}
+
+def http_client():
+    """Client partagé, créé à la demande dans la boucle courante (fermé par aclose_client)."""
+    if httpx is None:
+        raise RuntimeError("httpx est requis pour le point d'entrée ASGI (pip install httpx)")
+    client = _CLIENT["client"]
+    if client is None or client.is_closed:
+        client = _CLIENT["client"] = httpx.AsyncClient(
+            follow_redirects=True,
+            limits=httpx.Limits(max_connections=ASYNC_MAX_CONNECTIONS,
+                                max_keepalive_connections=ASYNC_MAX_CONNECTIONS),
+            transport=httpx.AsyncHTTPTransport(retries=HTTP_RETRIES),   # erreurs de connexion
+        )
+    return client
+
+async def aclose_client() -> None:
+    client, _CLIENT["client"] = _CLIENT["client"], None
+    if client is not None:
+        await client.aclose()
+
+def _timeout(timeout):
+    connect, read = timeout if isinstance(timeout, tuple) else (timeout, timeout)
+    return httpx.Timeout(read, connect=connect)
+
+async def http_get_async(url: str, headers: dict | None = None, timeout=REQ_TIMEOUT):
+    """Pendant asynchrone de utils.http_get (mêmes métriques, même rejeu / enregistrement)."""
+    variant = "B" if headers and headers.get("User-Agent") == HEADERS_B["User-Agent"] else "A"
+    t0 = time.perf_counter()
+    try:
+        if replay.REPLAY_MODE == "replay":
+            r = replay.replay_response(url, headers)
+        else:
+            r = await _get_with_retries(replay.upstream_url(url), headers, timeout)
+    except Exception as e:
+        UPSTREAM_ERRORS.inc(type(e).__name__)
+        raise
+    finally:
+        UPSTREAM_SECONDS.observe(time.perf_counter() - t0, variant)
+    UPSTREAM_RESPONSES.inc(str(r.status_code))
+    if replay.REPLAY_MODE == "record":
+        replay.record(url, r)
+    return r
+
+async def _get_with_retries(url: str, headers: dict | None, timeout):
+    """Relances sur 5xx et erreurs de lecture, comme le Retry de la session requests."""
+    for attempt in range(HTTP_RETRIES + 1):
+        last = attempt == HTTP_RETRIES
+        try:
+            r = await http_client().get(url, headers=headers, timeout=_timeout(timeout))
+        except httpx.TransportError:
+            if last:
+                raise
+        else:
+            if r.status_code not in RETRY_STATUSES or last:
+                return r
+        await asyncio.sleep(RETRY_BACKOFF * (2 ** attempt))
+
+# =========================
+# Téléchargement + parsing
+# =========================
+async def fetch_html_async(url: str, validators: dict | None = None) -> str | None:
+    with STAGE_SECONDS.time("fetch"):
+        return await _fetch_html_async(url, validators)
+
+async def _fetch_html_async(url: str, validators: dict | None = None) -> str | None:
+    """Même logique que utils._fetch_html (HEADERS_A, puis HEADERS_B si page maigre ou erreur)."""
+    retry_timeout = (REQ_TIMEOUT[0], max(REQ_TIMEOUT[1], 14))
+    try:
+        r = await http_get_async(url, headers=_with_validators(HEADERS_A, validators), timeout=REQ_TIMEOUT)
+        if r.status_code == 304 and validators:
+            return None
+        r.raise_for_status()
+        txt = r.text
+        if visible_text_length(txt) < 200:
+            FETCH_FALLBACK.inc("thin")
+            r2 = await http_get_async(url, headers=HEADERS_B, timeout=retry_timeout)
+            r2.raise_for_status()
+            _remember_validators(r2, validators)
+            return r2.text
+        _remember_validators(r, validators)
+        return txt
+    except Exception:
+        FETCH_FALLBACK.inc("error")
+        r = await http_get_async(url, headers=HEADERS_B, timeout=retry_timeout)
+        r.raise_for_status()
+        _remember_validators(r, validators)
+        return r.text
+
+async def fetch_and_build_async(url: str, build, conditional: bool | None = None):
+    """
+    Pendant asynchrone de utils.fetch_and_build : mêmes validateurs, même mémo de parsing ;
+    build(Page) est exécuté dans un thread.
+    """
+    if conditional is None:
+        conditional = REVALIDATE
+    if not conditional:
+        html = await fetch_html_async(url)
+        return await asyncio.to_thread(build_memoized, Page(url, html), build)
+
+    prev, validators = revalidation_state(url, build)
+    html = await fetch_html_async(url, validators)
+    if html is None:
+        if prev and reusable_result(prev):
+            return prev["result"]
+        html = revalidated_html(prev) if prev else await fetch_html_async(url)
+
+    result = await asyncio.to_thread(build_memoized, Page(url, html), build)
+    remember_revalidated(url, build, validators, result, html)
+    return result
+
+# =========================
+# Cache (mêmes entrées que utils.cached_payload)
+# =========================
+# clé -> tâche de construction en cours : les requêtes concurrentes l'attendent toutes
+_FLIGHTS: dict[str, asyncio.Task] = {}
+# clé -> rafraîchissement en fond (référence forte : une tâche non référencée peut être collectée)
+_REFRESHING: dict[str, asyncio.Task] = {}
+
+def _build_task(key: str, build, ttl_seconds: int, hard_ttl_seconds: int | None) -> asyncio.Task:
+    task = _FLIGHTS.get(key)
+    if task is None:
+        async def run():
+            data = await build()
+            cache_set(key, data, ttl_seconds, hard_ttl_seconds)
+            return data
+        task = _FLIGHTS[key] = asyncio.ensure_future(run())
+        task.add_done_callback(lambda _t: _FLIGHTS.pop(key, None))
+    return task
+
+def _revalidate_in_background(key: str, build, ttl_seconds: int, hard_ttl_seconds: int | None) -> bool:
+    if key in _REFRESHING:
+        return False
+    task = _REFRESHING[key] = _build_task(key, build, ttl_seconds, hard_ttl_seconds)
+
+    def done(t: asyncio.Task) -> None:
+        _REFRESHING.pop(key, None)
+        if not t.cancelled():
+            t.exception()   # on garde l'entrée périmée, le prochain appel retentera
+    task.add_done_callback(done)
+    return True
+
+async def cached_payload_async(key: str, build, ttl_seconds: int = 60, hard_ttl_seconds: int | None = None):
+    """
+    Pendant asynchrone de utils.cached_payload ; `build` est une coroutine (sans argument).
+    Renvoie (payload, meta) : frais → servi ; périmé → servi et rafraîchi en fond ;
+    sinon construit une fois pour tous les appels concurrents, repli sur la dernière valeur.
+    """
+    name = key.split("|", 1)[0]
+    entry = cache_get(key, allow_stale=True)
+    if entry:
+        if cache_is_fresh(entry):
+            CACHE_REQUESTS.inc(name, "hit")
+            return entry["data"], cache_meta(True, entry)
+        CACHE_REQUESTS.inc(name, "stale")
+        _revalidate_in_background(key, build, ttl_seconds, hard_ttl_seconds)
+        return entry["data"], cache_meta(False, entry)
+    CACHE_REQUESTS.inc(name, "miss")
+    prev = _CACHE.get(key)
+    try:
+        # shield : un client qui abandonne (ou une échéance /infos-all) n'annule pas la construction partagée
+        data = await asyncio.shield(_build_task(key, build, ttl_seconds, hard_ttl_seconds))
+    except Exception:
+        if prev:
+            return prev["data"], cache_meta(False, prev)
+        raise
+    return data, cache_meta(True)
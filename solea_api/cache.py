@@ -0,0 +1,226 @@
+# solea_api/cache.py
+"""
+Stockage du cache applicatif :
+  - MemoryCache : LRU borné (nombre d'entrées + budget mémoire), thread-safe
+    (workers gthread), avec balayage des entrées expirées ;
+  - SQLiteCache : même interface, fichier SQLite (WAL) partagé par les workers.
+
+Une entrée est un dict {"data", "ts", "ttl", "hard_ttl"} (voir utils.cache_set).
+"""
+from __future__ import annotations
+import json, os, sqlite3, sys, time, threading
+from collections import OrderedDict
+from typing import Any
+
+def entry_size(data: Any) -> int:
+    """Taille approximative (octets) d'un payload : sa forme JSON UTF-8."""
+    try:
+        return len(json.dumps(data, ensure_ascii=False, separators=(",", ":")).encode("utf-8"))
+    except Exception:
+        return sys.getsizeof(data)
+
+def is_expired(entry: dict, now: float | None = None) -> bool:
+    """Au-delà du TTL dur : l'entrée ne sera plus servie."""
+    now = time.time() if now is None else now
+    return (now - entry["ts"]) > entry.get("hard_ttl", entry["ttl"])
+
+class MemoryCache:
+    def __init__(self, max_entries: int = 256, max_bytes: int = 32 * 1024 * 1024,
+                 sweep_interval: float = 30.0):
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.sweep_interval = sweep_interval
+        self._data: OrderedDict[str, dict] = OrderedDict()
+        self._sizes: dict[str, int] = {}
+        self._bytes = 0
+        self._last_sweep = time.time()
+        self._lock = threading.RLock()
+        self.evictions = 0
+
+    def get(self, key: str) -> dict | None:
+        with self._lock:
+            entry = self._data.get(key)
+            if entry is not None:
+                self._data.move_to_end(key)
+            return entry
+
+    def set(self, key: str, entry: dict, size: int | None = None) -> None:
+        size = entry_size(entry.get("data")) if size is None else size
+        with self._lock:
+            self._remove(key)
+            self._data[key] = entry
+            self._sizes[key] = size
+            self._bytes += size
+            self._maybe_sweep()
+            # LRU : on évince les plus anciennes, jamais celle qu'on vient d'écrire
+            while len(self._data) > 1 and (len(self._data) > self.max_entries or self._bytes > self.max_bytes):
+                oldest = next(iter(self._data))
+                if oldest == key:
+                    break
+                self._remove(oldest)
+                self.evictions += 1
+
+    def pop(self, key: str) -> dict | None:
+        with self._lock:
+            entry = self._data.get(key)
+            self._remove(key)
+            return entry
+
+    def sweep(self, now: float | None = None) -> int:
+        """Supprime les entrées au-delà de leur TTL dur ; renvoie le nombre supprimé."""
+        now = time.time() if now is None else now
+        with self._lock:
+            dead = [k for k, e in self._data.items() if is_expired(e, now)]
+            for k in dead:
+                self._remove(k)
+            self._last_sweep = now
+            return len(dead)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._data.clear()
+            self._sizes.clear()
+            self._bytes = 0
+
+    def keys(self) -> list[str]:
+        with self._lock:
+            return list(self._data)
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {"entries": len(self._data), "bytes": self._bytes,
+                    "max_entries": self.max_entries, "max_bytes": self.max_bytes,
+                    "evictions": self.evictions}
+
+    def __len__(self) -> int:
+        return len(self._data)
+
+    def __contains__(self, key: str) -> bool:
+        return key in self._data
+
+    # --- interne (appelé sous verrou) ---
+    def _remove(self, key: str) -> None:
+        if key in self._data:
+            del self._data[key]
+            self._bytes -= self._sizes.pop(key, 0)
+
+    def _maybe_sweep(self) -> None:
+        now = time.time()
+        if now - self._last_sweep >= self.sweep_interval:
+            self.sweep(now)
+
+class SQLiteCache:
+    """
+    Cache partagé entre les workers gunicorn d'une même machine : un fichier SQLite
+    en mode WAL (lectures concurrentes, un écrivain à la fois), sans service externe.
+
+    Même interface que MemoryCache. L'éviction se fait par ancienneté d'écriture (ts)
+    pour ne pas transformer chaque lecture en écriture. Les payloads décodés sont
+    mémorisés par process tant que l'entrée (clé, ts) ne change pas, dans un MemoryCache
+    aux mêmes bornes ; une ligne disparue (évincée par un autre worker) sort du mémo à
+    la lecture suivante.
+    """
+    def __init__(self, path: str, max_entries: int = 256, max_bytes: int = 32 * 1024 * 1024,
+                 sweep_interval: float = 30.0):
+        self.path = path
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.sweep_interval = sweep_interval
+        self._local = threading.local()
+        self._decoded = MemoryCache(max_entries, max_bytes, sweep_interval)
+        self._last_sweep = time.time()
+        self.evictions = 0
+
+    def _conn(self):
+        conn = getattr(self._local, "conn", None)
+        if conn is None or getattr(self._local, "pid", None) != os.getpid():
+            conn = sqlite3.connect(self.path, timeout=5.0, isolation_level=None)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS cache ("
+                " key TEXT PRIMARY KEY, data TEXT NOT NULL, ts REAL NOT NULL,"
+                " ttl REAL NOT NULL, hard_ttl REAL NOT NULL, size INTEGER NOT NULL)"
+            )
+            self._local.conn, self._local.pid = conn, os.getpid()
+        return conn
+
+    def get(self, key: str) -> dict | None:
+        row = self._conn().execute(
+            "SELECT data, ts, ttl, hard_ttl FROM cache WHERE key = ?", (key,)
+        ).fetchone()
+        if row is None:
+            self._decoded.pop(key)
+            return None
+        raw, ts, ttl, hard_ttl = row
+        memo = self._decoded.get(key)
+        if memo is not None and memo["ts"] == ts:
+            return dict(memo)
+        entry = {"data": json.loads(raw), "ts": ts, "ttl": ttl, "hard_ttl": hard_ttl}
+        self._decoded.set(key, entry, len(raw.encode("utf-8")))
+        return dict(entry)
+
+    def set(self, key: str, entry: dict) -> None:
+        raw = json.dumps(entry.get("data"), ensure_ascii=False, separators=(",", ":"))
+        size = len(raw.encode("utf-8"))
+        hard_ttl = entry.get("hard_ttl", entry["ttl"])
+        conn = self._conn()
+        conn.execute(
+            "INSERT OR REPLACE INTO cache (key, data, ts, ttl, hard_ttl, size) VALUES (?, ?, ?, ?, ?, ?)",
+            (key, raw, entry["ts"], entry["ttl"], hard_ttl, size),
+        )
+        self._decoded.set(key, {"data": entry.get("data"), "ts": entry["ts"], "ttl": entry["ttl"],
+                                "hard_ttl": hard_ttl}, size)
+        if time.time() - self._last_sweep >= self.sweep_interval:
+            self.sweep()
+        self._evict(keep=key)
+
+    def pop(self, key: str) -> dict | None:
+        entry = self.get(key)
+        self._conn().execute("DELETE FROM cache WHERE key = ?", (key,))
+        self._decoded.pop(key)
+        return entry
+
+    def sweep(self, now: float | None = None) -> int:
+        now = time.time() if now is None else now
+        cur = self._conn().execute("DELETE FROM cache WHERE ? - ts > hard_ttl", (now,))
+        self._decoded.sweep(now)
+        self._last_sweep = now
+        return cur.rowcount
+
+    def clear(self) -> None:
+        self._conn().execute("DELETE FROM cache")
+        self._decoded.clear()
+
+    def keys(self) -> list[str]:
+        return [r[0] for r in self._conn().execute("SELECT key FROM cache ORDER BY ts")]
+
+    def stats(self) -> dict:
+        n, total = self._conn().execute("SELECT COUNT(*), COALESCE(SUM(size), 0) FROM cache").fetchone()
+        return {"entries": n, "bytes": total, "max_entries": self.max_entries,
+                "max_bytes": self.max_bytes, "evictions": self.evictions, "path": self.path}
+
+    def __len__(self) -> int:
+        return self._conn().execute("SELECT COUNT(*) FROM cache").fetchone()[0]
+
+    def __contains__(self, key: str) -> bool:
+        return self._conn().execute("SELECT 1 FROM cache WHERE key = ?", (key,)).fetchone() is not None
+
+    def _evict(self, keep: str) -> None:
+        conn = self._conn()
+        n, total = conn.execute("SELECT COUNT(*), COALESCE(SUM(size), 0) FROM cache").fetchone()
+        if n <= self.max_entries and total <= self.max_bytes:
+            return
+        for key, size in conn.execute("SELECT key, size FROM cache WHERE key != ? ORDER BY ts", (keep,)).fetchall():
+            if n <= self.max_entries and total <= self.max_bytes:
+                break
+            conn.execute("DELETE FROM cache WHERE key = ?", (key,))
+            self._decoded.pop(key)
+            n, total = n - 1, total - size
+            self.evictions += 1
+
+def make_cache(backend: str, path: str, **kw):
+    """Fabrique du backend : "memory" (par process, défaut) ou "sqlite" (partagé entre workers)."""
+    if backend == "sqlite":
+        return SQLiteCache(path, **kw)
+    return MemoryCache(**kw)
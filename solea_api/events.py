@@ -0,0 +1,242 @@
+# solea_api/events.py
+"""
+Événements : index de requête et store unifié.
+
+Index d'événements (agenda, tablaos, /events) pour les requêtes ?from= &to= &type= &limit= &next=.
+
+L'index est construit une fois par payload en cache (donc une fois par rafraîchissement) :
+un tableau trié par date de début parcouru par bisect, plus un sous-index par type
+(utils.classify_type). Une requête coûte O(log n + k) : ni re-parcours ni re-tri du payload.
+
+Les événements sur plusieurs jours (date_start → date_end) sont retrouvés par un
+décalage de la borne basse de la plus longue durée connue (max_span), puis filtrés
+sur leur date de fin.
+
+Store unifié : les payloads agenda, stages et tablaos (déjà en cache, un seul scrape par
+source) sont traduits en événements normalisés puis dédoublonnés sur (jour, titre proche).
+"""
+from __future__ import annotations
+import re, threading, unicodedata
+from bisect import bisect_left, bisect_right
+from collections import OrderedDict
+from datetime import date, datetime
+
+from .utils import classify_type, CACHE_MAX_ENTRIES
+
+QUERY_PARAMS = ("from", "to", "type", "limit", "next")
+
+def parse_day(s: str) -> int | None:
+    """'dd/mm/yyyy' ou 'yyyy-mm-dd' → ordinal du jour (None si vide ou invalide)."""
+    s = (s or "").strip()
+    for fmt in ("%d/%m/%Y", "%Y-%m-%d"):
+        try:
+            return datetime.strptime(s, fmt).date().toordinal()
+        except ValueError:
+            continue
+    return None
+
+class _Run:
+    """Événements datés triés par début : clés (début), fins, positions dans la liste d'origine."""
+    __slots__ = ("starts", "ends", "positions", "max_span")
+
+    def __init__(self, rows: list[tuple[int, int, int]]):
+        rows.sort()
+        self.starts = [r[0] for r in rows]
+        self.ends = [r[1] for r in rows]
+        self.positions = [r[2] for r in rows]
+        self.max_span = max((e - s for s, e, _ in rows), default=0)
+
+    def select(self, lo: int | None, hi: int | None, limit: int | None) -> list[int]:
+        i = bisect_left(self.starts, lo - self.max_span) if lo is not None else 0
+        j = bisect_right(self.starts, hi) if hi is not None else len(self.starts)
+        out = []
+        for k in range(i, j):
+            if lo is not None and self.ends[k] < lo:
+                continue
+            out.append(self.positions[k])
+            if limit is not None and len(out) >= limit:
+                break
+        return out
+
+class EventIndex:
+    def __init__(self, items: list[dict], start_of, end_of=None, type_of=None):
+        end_of = end_of or start_of
+        type_of = type_of or (lambda e: classify_type(e.get("titre"), e.get("texte")))
+        rows, by_type, self.undated = [], {}, []
+        self.types: list[str] = []
+        for pos, e in enumerate(items):
+            t = type_of(e)
+            if t not in by_type:
+                by_type[t] = []
+                self.types.append(t)
+            s = parse_day(start_of(e))
+            if s is None:
+                self.undated.append((pos, t))
+                continue
+            end = parse_day(end_of(e))
+            row = (s, max(end if end is not None else s, s), pos)
+            rows.append(row)
+            by_type[t].append(row)
+        self.all = _Run(rows)
+        self.buckets = {t: _Run(r) for t, r in by_type.items()}
+
+    def query(self, lo: int | None = None, hi: int | None = None,
+              type_: str | None = None, limit: int | None = None) -> list[int]:
+        """Positions (dans la liste d'origine) des événements qui recouvrent [lo, hi], par date."""
+        run = self.all if not type_ else self.buckets.get(type_)
+        if run is None:
+            return []
+        out = run.select(lo, hi, limit)
+        if lo is None and hi is None and (limit is None or len(out) < limit):
+            # sans borne de date, les événements non datés suivent (ordre d'origine)
+            extra = [p for p, t in self.undated if not type_ or t == type_]
+            out += extra[:None if limit is None else limit - len(out)]
+        return out
+
+def parse_query(args) -> dict | None:
+    """Paramètres de requête normalisés (None si aucun) ; ValueError si un paramètre est invalide."""
+    if not any(args.get(p) not in (None, "") for p in QUERY_PARAMS):
+        return None
+    q = {"from": None, "to": None, "type": (args.get("type") or "").strip().lower() or None, "limit": None}
+    for p in ("from", "to"):
+        if args.get(p):
+            q[p] = parse_day(args[p])
+            if q[p] is None:
+                raise ValueError(f"paramètre '{p}' invalide (attendu jj/mm/aaaa ou aaaa-mm-jj)")
+    for p in ("limit", "next"):
+        if args.get(p):
+            try:
+                n = int(args[p])
+            except ValueError:
+                raise ValueError(f"paramètre '{p}' invalide (entier attendu)")
+            if n < 1:
+                raise ValueError(f"paramètre '{p}' invalide (entier >= 1 attendu)")
+            q["limit"] = n if q["limit"] is None else min(q["limit"], n)
+    if args.get("next"):
+        # les N prochains : à partir d'aujourd'hui
+        today = date.today().toordinal()
+        q["from"] = today if q["from"] is None else max(q["from"], today)
+    return q
+
+# clé de cache -> (payload source, index)
+_INDEXES: OrderedDict[str, tuple[dict, EventIndex]] = OrderedDict()
+# (clé de cache, requête) -> (payload source, vue filtrée)
+_VIEWS: OrderedDict[tuple, tuple[dict, dict]] = OrderedDict()
+_LOCK = threading.Lock()
+
+def _memo_get(memo: OrderedDict, mkey, payload: dict):
+    with _LOCK:
+        hit = memo.get(mkey)
+        if hit is not None and hit[0] is payload:
+            memo.move_to_end(mkey)
+            return hit[1]
+    return None
+
+def _memo_put(memo: OrderedDict, mkey, payload: dict, value) -> None:
+    with _LOCK:
+        memo[mkey] = (payload, value)
+        memo.move_to_end(mkey)
+        while len(memo) > CACHE_MAX_ENTRIES:
+            memo.popitem(last=False)
+
+def index_for(key: str, payload: dict, field: str, start_of, end_of=None, type_of=None) -> EventIndex:
+    """Index de payload[field], construit une seule fois tant que le payload en cache ne change pas."""
+    idx = _memo_get(_INDEXES, key, payload)
+    if idx is None:
+        idx = EventIndex(payload.get(field) or [], start_of, end_of, type_of)
+        _memo_put(_INDEXES, key, payload, idx)
+    return idx
+
+def filtered_payload(key: str, payload: dict, query: dict, field: str, start_of, end_of=None,
+                     type_of=None, parallel: tuple[str, ...] = ()) -> tuple[str, dict]:
+    """
+    (clé, payload) restreint aux événements de `query` ; `parallel` : listes alignées sur
+    payload[field] (ex. versions vocales) filtrées de la même façon. La vue est mémorisée
+    par requête, et la clé renvoyée la distingue pour json_response.
+    """
+    qkey = tuple(sorted(query.items()))
+    if query.get("from") is not None:
+        qkey += (("today", date.today().toordinal()),)   # ?next= dépend du jour
+    view = _memo_get(_VIEWS, (key, qkey), payload)
+    if view is None:
+        idx = index_for(key, payload, field, start_of, end_of, type_of)
+        positions = idx.query(query["from"], query["to"], query["type"], query["limit"])
+        view = {**payload}
+        items = payload.get(field) or []
+        view[field] = [items[p] for p in positions]
+        for name in parallel:
+            seq = payload.get(name) or []
+            view[name] = [seq[p] for p in positions if p < len(seq)]
+        if "count" in payload:
+            view["count"] = len(positions)
+        view["types"] = idx.types
+        _memo_put(_VIEWS, (key, qkey), payload, view)
+    return f"{key}?{qkey}", view
+
+# =========================
+# Store unifié (agenda + stages + tablaos)
+# =========================
+# Chaque route fournit `to_events(payload)` qui traduit son payload en événements normalisés
+# (make_event) ; merge_events les fusionne : même jour + titre proche → un seul événement,
+# champs complétés et sources cumulées.
+EVENT_FIELDS = ("type", "titre", "date_start", "date_end", "heure", "lieu", "description", "url")
+TITLE_TOKENS = 12          # mots du titre pris en compte (l'agenda n'a qu'un long texte)
+TITLE_OVERLAP = 0.6        # recouvrement minimal (sur le plus court des deux titres)
+_STOPWORDS = {"avec", "pour", "dans", "les", "des", "une", "the", "and", "centre", "solea"}
+
+def make_event(source: str, titre: str, date_start: str = "", date_end: str = "", **extra) -> dict:
+    ev = {"type": extra.pop("type", "") or classify_type(titre), "titre": titre or "",
+          "date_start": date_start or "", "date_end": date_end or date_start or ""}
+    for k in EVENT_FIELDS:
+        if k not in ev:
+            ev[k] = extra.get(k) or ""
+    ev["sources"] = [source]
+    return ev
+
+def title_tokens(s: str) -> frozenset[str]:
+    s = "".join(ch for ch in unicodedata.normalize("NFKD", (s or "").lower()) if not unicodedata.combining(ch))
+    words = [w for w in re.findall(r"[a-z0-9]+", s) if len(w) >= 3 and w not in _STOPWORDS]
+    return frozenset(words[:TITLE_TOKENS])
+
+def _same_title(a: frozenset, b: frozenset) -> bool:
+    if not a or not b:
+        return False   # titre vide (ou que des mots vides) : rien ne permet de rapprocher
+    return len(a & b) / min(len(a), len(b)) >= TITLE_OVERLAP
+
+# ordre de préférence quand deux sources décrivent le même événement (titre, type…)
+SOURCE_RANK = {"tablao": 0, "stage": 1, "agenda": 2}
+
+def merge_events(*lists: list[dict]) -> list[dict]:
+    """Fusionne les listes d'événements normalisés ; résultat trié par date (non datés en fin)."""
+    by_day: dict[int | None, list[tuple[frozenset, dict]]] = {}
+    out: list[dict] = []
+    for ev in sorted((e for l in lists for e in l), key=lambda e: SOURCE_RANK.get(e["sources"][0], 9)):
+        day = parse_day(ev["date_start"])
+        toks = title_tokens(ev["titre"])
+        for other_toks, other in by_day.get(day, ()):
+            if _same_title(toks, other_toks):
+                for k in EVENT_FIELDS:
+                    if not other[k] and ev[k]:
+                        other[k] = ev[k]
+                other["sources"] += [s for s in ev["sources"] if s not in other["sources"]]
+                break
+        else:
+            ev = {**ev, "sources": list(ev["sources"])}
+            by_day.setdefault(day, []).append((toks, ev))
+            out.append(ev)
+    out.sort(key=lambda e: (parse_day(e["date_start"]) is None, parse_day(e["date_start"]) or 0))
+    return out
+
+# (payloads sources) -> store : reconstruit seulement quand l'un des payloads en cache change
+_STORE: dict = {"inputs": (), "events": []}
+
+def event_store(sources: list[tuple[str, dict, object]]) -> list[dict]:
+    """`sources` : [(nom, payload, to_events)] ; les événements fusionnés, mémorisés par identité des payloads."""
+    inputs = tuple(p for _, p, _ in sources)
+    with _LOCK:
+        if len(inputs) == len(_STORE["inputs"]) and all(a is b for a, b in zip(inputs, _STORE["inputs"])):
+            return _STORE["events"]
+    events = merge_events(*[to_events(p) for _, p, to_events in sources])
+    with _LOCK:
+        _STORE["inputs"], _STORE["events"] = inputs, events
+    return events
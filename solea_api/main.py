@@ -1,13 +1,180 @@
-from fastapi import FastAPI
-from solea_api.routes import infos_agenda, infos_cours, infos_stage, infos_tablao
+# solea_api/main.py
+"""
+Point d'entrée ASGI (FastAPI), à côté de l'app Flask (wsgi.py) :
 
-app = FastAPI()
+    uvicorn solea_api.main:app --host 0.0.0.0 --port $PORT --workers 2
 
-app.include_router(infos_agenda.router, prefix="/infos-agenda", tags=["Agenda"])
-app.include_router(infos_cours.router, prefix="/infos-cours", tags=["Cours"])
-app.include_router(infos_stage.router, prefix="/infos-stage", tags=["Stage"])
-app.include_router(infos_tablao.router, prefix="/infos-tablao", tags=["Tablao"])
+Mêmes URLs, mêmes payloads, même cache et mêmes parseurs que Flask ; seuls les GET amont
+sont non bloquants (aio.py). Une requête qui attend un scrape à froid ne tient donc
+qu'une coroutine : quelques process suffisent pour des centaines d'appels simultanés.
+"""
+from __future__ import annotations
+import asyncio, time
+from contextlib import asynccontextmanager
+
+from fastapi import FastAPI, Request
+from fastapi.responses import JSONResponse, PlainTextResponse, Response
+
+from . import metrics
+from .aio import cached_payload_async, aclose_client
+from .events import parse_query, filtered_payload
+from .refresh import start_refresher
+from .utils import cache_key, encoded_json, load_snapshot, parse_memo_stats, request_projection
+from .routes import infos_cours, infos_agenda, infos_stage, infos_tablao
+from .routes.infos_all import SECTIONS, SECTION_TIMEOUT, _selected_sections, _timeout, sections_payload
+from .routes.infos_events import SOURCES, EVENT_INDEX as STORE_INDEX, events_payload
+
+@asynccontextmanager
+async def lifespan(_app: FastAPI):
+    load_snapshot()    # derniers payloads valides depuis le disque : pas de démarrage à froid
+    start_refresher()  # comme wsgi.py (SOLEA_REFRESH=0 pour couper)
+    yield
+    await aclose_client()
+
+app = FastAPI(title="API Centre Soléa", lifespan=lifespan, docs_url=None, redoc_url=None, openapi_url=None)
+
+def _json(request: Request, key: str, payload: dict, meta: dict, args=None) -> Response:
+    """Mêmes octets, ETag et gzip que utils.json_response (Flask)."""
+    status, body, headers = encoded_json(key, payload, meta, request.query_params if args is None else args,
+                                         request.headers.get("if-none-match", ""),
+                                         request.headers.get("accept-encoding", ""))
+    return Response(body, status_code=status, headers=headers)
+
+@app.middleware("http")
+async def _metrics_observe(request: Request, call_next):
+    t0 = time.perf_counter()
+    resp = await call_next(request)
+    route = request.scope.get("route")
+    metrics.HTTP_SECONDS.observe(time.perf_counter() - t0, getattr(route, "name", None) or "404", str(resp.status_code))
+    return resp
 
 @app.get("/")
-def root():
-    return {"message": "API Centre Soléa — OK"}
+async def home():
+    return PlainTextResponse("API Centre Soléa — OK")
+
+# =========================
+# Routes unitaires (mêmes clés de cache que les blueprints)
+# =========================
+async def _section_response(request: Request, mod, name: str, index: dict | None = None,
+                            query: dict | None = None) -> Response:
+    """`query` : filtre déjà validé par parse_query (avant tout scrape, pour distinguer 400 et 500)."""
+    key = cache_key(name, dict(request.query_params), allowed=mod.CACHE_PARAMS)
+    payload, meta = await cached_payload_async(key, mod.build_payload_async, mod.TTL)
+    if index is not None and query:
+        key, payload = filtered_payload(key, payload, query, **index)
+    return _json(request, key, payload, meta)
+
+@app.get("/infos-cours")
+async def infos_cours_route(request: Request):
+    try:
+        return await _section_response(request, infos_cours, "infos-cours")
+    except Exception as e:
+        return JSONResponse({"erreur": str(e)}, status_code=500)
+
+@app.get("/infos-agenda")
+async def infos_agenda_route(request: Request):
+    try:
+        query = parse_query(request.query_params)   # ?from= &to= &type= &limit= &next=
+    except ValueError as e:
+        return JSONResponse({"erreur": str(e)}, status_code=400)
+    try:
+        return await _section_response(request, infos_agenda, "infos-agenda", infos_agenda.EVENT_INDEX, query)
+    except Exception as e:
+        return JSONResponse({"erreur": str(e)}, status_code=500)
+
+@app.get("/infos-stage")
+async def infos_stage_route(request: Request):
+    plain = infos_stage.wants_plain_text(request.headers.get("accept"))
+    try:
+        if plain:
+            key = cache_key("infos-stage", dict(request.query_params), allowed=infos_stage.CACHE_PARAMS)
+            payload, meta = await cached_payload_async(key, infos_stage.build_payload_async, infos_stage.TTL)
+            return Response(infos_stage.render_plain_text(payload), headers=infos_stage.plain_text_headers(meta))
+        resp = await _section_response(request, infos_stage, "infos-stage")
+        resp.headers["Vary"] = "Accept, Accept-Encoding"
+        return resp
+    except Exception as e:
+        if plain:
+            body, headers = infos_stage.plain_text_error(e)
+            return Response(body, status_code=500, headers=headers)
+        return JSONResponse({"source": infos_stage.SRC, "error": str(e)}, status_code=500)
+
+@app.get("/infos-tablao")
+async def infos_tablao_route(request: Request):
+    try:
+        query = parse_query(request.query_params)   # ?from= &to= &type= &limit= &next=
+    except ValueError as e:
+        return JSONResponse({"erreur": str(e)}, status_code=400)
+    try:
+        return await _section_response(request, infos_tablao, "infos-tablao", infos_tablao.EVENT_INDEX, query)
+    except Exception as e:
+        return JSONResponse({"erreur": str(e)}, status_code=500)
+
+@app.get("/infos-stage-solea")
+async def infos_stage_solea_removed():
+    return PlainTextResponse("Cette route n'existe plus. Utilise /infos-stage.", status_code=410)
+
+# =========================
+# Agrégats (/infos-all, /events)
+# =========================
+async def fetch_sections_async(names: list[str], timeout: float) -> tuple[dict, dict]:
+    """Pendant de infos_all.fetch_sections : une tâche par section, échéance commune."""
+    tasks = {asyncio.ensure_future(cached_payload_async(SECTIONS[n].CACHE_KEY, SECTIONS[n].build_payload_async,
+                                                        SECTIONS[n].TTL)): n for n in names}
+    done, late = await asyncio.wait(tasks, timeout=timeout)
+    for t in late:
+        t.cancel()   # la construction partagée continue en fond (shield) ; son résultat ira en cache
+    results, errors = {}, {}
+    for t, name in tasks.items():
+        if t not in done:
+            errors[name] = f"timeout ({timeout:g}s)"
+        elif t.exception() is not None:
+            errors[name] = str(t.exception())
+        else:
+            results[name] = t.result()
+    return results, errors
+
+@app.get("/infos-all")
+async def infos_all_route(request: Request):
+    names = _selected_sections(request.query_params.get("sections"))
+    if not names:
+        return JSONResponse({"erreur": "aucune section valide", "sections_disponibles": list(SECTIONS)}, status_code=400)
+    results, errors = await fetch_sections_async(names, _timeout(request.query_params.get("timeout")))
+    if not results:
+        return JSONResponse({"sections": {}, "erreurs": errors}, status_code=503)
+    key, body, meta = sections_payload(names, results, errors, request_projection(request.query_params))
+    return _json(request, key, body, meta, args={})
+
+@app.get("/events")
+async def events_route(request: Request):
+    try:
+        query = parse_query(request.query_params)   # ?from= &to= &type= &limit= &next=
+    except ValueError as e:
+        return JSONResponse({"erreur": str(e)}, status_code=400)
+    try:
+        results, errors = await fetch_sections_async(list(SOURCES), SECTION_TIMEOUT)
+        if not results:
+            return JSONResponse({"erreur": "aucune source disponible", "erreurs": errors}, status_code=503)
+        key, payload, meta = events_payload(results, errors)
+        if query:
+            key, payload = filtered_payload(key, payload, query, **STORE_INDEX)
+        return _json(request, key, payload, meta)
+    except Exception as e:
+        return JSONResponse({"erreur": str(e)}, status_code=500)
+
+# =========================
+# Observabilité
+# =========================
+@app.get("/metrics")
+async def metrics_route():
+    return PlainTextResponse(metrics.render(metrics.runtime_lines()), media_type="text/plain; version=0.0.4; charset=utf-8")
+
+@app.get("/debug-parse-memo")
+async def debug_parse_memo():
+    return parse_memo_stats()
+
+@app.get("/debug-routes")
+async def debug_routes():
+    body = [f"{','.join(sorted(getattr(r, 'methods', None) or ()))}  {r.path}  -> {r.name}"
+            for r in sorted(app.routes, key=lambda r: r.path)]
+    return PlainTextResponse("\n".join(body))
@@ -0,0 +1,141 @@
+# solea_api/metrics.py
+"""
+Compteurs et histogrammes en mémoire, exposés au format texte Prometheus (/metrics).
+
+Pensé pour rester actif en production : un verrou par métrique, une addition par
+événement ; pas de dépendance externe. Les valeurs sont par process (chaque worker
+gunicorn a les siennes, comme le fait le client Prometheus sans mode multiprocess).
+
+Métriques :
+  solea_stage_seconds{stage}                  fetch, parse, extract, serialize
+  solea_upstream_seconds{variant}             durée d'un GET amont (A, B = relance HEADERS_B)
+  solea_upstream_responses_total{status}      statuts HTTP amont
+  solea_upstream_errors_total{error}          exceptions (timeout, connexion…)
+  solea_fetch_fallback_total{reason}          relances HEADERS_B de fetch_html (thin, error)
+  solea_cache_requests_total{cache,result}    hit / stale / miss par clé (nom de la clé)
+  solea_http_request_seconds{endpoint,status} durée des requêtes servies (Flask ou ASGI)
+"""
+from __future__ import annotations
+import threading, time
+from contextlib import contextmanager
+
+DEFAULT_BUCKETS = (0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+def _escape(v) -> str:
+    return str(v).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+def _fmt_labels(names: tuple[str, ...], values: tuple, extra: str = "") -> str:
+    parts = [f'{n}="{_escape(v)}"' for n, v in zip(names, values)]
+    if extra:
+        parts.append(extra)
+    return "{" + ",".join(parts) + "}" if parts else ""
+
+def _fmt_value(v: float) -> str:
+    return str(int(v)) if float(v).is_integer() else repr(float(v))
+
+class Counter:
+    def __init__(self, name: str, help: str, labels: tuple[str, ...] = ()):
+        self.name, self.help, self.labels = name, help, labels
+        self._values: dict[tuple, float] = {}
+        self._lock = threading.Lock()
+
+    def inc(self, *values, amount: float = 1.0) -> None:
+        with self._lock:
+            self._values[values] = self._values.get(values, 0.0) + amount
+
+    def value(self, *values) -> float:
+        with self._lock:
+            return self._values.get(values, 0.0)
+
+    def render(self) -> list[str]:
+        with self._lock:
+            items = sorted(self._values.items())
+        out = [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} counter"]
+        out += [f"{self.name}{_fmt_labels(self.labels, k)} {_fmt_value(v)}" for k, v in items]
+        return out
+
+class Histogram:
+    def __init__(self, name: str, help: str, labels: tuple[str, ...] = (), buckets=DEFAULT_BUCKETS):
+        self.name, self.help, self.labels = name, help, labels
+        self.buckets = tuple(sorted(buckets))
+        self._series: dict[tuple, list] = {}   # labels -> [compte par bucket..., somme, total]
+        self._lock = threading.Lock()
+
+    def observe(self, value: float, *values) -> None:
+        with self._lock:
+            s = self._series.get(values)
+            if s is None:
+                s = self._series[values] = [0] * len(self.buckets) + [0.0, 0]
+            for i, b in enumerate(self.buckets):
+                if value <= b:
+                    s[i] += 1
+                    break
+            s[-2] += value
+            s[-1] += 1
+
+    @contextmanager
+    def time(self, *values):
+        t0 = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(time.perf_counter() - t0, *values)
+
+    def count(self, *values) -> int:
+        with self._lock:
+            s = self._series.get(values)
+            return s[-1] if s else 0
+
+    def render(self) -> list[str]:
+        with self._lock:
+            items = sorted((k, list(v)) for k, v in self._series.items())
+        out = [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} histogram"]
+        for k, s in items:
+            cumul = 0
+            for b, c in zip(self.buckets, s):
+                cumul += c
+                le = 'le="%s"' % b
+                out.append(f"{self.name}_bucket{_fmt_labels(self.labels, k, le)} {cumul}")
+            le = 'le="+Inf"'
+            out.append(f"{self.name}_bucket{_fmt_labels(self.labels, k, le)} {s[-1]}")
+            out.append(f"{self.name}_sum{_fmt_labels(self.labels, k)} {_fmt_value(round(s[-2], 6))}")
+            out.append(f"{self.name}_count{_fmt_labels(self.labels, k)} {s[-1]}")
+        return out
+
+STAGE_SECONDS = Histogram("solea_stage_seconds", "Durée des étapes du pipeline (fetch, parse, extract, serialize).", ("stage",))
+UPSTREAM_SECONDS = Histogram("solea_upstream_seconds", "Durée des GET amont.", ("variant",))
+UPSTREAM_RESPONSES = Counter("solea_upstream_responses_total", "Réponses amont par statut HTTP.", ("status",))
+UPSTREAM_ERRORS = Counter("solea_upstream_errors_total", "Erreurs réseau amont par type d'exception.", ("error",))
+FETCH_FALLBACK = Counter("solea_fetch_fallback_total", "Relances HEADERS_B de fetch_html.", ("reason",))
+CACHE_REQUESTS = Counter("solea_cache_requests_total", "Lectures du cache applicatif (hit, stale, miss).", ("cache", "result"))
+HTTP_SECONDS = Histogram("solea_http_request_seconds", "Durée des requêtes HTTP servies.", ("endpoint", "status"))
+
+REGISTRY = [STAGE_SECONDS, UPSTREAM_SECONDS, UPSTREAM_RESPONSES, UPSTREAM_ERRORS,
+            FETCH_FALLBACK, CACHE_REQUESTS, HTTP_SECONDS]
+
+def computed_lines(name: str, help: str, values: dict[tuple, float], labels: tuple[str, ...] = (),
+                   kind: str = "gauge") -> list[str]:
+    """Métrique lue ailleurs au moment du rendu (taille du cache, compteurs du mémo…)."""
+    out = [f"# HELP {name} {help}", f"# TYPE {name} {kind}"]
+    out += [f"{name}{_fmt_labels(labels, k)} {_fmt_value(v)}" for k, v in sorted(values.items())]
+    return out
+
+def runtime_lines() -> list[str]:
+    """Jauges lues au rendu : taille du cache applicatif et efficacité du mémo de parsing."""
+    from .utils import _CACHE, parse_memo_stats
+    cache = _CACHE.stats()
+    memo = parse_memo_stats()
+    out = computed_lines("solea_cache_entries", "Entrées du cache applicatif.", {(): cache["entries"]})
+    out += computed_lines("solea_cache_bytes", "Taille (octets JSON) du cache applicatif.", {(): cache["bytes"]})
+    out += computed_lines("solea_cache_evictions_total", "Évictions LRU depuis le démarrage.",
+                          {(): cache["evictions"]}, kind="counter")
+    out += computed_lines("solea_parse_memo_total", "Mémo de parsing par empreinte HTML.",
+                          {("hit",): memo["hits"], ("miss",): memo["misses"]}, ("result",), kind="counter")
+    return out
+
+def render(extra: list[str] | None = None) -> str:
+    lines: list[str] = []
+    for m in REGISTRY:
+        lines += m.render()
+    lines += extra or []
+    return "\n".join(lines) + "\n"
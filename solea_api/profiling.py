@@ -0,0 +1,117 @@
+# solea_api/profiling.py
+"""
+Profilage à la demande d'une requête, protégé par jeton.
+
+Désactivé par défaut : sans SOLEA_PROFILE_TOKEN, `install()` ne fait rien (aucun
+surcoût). Avec le jeton, toute route peut être profilée :
+
+    curl -H "X-Solea-Profile: $TOKEN" https://…/infos-cours
+    curl "https://…/infos-agenda?_profile=$TOKEN&_profile_format=collapsed" > agenda.folded
+
+Formats (?_profile_format= ou en-tête X-Solea-Profile-Format) :
+  - top (défaut) : cProfile, fonctions les plus coûteuses (cumulé), puis celles de solea_api ;
+  - collapsed : échantillonnage de la pile toutes les SOLEA_PROFILE_INTERVAL secondes,
+    piles repliées "a;b;c N" (flamegraph.pl, speedscope) ;
+  - pstats : dump binaire cProfile (snakeviz, pstats.Stats).
+
+Le handler est exécuté caches contournés (utils.bypass_caches) : on profile le scrape,
+le parsing et le rendu, pas une lecture de cache. Seul le thread de la requête est
+profilé (les pages tablao parsées dans le pool n'apparaissent que par leur attente).
+"""
+from __future__ import annotations
+import cProfile, hmac, io, marshal, os, pstats, sys, threading, time
+from collections import Counter
+from functools import wraps
+
+from flask import Response, request
+
+from .utils import bypass_caches
+
+PROFILE_TOKEN = os.environ.get("SOLEA_PROFILE_TOKEN", "")
+SAMPLE_INTERVAL = float(os.environ.get("SOLEA_PROFILE_INTERVAL", "0.001"))
+TOP_N = 40
+PACKAGE_DIR = os.path.dirname(os.path.abspath(__file__))
+
+def _requested() -> bool:
+    given = request.headers.get("X-Solea-Profile") or request.args.get("_profile") or ""
+    return bool(given) and hmac.compare_digest(given.encode("utf-8"), PROFILE_TOKEN.encode("utf-8"))
+
+def _frame_label(code) -> str:
+    name = getattr(code, "co_qualname", code.co_name)
+    return f"{os.path.basename(code.co_filename)}:{name}"
+
+class StackSampler:
+    """Échantillonne la pile d'un thread (sys._current_frames) et compte les piles repliées."""
+    def __init__(self, thread_id: int, interval: float = SAMPLE_INTERVAL):
+        self.thread_id, self.interval = thread_id, interval
+        self.stacks: Counter[str] = Counter()
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, name="solea-profile", daemon=True)
+
+    def _run(self) -> None:
+        while not self._stop.wait(self.interval):
+            frame = sys._current_frames().get(self.thread_id)
+            stack = []
+            while frame is not None:
+                stack.append(_frame_label(frame.f_code))
+                frame = frame.f_back
+            if stack:
+                self.stacks[";".join(reversed(stack))] += 1
+
+    def __enter__(self):
+        self._thread.start()
+        return self
+
+    def __exit__(self, *exc):
+        self._stop.set()
+        self._thread.join()
+
+    def folded(self) -> str:
+        return "".join(f"{stack} {n}\n" for stack, n in self.stacks.most_common())
+
+def _top_report(prof: cProfile.Profile, wall: float) -> str:
+    out = io.StringIO()
+    out.write(f"# {request.method} {request.full_path}  — {wall * 1000:.1f} ms (caches contournés)\n\n")
+    stats = pstats.Stats(prof, stream=out).strip_dirs().sort_stats("cumulative")
+    stats.print_stats(TOP_N)
+    out.write("\n# fonctions de solea_api (temps propre)\n")
+    own = pstats.Stats(prof, stream=out).sort_stats("tottime")
+    own.print_stats(PACKAGE_DIR.replace("\\", "\\\\"), TOP_N)
+    return out.getvalue()
+
+def _profiled(view, kwargs) -> Response:
+    fmt = (request.headers.get("X-Solea-Profile-Format") or request.args.get("_profile_format") or "top").lower()
+    t0 = time.perf_counter()
+    if fmt == "collapsed":
+        with StackSampler(threading.get_ident()) as sampler, bypass_caches():
+            view(**kwargs)
+        body, mimetype = sampler.folded(), "text/plain; charset=utf-8"
+    else:
+        prof = cProfile.Profile()
+        with bypass_caches():
+            prof.runcall(view, **kwargs)
+        prof.create_stats()
+        if fmt == "pstats":
+            body, mimetype = marshal.dumps(prof.stats), "application/octet-stream"
+        else:
+            body, mimetype = _top_report(prof, time.perf_counter() - t0), "text/plain; charset=utf-8"
+    resp = Response(body, mimetype=mimetype)
+    resp.headers["X-Profile-Wall-Ms"] = f"{(time.perf_counter() - t0) * 1000:.1f}"
+    resp.headers["Cache-Control"] = "no-store"
+    return resp
+
+def install(app) -> bool:
+    """Enveloppe chaque route de l'app si SOLEA_PROFILE_TOKEN est défini ; sinon ne touche à rien."""
+    if not PROFILE_TOKEN:
+        return False
+    for endpoint, view in list(app.view_functions.items()):
+        if endpoint == "static":
+            continue
+
+        def wrapper(*args, _view=view, **kwargs):
+            if _requested():
+                return _profiled(_view, kwargs)
+            return _view(*args, **kwargs)
+
+        app.view_functions[endpoint] = wraps(view)(wrapper)
+    return True
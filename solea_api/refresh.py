@@ -0,0 +1,107 @@
+# solea_api/refresh.py
+"""
+Rafraîchissement en tâche de fond des payloads (cours, agenda, stages, tablaos).
+
+Chaque route enregistre son constructeur via `register(...)`. Un thread démon
+re-scrape chaque source à intervalle régulier et remplace l'entrée de cache d'un
+seul coup (`cache_set`), si bien que les handlers ne lisent que des résultats
+déjà calculés.
+
+Activation : `start_refresher()` (appelé par wsgi.py) ; SOLEA_REFRESH=0 pour le couper.
+Un seul process par machine rafraîchit : verrou flock sur SOLEA_REFRESH_LOCK (par défaut
+<tmp>/solea-refresh.lock ; SOLEA_REFRESH_LOCK="" pour que chaque worker rafraîchisse).
+Les autres workers retentent périodiquement de prendre le relais si le détenteur
+disparaît. À combiner avec SOLEA_CACHE_BACKEND=sqlite pour que tous les workers lisent
+ce que le détenteur du verrou a calculé (sinon ils retombent sur le stale-while-revalidate
+à la demande).
+"""
+from __future__ import annotations
+import os, tempfile, time, threading, logging
+
+from .utils import cache_set, single_flight
+from . import snapshot
+
+try:
+    import fcntl
+except Exception:  # pas de flock (Windows) → pas de verrou inter-process
+    fcntl = None
+
+log = logging.getLogger(__name__)
+
+REFRESH_ENABLED = os.environ.get("SOLEA_REFRESH", "1") != "0"
+REFRESH_LOCK = os.environ.get("SOLEA_REFRESH_LOCK", os.path.join(tempfile.gettempdir(), "solea-refresh.lock"))
+TICK_SECONDS = 1.0
+
+# name -> {"key", "build", "ttl", "every", "last"}
+_JOBS: dict[str, dict] = {}
+_STATE = {"thread": None, "lock_fd": None}
+_STATE_LOCK = threading.Lock()
+
+def register(name: str, key: str, build, ttl_seconds: int, every: float | None = None) -> None:
+    """
+    Déclare un payload à garder chaud : build() est relancé toutes les `every` secondes (ttl/2 par défaut).
+    Le payload est aussi persisté dans l'instantané disque (voir snapshot.py).
+    """
+    snapshot.track(key)
+    _JOBS[name] = {
+        "key": key,
+        "build": build,
+        "ttl": ttl_seconds,
+        "every": every if every is not None else max(ttl_seconds / 2, 5),
+        "last": 0.0,
+    }
+
+def refresh_now(name: str) -> bool:
+    """Reconstruit un payload et l'installe dans le cache. False si le scrape échoue (l'ancien est gardé)."""
+    job = _JOBS[name]
+    job["last"] = time.time()
+    def run():
+        payload = job["build"]()
+        cache_set(job["key"], payload, ttl_seconds=job["ttl"])
+        return payload
+    try:
+        # même clé que les handlers : un miss concurrent attend ce scrape au lieu d'en lancer un autre
+        single_flight(job["key"], run)
+    except Exception:
+        log.exception("refresh %s: échec, on garde le payload précédent", name)
+        return False
+    return True
+
+def _acquire_leadership() -> bool:
+    if not REFRESH_LOCK or fcntl is None:
+        return True
+    if _STATE["lock_fd"] is not None:
+        return True
+    fd = os.open(REFRESH_LOCK, os.O_RDWR | os.O_CREAT, 0o644)
+    try:
+        fcntl.flock(fd, fcntl.LOCK_EX | fcntl.LOCK_NB)
+    except OSError:
+        os.close(fd)
+        return False
+    _STATE["lock_fd"] = fd
+    return True
+
+def _loop() -> None:
+    while True:
+        if _acquire_leadership():
+            now = time.time()
+            for name, job in list(_JOBS.items()):
+                if now - job["last"] >= job["every"]:
+                    refresh_now(name)
+        time.sleep(TICK_SECONDS)
+
+def start_refresher(force: bool = False) -> bool:
+    """
+    Démarre le thread de rafraîchissement (une fois par process). Renvoie True s'il tourne.
+    À appeler dans le worker (wsgi.py, sans --preload) : un thread ne survit pas au fork.
+    """
+    if not (REFRESH_ENABLED or force):
+        return False
+    with _STATE_LOCK:
+        t = _STATE["thread"]
+        if t is not None and t.is_alive():
+            return True
+        t = threading.Thread(target=_loop, name="solea-refresh", daemon=True)
+        _STATE["thread"] = t
+        t.start()
+    return True
@@ -0,0 +1,164 @@
+# solea_api/replay.py
+"""
+Enregistrement / rejeu des pages amont (www.centresolea.org), pour mesurer et tester
+sans réseau.
+
+Tout passe par utils.http_get (et aio.http_get_async), qui consultent ce module :
+  - SOLEA_REPLAY=record : chaque réponse 200 est aussi écrite dans SOLEA_FIXTURES ;
+  - SOLEA_REPLAY=replay : les réponses sont lues dans SOLEA_FIXTURES, sans réseau
+    (If-None-Match → 304 comme un vrai serveur ; pas de fixture → ConnectionError) ;
+  - SOLEA_UPSTREAM=http://127.0.0.1:8765 : les URLs amont sont redirigées vers ce
+    serveur (par ex. le serveur de fixtures ci-dessous), chemin et requête conservés.
+
+Une fixture = <nom>.html (corps) + <nom>.json (url, statut, en-têtes utiles). Le nom
+ne dépend que du chemin et de la requête (sans cache-buster ?cb=), pas de l'hôte.
+
+Ligne de commande : bench/fixtures.py (record / serve / list).
+"""
+from __future__ import annotations
+import hashlib, json, os, random, re, sys, threading, time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import urlsplit, urlunsplit
+
+import requests
+
+REPLAY_MODE = os.environ.get("SOLEA_REPLAY", "").lower()        # "", "record" ou "replay"
+FIXTURES_DIR = os.environ.get("SOLEA_FIXTURES", "fixtures")
+UPSTREAM = os.environ.get("SOLEA_UPSTREAM", "").rstrip("/")
+UPSTREAM_HOSTS = ("www.centresolea.org", "centresolea.org")
+KEPT_HEADERS = ("Content-Type", "ETag", "Last-Modified")
+
+_CB_PARAM = re.compile(r"(^|&)cb=\d+")
+_WRITE_LOCK = threading.Lock()
+
+def fixture_name(url: str) -> str:
+    """Nom de fixture : chemin lisible + empreinte (chemin + requête sans ?cb=)."""
+    parts = urlsplit(url)
+    query = _CB_PARAM.sub("", parts.query).strip("&")
+    target = (parts.path or "/") + (f"?{query}" if query else "")
+    slug = re.sub(r"[^a-z0-9]+", "-", (parts.path or "/").lower()).strip("-")[:60] or "index"
+    return f"{slug}-{hashlib.sha1(target.encode('utf-8')).hexdigest()[:10]}"
+
+def _paths(url: str) -> tuple[str, str]:
+    base = os.path.join(FIXTURES_DIR, fixture_name(url))
+    return base + ".html", base + ".json"
+
+def upstream_url(url: str) -> str:
+    """Redirige une URL amont vers SOLEA_UPSTREAM (si défini)."""
+    if not UPSTREAM:
+        return url
+    parts = urlsplit(url)
+    if parts.hostname not in UPSTREAM_HOSTS:
+        return url
+    up = urlsplit(UPSTREAM)
+    return urlunsplit((up.scheme, up.netloc, parts.path, parts.query, parts.fragment))
+
+def record(url: str, r: requests.Response) -> None:
+    """Écrit la réponse (200 uniquement) comme fixture de `url`."""
+    if r.status_code != 200:
+        return
+    html_path, meta_path = _paths(url)
+    meta = {"url": url, "status": r.status_code, "recorded_at": time.time(),
+            "headers": {h: r.headers[h] for h in KEPT_HEADERS if h in r.headers}}
+    with _WRITE_LOCK:
+        os.makedirs(FIXTURES_DIR, exist_ok=True)
+        for path, content in ((html_path, r.text), (meta_path, json.dumps(meta, ensure_ascii=False, indent=1))):
+            tmp = path + ".tmp"
+            with open(tmp, "w", encoding="utf-8") as f:
+                f.write(content)
+            os.replace(tmp, path)
+
+def load_fixture(url: str) -> tuple[dict, str] | None:
+    html_path, meta_path = _paths(url)
+    try:
+        with open(meta_path, encoding="utf-8") as f:
+            meta = json.load(f)
+        with open(html_path, encoding="utf-8") as f:
+            body = f.read()
+    except FileNotFoundError:
+        return None
+    headers = meta.setdefault("headers", {})
+    if "ETag" not in headers:
+        headers["ETag"] = '"%s"' % hashlib.sha1(body.encode("utf-8")).hexdigest()[:16]
+    return meta, body
+
+def replay_response(url: str, headers: dict | None = None) -> requests.Response:
+    """Réponse construite depuis la fixture de `url` (304 si If-None-Match correspond)."""
+    fx = load_fixture(url)
+    if fx is None:
+        raise requests.ConnectionError(f"replay : pas de fixture pour {url} ({FIXTURES_DIR})")
+    meta, body = fx
+    r = requests.Response()
+    r.url = url
+    r.headers.update(meta["headers"])
+    if (headers or {}).get("If-None-Match") == meta["headers"]["ETag"]:
+        r.status_code = 304
+        r._content = b""
+    else:
+        r.status_code = meta.get("status", 200)
+        r._content = body.encode("utf-8")
+        r.encoding = "utf-8"
+    return r
+
+# =========================
+# Serveur local de fixtures (latence / erreurs injectées)
+# =========================
+class FixtureServer(ThreadingHTTPServer):
+    daemon_threads = True
+
+    def __init__(self, addr, latency=0.0, jitter=0.0, error_rate=0.0, seed=None):
+        super().__init__(addr, _FixtureHandler)
+        self.latency, self.jitter, self.error_rate = latency, jitter, error_rate
+        self.rnd = random.Random(seed)
+        self.hits = 0
+
+class _FixtureHandler(BaseHTTPRequestHandler):
+    server: FixtureServer
+
+    def do_GET(self):
+        srv = self.server
+        srv.hits += 1
+        delay = srv.latency + (srv.rnd.uniform(0, srv.jitter) if srv.jitter else 0.0)
+        if delay:
+            time.sleep(delay)
+        if srv.error_rate and srv.rnd.random() < srv.error_rate:
+            return self._send(503, b"erreur injectee", {"Content-Type": "text/plain"})
+        fx = load_fixture(self.path)
+        if fx is None:
+            return self._send(404, b"pas de fixture", {"Content-Type": "text/plain"})
+        meta, body = fx
+        if self.headers.get("If-None-Match") == meta["headers"]["ETag"]:
+            return self._send(304, b"", meta["headers"])
+        self._send(meta.get("status", 200), body.encode("utf-8"), meta["headers"])
+
+    def _send(self, status: int, body: bytes, headers: dict):
+        self.send_response(status)
+        for k, v in headers.items():
+            self.send_header(k, v)
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        if body:
+            self.wfile.write(body)
+
+    def log_message(self, fmt, *args):
+        pass
+
+def serve(host="127.0.0.1", port=8765, **kw) -> FixtureServer:
+    """Démarre le serveur de fixtures dans un thread ; renvoie le serveur (server_address, shutdown())."""
+    srv = FixtureServer((host, port), **kw)
+    threading.Thread(target=srv.serve_forever, name="solea-fixtures", daemon=True).start()
+    return srv
+
+def record_all() -> list[str]:
+    """Scrape chaque route en mode enregistrement ; renvoie les fixtures écrites."""
+    global REPLAY_MODE
+    REPLAY_MODE = "record"
+    from .routes import infos_cours, infos_agenda, infos_stage, infos_tablao
+    for mod in (infos_cours, infos_agenda, infos_stage, infos_tablao):
+        # toutes les pages événement tablao, même au-delà de l'échéance servie aux clients
+        kwargs = {"deadline": None} if mod is infos_tablao else {}
+        try:
+            mod.build_payload(**kwargs)
+        except Exception as e:
+            print(f"{mod.__name__} : {e}", file=sys.stderr)
+    return sorted(f for f in os.listdir(FIXTURES_DIR) if f.endswith(".json"))
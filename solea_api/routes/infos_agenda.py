@@ -2,18 +2,24 @@
 from flask import Blueprint, jsonify, request
 import re
 import time
+import unicodedata
 from datetime import datetime, date, timedelta
 from bs4 import NavigableString
 
 from ..utils import (
-    fetch_html, soup_from_html, normalize_text,
-    ddmmyyyy_to_spoken,
-    cache_key, cache_get, cache_set, cache_meta,
-    extract_ldjson_events,  # ← utilisé pour lire les Events intégrés
+    fetch_and_build, Page, normalize_text,
+    ddmmyyyy_to_spoken, REVALIDATE,
+    cache_key, cached_payload, json_response, classify_type,
 )
+from ..refresh import register
+from ..aio import fetch_and_build_async
+from ..events import parse_query, filtered_payload, make_event
 
 bp = Blueprint("infos_agenda", __name__)
 BASE_SRC = "https://www.centresolea.org/agenda"
+CACHE_PARAMS: tuple[str, ...] = ()   # paramètres de requête qui comptent dans la clé (aucun : payload unique)
+CACHE_KEY = cache_key("infos-agenda")
+TTL = 120
 
 # --- Mois FR (plein + abréviations usuelles)
 MONTHS = {
@@ -158,130 +164,207 @@ def _iso_to_ddmmyyyy(iso: str) -> str:
     except Exception:
         return ""
 
+def _strip_acc(s: str) -> str:
+    return "".join(ch for ch in unicodedata.normalize("NFKD", s or "") if not unicodedata.combining(ch))
+
+def _query_tokens(desc_lower: str) -> list[str]:
+    return [t for t in re.findall(r"[a-z0-9]+", _strip_acc(desc_lower.lower())) if len(t) >= 3]
+
+def _trigrams(s: str) -> set[str]:
+    return {s[i:i + 3] for i in range(len(s) - 2)}
+
+class LdEventMatcher:
+    """
+    Index des Events JSON-LD d'une page, construit une fois : texte normalisé de chaque
+    event (name + description, sans accents, minuscules) et index trigramme → events.
+
+    Même sémantique que le score d'origine : chaque mot (>= 3 lettres) du bloc gras qui
+    apparaît comme *sous-chaîne* du texte d'un event lui vaut un point ; le meilleur score
+    gagne (premier event en cas d'égalité). Les trigrammes ne servent qu'à trouver les
+    candidats, vérifiés ensuite par `in` ; le résultat par mot est mémorisé pour la page.
+    """
+    def __init__(self, evs: list[dict]):
+        self.evs = evs or []
+        self.hays = [
+            f"{_strip_acc(_norm(ev.get('name')).lower())} {_strip_acc(_norm(ev.get('description')).lower())}"
+            for ev in self.evs
+        ]
+        self.postings: dict[str, set[int]] = {}
+        for i, hay in enumerate(self.hays):
+            for g in _trigrams(hay):
+                self.postings.setdefault(g, set()).add(i)
+        self._hits: dict[str, tuple[int, ...]] = {}
+
+    def _events_containing(self, tok: str) -> tuple[int, ...]:
+        hit = self._hits.get(tok)
+        if hit is None:
+            cands = None
+            for g in sorted(_trigrams(tok), key=lambda g: len(self.postings.get(g, ()))):
+                posting = self.postings.get(g)
+                if not posting:
+                    cands = set()
+                    break
+                cands = set(posting) if cands is None else cands & posting
+                if not cands:
+                    break
+            hit = tuple(sorted(i for i in (cands or ()) if tok in self.hays[i]))
+            self._hits[tok] = hit
+        return hit
+
+    def best(self, desc_lower: str) -> dict | None:
+        if not self.evs:
+            return None
+        q_tokens = _query_tokens(desc_lower)
+        if not q_tokens:
+            return None
+        scores: dict[int, int] = {}
+        for t in q_tokens:
+            for i in self._events_containing(t):
+                scores[i] = scores.get(i, 0) + 1
+        if not scores:
+            return None
+        best_score = max(scores.values())
+        return self.evs[min(i for i, sc in scores.items() if sc == best_score)]
+
 def _best_event_match(desc_lower: str, evs: list[dict]) -> dict | None:
     """
     Associe le bloc gras au bon Event JSON-LD via un score de recouvrement de mots (dans name/description).
-    On enlève les mots très courts.
+    On enlève les mots très courts. (Pour plusieurs blocs d'une même page : LdEventMatcher.)
     """
-    if not evs:
-        return None
-    import unicodedata
-    def strip_acc(s):
-        return "".join(ch for ch in unicodedata.normalize("NFKD", s or "") if not unicodedata.combining(ch))
-
-    q_tokens = [t for t in re.findall(r"[a-z0-9]+", strip_acc(desc_lower.lower())) if len(t) >= 3]
-    if not q_tokens:
-        return None
-
-    best, best_score = None, 0
-    for ev in evs:
-        name = strip_acc((_norm(ev.get("name"))).lower())
-        desc = strip_acc((_norm(ev.get("description"))).lower())
-        hay = f"{name} {desc}"
-        score = sum(1 for t in q_tokens if t in hay)
-        if score > best_score:
-            best_score, best = score, ev
-    return best if best_score > 0 else None
+    return LdEventMatcher(evs).best(desc_lower)
 
 # ---------------------------------------------------------------------------
 
+def _payload_from_page(page: Page) -> dict:
+    soup = page.soup
+
+    # Récupère les Events JSON-LD pour recadrer les dates (indexés une fois pour toute la page)
+    ld_events = page.ld_events or []
+    matcher = LdEventMatcher(ld_events)
+
+    # nœuds en gras
+    bold_nodes = list(soup.select("strong, b"))
+    for sp in soup.find_all("span"):
+        style = (sp.get("style") or "").lower()
+        if "font-weight" in style and any(w in style for w in ["700","bold"]):
+            bold_nodes.append(sp)
+
+    items, seen = [], set()
+
+    for node in bold_nodes:
+        strong_txt = _norm(node.get_text(" ", strip=True))
+        if not strong_txt:
+            continue
+
+        # Séparer “date : titre” dans le même bloc si présent
+        desc_lower = ""
+        parts = INLINE_SEP_RX.split(strong_txt, maxsplit=1)
+        if len(parts) == 2:
+            bold_date_part = parts[0].strip()
+            desc_lower = (parts[1] or "").lower()
+        else:
+            bold_date_part = strong_txt
+
+        # 1) Dates normalisées *strictement* depuis le gras
+        date_start, date_end = _parse_bold_date_exact(bold_date_part)
+
+        # 2) Si pas de desc inline -> récupérer le texte non-gras qui suit
+        if not desc_lower:
+            tail = _following_text_after(node)
+            if tail:
+                desc_lower = tail.lower()
+
+        # 3) Si (a) le gras n’a pas d’année, ou (b) on veut corriger une plage,
+        #    on tente une *validation* via JSON-LD (name/description proches)
+        if ld_events and desc_lower:
+            ev = matcher.best(desc_lower)
+            if ev:
+                s_iso = ev.get("startDate") or ev.get("start") or ""
+                e_iso = ev.get("endDate") or ev.get("end") or ""
+                s_fix = _iso_to_ddmmyyyy(s_iso)
+                e_fix = _iso_to_ddmmyyyy(e_iso) if e_iso else s_fix
+                # On utilise la date JSON-LD si le gras n’a pas d’année
+                # ou si la plage est incohérente / vide.
+                if not date_start or not date_end:
+                    date_start, date_end = s_fix, e_fix
+
+        keyi = (bold_date_part, desc_lower[:220])
+        if keyi in seen:
+            continue
+        seen.add(keyi)
+
+        item = {
+            "date_bold": bold_date_part,      # EXACTEMENT ce qui est écrit en gras
+            "texte": desc_lower,              # le texte associé en minuscules
+            "date_start": date_start,         # normalisé (JSON-LD si dispo, sinon gras)
+            "date_end": date_end,
+        }
+        # confort “parlé” si c’est une date simple
+        if date_start and date_end and date_start == date_end:
+            item["date_spoken"] = ddmmyyyy_to_spoken(date_start)
+        else:
+            item["date_spoken"] = ""
+
+        items.append(item)
+
+    # Tri : si date_start présente → tri chrono, sinon ordre d’apparition
+    def k(e):
+        ds = e.get("date_start") or ""
+        try:
+            d, m, y = ds.split("/")
+            return (0, int(y), int(m), int(d))
+        except Exception:
+            return (1, 9999, 12, 31)
+    items.sort(key=k)
+
+    payload = {
+        "source": BASE_SRC,
+        "count": len(items),
+        "evenements": items
+    }
+    return payload
+
+def _source_url() -> str:
+    # Revalidation ETag/Last-Modified si active, sinon cache-buster pour contourner les caches CDN
+    return BASE_SRC if REVALIDATE else f"{BASE_SRC}?cb={int(time.time())}"
+
+def build_payload() -> dict:
+    return fetch_and_build(_source_url(), _payload_from_page)
+
+async def build_payload_async() -> dict:
+    """Même payload, GET amont non bloquant (point d'entrée ASGI, main.py)."""
+    return await fetch_and_build_async(_source_url(), _payload_from_page)
+
+register("infos-agenda", CACHE_KEY, build_payload, TTL)
+
+def to_events(payload: dict) -> list[dict]:
+    """Événements normalisés (store unifié) : l'agenda n'a pas de titre, seulement le texte associé."""
+    return [
+        make_event("agenda", e.get("texte", "")[:160], e.get("date_start"), e.get("date_end"),
+                   type=classify_type(e.get("date_bold"), e.get("texte")), description=e.get("texte", ""))
+        for e in payload.get("evenements", [])
+    ]
+
+# Index des événements pour les requêtes par date / type (construit une fois par payload en cache)
+EVENT_INDEX = {
+    "field": "evenements",
+    "start_of": lambda e: e.get("date_start"),
+    "end_of": lambda e: e.get("date_end"),
+    "type_of": lambda e: classify_type(e.get("date_bold"), e.get("texte")),
+}
+
 @bp.get("/infos-agenda")
 def infos_agenda():
-    key = cache_key("infos-agenda", request.args.to_dict(flat=True))
-    entry = cache_get(key)
-
+    # paramètres invalides → 400 ; une erreur de construction (même ValueError) → 500
     try:
-        # Bypass éventuels caches CDN
-        html = fetch_html(f"{BASE_SRC}?cb={int(time.time())}")
-        soup = soup_from_html(html)
-
-        # Récupère les Events JSON-LD pour recadrer les dates
-        ld_events = extract_ldjson_events(html) or []
-
-        # nœuds en gras
-        bold_nodes = list(soup.select("strong, b"))
-        for sp in soup.find_all("span"):
-            style = (sp.get("style") or "").lower()
-            if "font-weight" in style and any(w in style for w in ["700","bold"]):
-                bold_nodes.append(sp)
-
-        items, seen = [], set()
-
-        for node in bold_nodes:
-            strong_txt = _norm(node.get_text(" ", strip=True))
-            if not strong_txt:
-                continue
-
-            # Séparer “date : titre” dans le même bloc si présent
-            desc_lower = ""
-            parts = INLINE_SEP_RX.split(strong_txt, maxsplit=1)
-            if len(parts) == 2:
-                bold_date_part = parts[0].strip()
-                desc_lower = (parts[1] or "").lower()
-            else:
-                bold_date_part = strong_txt
-
-            # 1) Dates normalisées *strictement* depuis le gras
-            date_start, date_end = _parse_bold_date_exact(bold_date_part)
-
-            # 2) Si pas de desc inline -> récupérer le texte non-gras qui suit
-            if not desc_lower:
-                tail = _following_text_after(node)
-                if tail:
-                    desc_lower = tail.lower()
-
-            # 3) Si (a) le gras n’a pas d’année, ou (b) on veut corriger une plage,
-            #    on tente une *validation* via JSON-LD (name/description proches)
-            if ld_events and desc_lower:
-                ev = _best_event_match(desc_lower, ld_events)
-                if ev:
-                    s_iso = ev.get("startDate") or ev.get("start") or ""
-                    e_iso = ev.get("endDate") or ev.get("end") or ""
-                    s_fix = _iso_to_ddmmyyyy(s_iso)
-                    e_fix = _iso_to_ddmmyyyy(e_iso) if e_iso else s_fix
-                    # On utilise la date JSON-LD si le gras n’a pas d’année
-                    # ou si la plage est incohérente / vide.
-                    if not date_start or not date_end:
-                        date_start, date_end = s_fix, e_fix
-
-            keyi = (bold_date_part, desc_lower[:220])
-            if keyi in seen:
-                continue
-            seen.add(keyi)
-
-            item = {
-                "date_bold": bold_date_part,      # EXACTEMENT ce qui est écrit en gras
-                "texte": desc_lower,              # le texte associé en minuscules
-                "date_start": date_start,         # normalisé (JSON-LD si dispo, sinon gras)
-                "date_end": date_end,
-            }
-            # confort “parlé” si c’est une date simple
-            if date_start and date_end and date_start == date_end:
-                item["date_spoken"] = ddmmyyyy_to_spoken(date_start)
-            else:
-                item["date_spoken"] = ""
-
-            items.append(item)
-
-        # Tri : si date_start présente → tri chrono, sinon ordre d’apparition
-        def k(e):
-            ds = e.get("date_start") or ""
-            try:
-                d, m, y = ds.split("/")
-                return (0, int(y), int(m), int(d))
-            except Exception:
-                return (1, 9999, 12, 31)
-        items.sort(key=k)
-
-        payload = {
-            "source": BASE_SRC,
-            "count": len(items),
-            "evenements": items
-        }
-        cache_set(key, payload, ttl_seconds=120)
-        return jsonify({**payload, "cache": cache_meta(True, entry)})
-
+        query = parse_query(request.args)   # ?from= &to= &type= &limit= &next=
+    except ValueError as e:
+        return jsonify({"erreur": str(e)}), 400
+    try:
+        key = cache_key("infos-agenda", request.args.to_dict(flat=True), allowed=CACHE_PARAMS)
+        payload, meta = cached_payload(key, build_payload, TTL)
+        if query:
+            key, payload = filtered_payload(key, payload, query, **EVENT_INDEX)
+        return json_response(key, payload, meta)
     except Exception as e:
-        if entry:
-            return jsonify({**entry["data"], "cache": cache_meta(False, entry)})
         return jsonify({"erreur": str(e)}), 500
@@ -0,0 +1,111 @@
+# solea_api/routes/infos_all.py
+from flask import Blueprint, jsonify, request
+import json, os, threading
+from concurrent.futures import ThreadPoolExecutor, wait
+
+from ..utils import (
+    cache_key, cached_payload, json_response, merged_meta, projected, request_projection, NO_PROJECTION,
+)
+from . import infos_cours, infos_agenda, infos_stage, infos_tablao
+
+bp = Blueprint("infos_all", __name__)
+
+# section -> module de route : mêmes clés de cache, constructeurs et TTL que les routes unitaires
+SECTIONS = {
+    "cours": infos_cours,
+    "agenda": infos_agenda,
+    "stage": infos_stage,
+    "tablao": infos_tablao,
+}
+
+# Échéance par section (réglable par ?timeout=, plafonnée) ; une section en retard
+# n'empêche pas les autres de répondre et finit en fond (son résultat sera en cache).
+SECTION_TIMEOUT = float(os.environ.get("SOLEA_ALL_TIMEOUT", "8"))
+SECTION_TIMEOUT_MAX = 25.0
+# Pool partagé par /infos-all (une tâche par section) et /events (une par source) : une tâche
+# en retard garde son thread jusqu'à la fin du scrape, d'où une marge pour plusieurs requêtes
+# concurrentes (par défaut 8 requêtes /infos-all complètes).
+ALL_WORKERS = int(os.environ.get("SOLEA_ALL_WORKERS", str(len(SECTIONS) * 8)))
+_POOL = ThreadPoolExecutor(max_workers=ALL_WORKERS, thread_name_prefix="solea-all")
+
+def _selected_sections(arg: str | None) -> list[str]:
+    if not arg:
+        return list(SECTIONS)
+    wanted = [s.strip().lower() for s in arg.split(",") if s.strip()]
+    return [s for s in SECTIONS if s in wanted]
+
+def _timeout(arg: str | None) -> float:
+    try:
+        t = float(arg) if arg else SECTION_TIMEOUT
+    except ValueError:
+        t = SECTION_TIMEOUT
+    return min(max(t, 0.1), SECTION_TIMEOUT_MAX)
+
+def _section(name: str) -> tuple[dict, dict]:
+    mod = SECTIONS[name]
+    return cached_payload(mod.CACHE_KEY, mod.build_payload, mod.TTL)
+
+def fetch_sections(names: list[str], timeout: float) -> tuple[dict, dict]:
+    """Lit / construit les sections en parallèle ; renvoie ({nom: (payload, meta)}, erreurs)."""
+    futures = {_POOL.submit(_section, n): n for n in names}
+    done, _late = wait(futures, timeout=timeout)
+    results, errors = {}, {}
+    for f, name in futures.items():
+        if f not in done:
+            errors[name] = f"timeout ({timeout:g}s)"
+            continue
+        try:
+            results[name] = f.result()
+        except Exception as e:
+            errors[name] = str(e)
+    return results, errors
+
+def project_sections(results: dict, projection=NO_PROJECTION) -> dict:
+    """{nom: (payload, meta)} -> {nom: payload projeté} (Flask et ASGI)."""
+    return {n: projected(SECTIONS[n].CACHE_KEY, payload, projection) for n, (payload, _meta) in results.items()}
+
+# clé -> (payloads des sections, erreurs, corps) : même corps (donc mêmes octets encodés et
+# même ETag) tant que les sections en cache ne changent pas
+_BODIES: dict[str, tuple[tuple, dict, dict]] = {}
+_BODIES_LOCK = threading.Lock()
+
+def sections_payload(names: list[str], results: dict, errors: dict, projection=NO_PROJECTION) -> tuple[str, dict, dict]:
+    """
+    (clé, corps, meta) de /infos-all (Flask et ASGI). Le corps ne contient que les payloads
+    (projetés) : les métadonnées de chaque section passent dans meta["sections"], pour que
+    l'ETag ne suive que les données.
+    """
+    key = cache_key("infos-all", {"sections": names})
+    if projection != NO_PROJECTION:
+        key = f"{key}#{json.dumps(projection)}"
+    if errors:
+        key = f"{key}#partiel"
+    ready = [n for n in names if n in results]
+    sources = tuple(results[n][0] for n in ready)
+    with _BODIES_LOCK:
+        memo = _BODIES.get(key)
+    if memo is not None and memo[1] == errors and len(memo[0]) == len(sources) \
+            and all(a is b for a, b in zip(memo[0], sources)):
+        body = memo[2]
+    else:
+        sections = project_sections({n: results[n] for n in ready}, projection)
+        body = {"sections": {n: sections[n] for n in ready}}
+        if errors:
+            body["erreurs"] = errors
+        with _BODIES_LOCK:
+            _BODIES[key] = (sources, dict(errors), body)
+    meta = merged_meta([results[n][1] for n in ready])
+    meta["sections"] = {n: results[n][1] for n in ready}
+    return key, body, meta
+
+@bp.get("/infos-all")
+def infos_all():
+    names = _selected_sections(request.args.get("sections"))
+    if not names:
+        return jsonify({"erreur": "aucune section valide", "sections_disponibles": list(SECTIONS)}), 400
+    results, errors = fetch_sections(names, _timeout(request.args.get("timeout")))
+    if not results:
+        return jsonify({"sections": {}, "erreurs": errors}), 503
+    # ?fields= / ?compact s'appliquent à chaque section (chemins relatifs au payload de la section)
+    key, body, meta = sections_payload(names, results, errors, request_projection())
+    return json_response(key, body, meta, args={})
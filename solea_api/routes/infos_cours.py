@@ -2,14 +2,19 @@
 from flask import Blueprint, jsonify, request
 import re
 from ..utils import (
-    fetch_html, soup_from_html, normalize_text,
-    cache_key, cache_get, cache_set, cache_meta,
+    fetch_and_build, Page, normalize_text, extract_block_lines,
+    cache_key, cached_payload, json_response,
     remplacer_h_par_heure, sanitize_for_voice,
 )
+from ..refresh import register
+from ..aio import fetch_and_build_async
 
 bp = Blueprint("infos_cours", __name__)
 
 SRC = "https://www.centresolea.org/horaires-et-tarifs"
+CACHE_PARAMS: tuple[str, ...] = ()   # paramètres de requête qui comptent dans la clé (aucun : payload unique)
+CACHE_KEY = cache_key("infos-cours")
+TTL = 60
 
 # =========================
 # Regex de base (jours/heures)
@@ -212,178 +217,162 @@ def parse_structured_horaires(all_lines):
 
     return horaires
 
+def _payload_from_page(page: Page) -> dict:
+    # =========================
+    # 0) Normalisation du texte (page déjà téléchargée)
+    # =========================
+    soup = page.soup
+
+    # Lignes à plat (une par bloc/ligne de texte, tableaux en "a | b"), dédupliquées
+    seen_line, lines = set(), []
+    for l in extract_block_lines(soup):
+        if l not in seen_line:
+            seen_line.add(l)
+            lines.append(l)
+
+    # =========================
+    # 1) HORAIRES — Parse structuré (sections)
+    # =========================
+    horaires = parse_structured_horaires(lines)
+
+    # =========================
+    # 1.b) RÈGLES MÉTIER de sécurité
+    # =========================
+    def is_sevi(danse: str) -> bool:
+        return "sevillan" in (danse or "").lower() or "sévillan" in (danse or "").lower()
+
+    def is_flamenco(danse: str) -> bool:
+        return "flamenco" in (danse or "").lower()
+
+    def apply_business_rules(h):
+        # Flamenco Enfants/Ados : pas de "Technique"
+        if is_flamenco(h.get("danse")) and h.get("public") in {"Enfants", "Ados", "T’CAP"}:
+            if h.get("niveau", "").lower() == "technique":
+                h["niveau"] = ""
+
+        # Sévillane : pas de public ; niveau seulement Débutants / Avancés
+        if is_sevi(h.get("danse")):
+            h["public"] = ""
+            if h.get("niveau") not in {"Débutants", "Avancés"}:
+                h["niveau"] = ""
+
+        return h
+
+    horaires = [apply_business_rules(dict(h)) for h in horaires]
+
+    # (Option) filtre conservé contre un faux-poste connu
+    def _is_flamenco_debutants_adultes_vendredi(item: dict) -> bool:
+        jour   = (item.get("jour") or "").strip()
+        danse  = (item.get("danse") or "").lower()
+        public = (item.get("public") or "").lower()
+        niveau = (item.get("niveau") or "").lower()
+        return (
+            jour == "Vendredi"
+            and "flamenco" in danse
+            and "adulte" in public
+            and ("début" in niveau or "debut" in niveau)
+        )
+    horaires = [h for h in horaires if not _is_flamenco_debutants_adultes_vendredi(h)]
+
+    # =========================
+    # 2) TARIFS (identique à avant)
+    # =========================
+    tarifs_par_nb = {}
+    tarifs_lignes = []
+    tarifs_categories = {"adherents": [], "eleves": [], "non_adherents": []}
+    conditions_reduites, modalites_paiement = [], []
+
+    in_tarifs_block = False
+    for l in lines:
+        if RE_TARIFS_HEADER.match(l):
+            in_tarifs_block = True
+            continue
+        if in_tarifs_block and not RE_PRICE_LINE.search(l):
+            in_tarifs_block = False
+
+        if RE_PRICE_LINE.search(l):
+            tarifs_lignes.append(l)
+            for cat, prix in RE_TARIFS_CATEGORIES.findall(l):
+                cat_low = cat.lower()
+                price_fmt = f"{prix.replace(' ', '')} €"
+                if "non" in cat_low and "adh" in cat_low:
+                    if price_fmt not in tarifs_categories["non_adherents"]:
+                        tarifs_categories["non_adherents"].append(price_fmt)
+                elif "adh" in cat_low:
+                    if price_fmt not in tarifs_categories["adherents"]:
+                        tarifs_categories["adherents"].append(price_fmt)
+                elif "lèv" in cat_low or "élè" in cat_low or "eleve" in cat_low:
+                    if price_fmt not in tarifs_categories["eleves"]:
+                        tarifs_categories["eleves"].append(price_fmt)
+
+            if in_tarifs_block:
+                m_pair = RE_PAIR_NR.match(l)
+                if m_pair:
+                    normal = m_pair.group(1).replace(" ", "")
+                    reduit = m_pair.group(2).replace(" ", "")
+                    idx = len(tarifs_par_nb) + 1
+                    nb = str(idx)
+                    tarifs_par_nb.setdefault(nb, {})
+                    tarifs_par_nb[nb]["normal"] = f"{normal} €"
+                    tarifs_par_nb[nb]["reduit"] = f"{reduit} €"
+
+        if RE_REDUIT_BLOCK.search(l) and "€" not in l and l not in conditions_reduites:
+            conditions_reduites.append(l)
+        if RE_PAY.search(l) and "€" not in l and l not in modalites_paiement:
+            modalites_paiement.append(l)
+
+    # Adhésion annuelle
+    full_txt = "\n".join(lines)
+    m_ad = RE_ADHESION.search(full_txt)
+    adhesion = f"{m_ad.group(1)} €" if m_ad else ""
+
+    # Niveaux Sévillane (synthèse informative)
+    niveaux_sevillane = []
+    for l in lines:
+        if re.search(r"s[ée]villan", l, re.IGNORECASE) and RE_SEVI_LEVEL.match(l):
+            lvl = canon_level(l)
+            if lvl in {"Débutants", "Avancés"} and lvl not in niveaux_sevillane:
+                niveaux_sevillane.append(lvl)
+
+    # =========================
+    # Version "vocale" des horaires
+    # =========================
+    horaires_vocal = []
+    for h in horaires:
+        extra_parts = [x for x in [h["danse"], h["public"], h["niveau"]] if x]
+        extra = " ".join(extra_parts)
+        lead = f"Voici les horaires pour {extra} : " if extra else "Voici les horaires : "
+        phrase = f"{lead}{h['jour']} {h['heures_vocal']}"
+        horaires_vocal.append(sanitize_for_voice(phrase))
+
+    payload = {
+        "source": SRC,
+        "adhesion": adhesion,
+        "horaires": horaires,
+        "horaires_vocal": horaires_vocal,
+        "tarifs_par_nb_cours": tarifs_par_nb,
+        "tarifs_lignes": tarifs_lignes,
+        "tarifs_categories": tarifs_categories,
+        "conditions_reduites": conditions_reduites,
+        "modalites_paiement": modalites_paiement,
+        "niveaux_sevillane": niveaux_sevillane
+    }
+    return payload
+
+def build_payload() -> dict:
+    return fetch_and_build(SRC, _payload_from_page)
+
+async def build_payload_async() -> dict:
+    """Même payload, GET amont non bloquant (point d'entrée ASGI, main.py)."""
+    return await fetch_and_build_async(SRC, _payload_from_page)
+
+register("infos-cours", CACHE_KEY, build_payload, TTL)
+
 @bp.get("/infos-cours")
 def infos_cours():
-    key = cache_key("infos-cours", request.args.to_dict(flat=True))
-    entry = cache_get(key)
-
     try:
-        # =========================
-        # 0) Récupération & normalisation du texte
-        # =========================
-        html = fetch_html(SRC)
-        soup = soup_from_html(html)
-
-        text_blocks = []
-        for sel in ['[data-hook="richTextElement"]', '[class*="richText"]']:
-            for el in soup.select(sel):
-                t = normalize_text(el.get_text("\n", strip=True))
-                if t:
-                    text_blocks.append(t)
-        for el in soup.find_all(["h2", "h3", "h4", "p", "li"]):
-            t = normalize_text(el.get_text("\n", strip=True))
-            if t:
-                text_blocks.append(t)
-        for table in soup.find_all("table"):
-            rows = []
-            for tr in table.find_all("tr"):
-                cells = [normalize_text(td.get_text(" ", strip=True)) for td in tr.find_all(["td", "th"])]
-                row = " | ".join([c for c in cells if c])
-                if row:
-                    rows.append(row)
-            if rows:
-                text_blocks.append("\n".join(rows))
-
-        # Lignes à plat (dédupliquées, vides enlevées)
-        seen_line, lines = set(), []
-        for block in text_blocks:
-            for l in re.split(r"\n+", block):
-                l2 = normalize_text(l)
-                if l2 and l2 not in seen_line:
-                    seen_line.add(l2)
-                    lines.append(l2)
-
-        # =========================
-        # 1) HORAIRES — Parse structuré (sections)
-        # =========================
-        horaires = parse_structured_horaires(lines)
-
-        # =========================
-        # 1.b) RÈGLES MÉTIER de sécurité
-        # =========================
-        def is_sevi(danse: str) -> bool:
-            return "sevillan" in (danse or "").lower() or "sévillan" in (danse or "").lower()
-
-        def is_flamenco(danse: str) -> bool:
-            return "flamenco" in (danse or "").lower()
-
-        def apply_business_rules(h):
-            # Flamenco Enfants/Ados : pas de "Technique"
-            if is_flamenco(h.get("danse")) and h.get("public") in {"Enfants", "Ados", "T’CAP"}:
-                if h.get("niveau", "").lower() == "technique":
-                    h["niveau"] = ""
-
-            # Sévillane : pas de public ; niveau seulement Débutants / Avancés
-            if is_sevi(h.get("danse")):
-                h["public"] = ""
-                if h.get("niveau") not in {"Débutants", "Avancés"}:
-                    h["niveau"] = ""
-
-            return h
-
-        horaires = [apply_business_rules(dict(h)) for h in horaires]
-
-        # (Option) filtre conservé contre un faux-poste connu
-        def _is_flamenco_debutants_adultes_vendredi(item: dict) -> bool:
-            jour   = (item.get("jour") or "").strip()
-            danse  = (item.get("danse") or "").lower()
-            public = (item.get("public") or "").lower()
-            niveau = (item.get("niveau") or "").lower()
-            return (
-                jour == "Vendredi"
-                and "flamenco" in danse
-                and "adulte" in public
-                and ("début" in niveau or "debut" in niveau)
-            )
-        horaires = [h for h in horaires if not _is_flamenco_debutants_adultes_vendredi(h)]
-
-        # =========================
-        # 2) TARIFS (identique à avant)
-        # =========================
-        tarifs_par_nb = {}
-        tarifs_lignes = []
-        tarifs_categories = {"adherents": [], "eleves": [], "non_adherents": []}
-        conditions_reduites, modalites_paiement = [], []
-
-        in_tarifs_block = False
-        for l in lines:
-            if RE_TARIFS_HEADER.match(l):
-                in_tarifs_block = True
-                continue
-            if in_tarifs_block and not RE_PRICE_LINE.search(l):
-                in_tarifs_block = False
-
-            if RE_PRICE_LINE.search(l):
-                tarifs_lignes.append(l)
-                for cat, prix in RE_TARIFS_CATEGORIES.findall(l):
-                    cat_low = cat.lower()
-                    price_fmt = f"{prix.replace(' ', '')} €"
-                    if "non" in cat_low and "adh" in cat_low:
-                        if price_fmt not in tarifs_categories["non_adherents"]:
-                            tarifs_categories["non_adherents"].append(price_fmt)
-                    elif "adh" in cat_low:
-                        if price_fmt not in tarifs_categories["adherents"]:
-                            tarifs_categories["adherents"].append(price_fmt)
-                    elif "lèv" in cat_low or "élè" in cat_low or "eleve" in cat_low:
-                        if price_fmt not in tarifs_categories["eleves"]:
-                            tarifs_categories["eleves"].append(price_fmt)
-
-                if in_tarifs_block:
-                    m_pair = RE_PAIR_NR.match(l)
-                    if m_pair:
-                        normal = m_pair.group(1).replace(" ", "")
-                        reduit = m_pair.group(2).replace(" ", "")
-                        idx = len(tarifs_par_nb) + 1
-                        nb = str(idx)
-                        tarifs_par_nb.setdefault(nb, {})
-                        tarifs_par_nb[nb]["normal"] = f"{normal} €"
-                        tarifs_par_nb[nb]["reduit"] = f"{reduit} €"
-
-            if RE_REDUIT_BLOCK.search(l) and "€" not in l and l not in conditions_reduites:
-                conditions_reduites.append(l)
-            if RE_PAY.search(l) and "€" not in l and l not in modalites_paiement:
-                modalites_paiement.append(l)
-
-        # Adhésion annuelle
-        full_txt = "\n".join(lines)
-        m_ad = RE_ADHESION.search(full_txt)
-        adhesion = f"{m_ad.group(1)} €" if m_ad else ""
-
-        # Niveaux Sévillane (synthèse informative)
-        niveaux_sevillane = []
-        for l in lines:
-            if re.search(r"s[ée]villan", l, re.IGNORECASE) and RE_SEVI_LEVEL.match(l):
-                lvl = canon_level(l)
-                if lvl in {"Débutants", "Avancés"} and lvl not in niveaux_sevillane:
-                    niveaux_sevillane.append(lvl)
-
-        # =========================
-        # Version "vocale" des horaires
-        # =========================
-        horaires_vocal = []
-        for h in horaires:
-            extra_parts = [x for x in [h["danse"], h["public"], h["niveau"]] if x]
-            extra = " ".join(extra_parts)
-            lead = f"Voici les horaires pour {extra} : " if extra else "Voici les horaires : "
-            phrase = f"{lead}{h['jour']} {h['heures_vocal']}"
-            horaires_vocal.append(sanitize_for_voice(phrase))
-
-        payload = {
-            "source": SRC,
-            "adhesion": adhesion,
-            "horaires": horaires,
-            "horaires_vocal": horaires_vocal,
-            "tarifs_par_nb_cours": tarifs_par_nb,
-            "tarifs_lignes": tarifs_lignes,
-            "tarifs_categories": tarifs_categories,
-            "conditions_reduites": conditions_reduites,
-            "modalites_paiement": modalites_paiement,
-            "niveaux_sevillane": niveaux_sevillane
-        }
-        cache_set(key, payload, ttl_seconds=60)
-        return jsonify({**payload, "cache": cache_meta(True, entry)})
-
+        key = cache_key("infos-cours", request.args.to_dict(flat=True), allowed=CACHE_PARAMS)
+        payload, meta = cached_payload(key, build_payload, TTL)
+        return json_response(key, payload, meta)
     except Exception as e:
-        if entry:
-            return jsonify({**entry["data"], "cache": cache_meta(False, entry)})
         return jsonify({"erreur": str(e)}), 500
@@ -0,0 +1,62 @@
+# solea_api/routes/infos_events.py
+from flask import Blueprint, jsonify, request
+import threading
+
+from ..utils import cache_key, json_response, merged_meta
+from ..events import event_store, parse_query, filtered_payload
+from .infos_all import SECTIONS, SECTION_TIMEOUT, fetch_sections
+
+bp = Blueprint("infos_events", __name__)
+
+# sections qui alimentent le store unifié (chacune expose to_events). Les routes par source
+# gardent leur format : elles servent les payloads en cache dont le store est construit,
+# si bien qu'un cycle de rafraîchissement (un scrape par page) alimente tous les consommateurs.
+SOURCES = ("agenda", "stage", "tablao")
+CACHE_KEY = cache_key("events")
+
+EVENT_INDEX = {
+    "field": "evenements",
+    "start_of": lambda e: e.get("date_start"),
+    "end_of": lambda e: e.get("date_end"),
+    "type_of": lambda e: e.get("type"),
+}
+
+# (événements du store) -> payload : même objet tant que le store ne change pas
+_PAYLOAD: dict = {"events": None, "payload": None}
+_PAYLOAD_LOCK = threading.Lock()
+
+def _payload(events: list[dict], errors: dict) -> dict:
+    if not errors:
+        with _PAYLOAD_LOCK:
+            if _PAYLOAD["events"] is events:
+                return _PAYLOAD["payload"]
+    payload = {"sources": [s for s in SOURCES if s not in errors], "count": len(events), "evenements": events}
+    if errors:
+        return {**payload, "erreurs": errors}
+    with _PAYLOAD_LOCK:
+        _PAYLOAD["events"], _PAYLOAD["payload"] = events, payload
+    return payload
+
+def events_payload(results: dict, errors: dict) -> tuple[str, dict, dict]:
+    """(clé, payload, meta) du store unifié depuis les sections lues (Flask et ASGI)."""
+    store = event_store([(n, results[n][0], SECTIONS[n].to_events) for n in SOURCES if n in results])
+    key = CACHE_KEY if not errors else f"{CACHE_KEY}#partiel"
+    return key, _payload(store, errors), merged_meta([m for _, m in results.values()])
+
+@bp.get("/events")
+def events():
+    # paramètres invalides → 400 ; une erreur de construction (même ValueError) → 500
+    try:
+        query = parse_query(request.args)   # ?from= &to= &type= &limit= &next=
+    except ValueError as e:
+        return jsonify({"erreur": str(e)}), 400
+    try:
+        results, errors = fetch_sections(list(SOURCES), SECTION_TIMEOUT)
+        if not results:
+            return jsonify({"erreur": "aucune source disponible", "erreurs": errors}), 503
+        key, payload, meta = events_payload(results, errors)
+        if query:
+            key, payload = filtered_payload(key, payload, query, **EVENT_INDEX)
+        return json_response(key, payload, meta)
+    except Exception as e:
+        return jsonify({"erreur": str(e)}), 500
@@ -1,14 +1,23 @@
 # solea_api/routes/infos_stage.py
-from flask import Blueprint, jsonify
+from flask import Blueprint, Response, jsonify, request
+from werkzeug.datastructures import MIMEAccept
+from werkzeug.http import parse_accept_header
 import re
-import requests
 from datetime import datetime
 from zoneinfo import ZoneInfo
 from bs4 import BeautifulSoup
 
+from ..utils import fetch_and_build, Page, cache_key, cached_payload, json_response, extract_block_lines
+from ..refresh import register
+from ..aio import fetch_and_build_async
+from ..events import make_event
+
 bp = Blueprint("infos_stage", __name__)
 SRC = "https://www.centresolea.org/stages"
 TZ = ZoneInfo("Europe/Madrid")
+CACHE_PARAMS: tuple[str, ...] = ()   # paramètres de requête qui comptent dans la clé (aucun : payload unique)
+CACHE_KEY = cache_key("infos-stage")
+TTL = 180
 
 # ---------------- Utils texte ----------------
 def normalize_text(s: str) -> str:
@@ -197,15 +206,9 @@ def detect_date_block(s: str):
         return fmt_date(y, safe_int(mo), d), ""
     return "", ""
 
-def extract_lines(html: str):
-    soup = BeautifulSoup(html, "lxml")
-    for tag in soup(["script","style","noscript","iframe","svg"]):
-        tag.decompose()
-    lines = []
-    for el in soup.find_all(["h1","h2","h3","h4","p","li","span","div"]):
-        t = normalize_text(el.get_text(" ", strip=True))
-        if t:
-            lines.append(t)
+def extract_lines(soup: BeautifulSoup):
+    # une ligne par bloc de texte (pas de re-extraction du texte à chaque div ancêtre)
+    lines = extract_block_lines(soup)
     # dédoublonner immédiat
     dedup, prev = [], None
     for t in lines:
@@ -214,134 +217,202 @@ def extract_lines(html: str):
         prev = t
     return dedup
 
-# ---------------- Endpoint ----------------
-@bp.get("/infos-stage")
-def infos_stage():
-    try:
-        r = requests.get(SRC, timeout=12)
-        r.raise_for_status()
-        lines = extract_lines(r.text)
-
-        items = []
-        current = None
-
-        for raw in lines:
-            line = raw.strip()
-
-            if is_noise(line):
-                continue
-
-            # Démarrage d'un nouveau bloc UNIQUEMENT sur mot-clé
-            if KEYWORDS.search(line):
-                # Finaliser le précédent si non vide
-                if current and any([current.get("date"), current.get("date_fin"),
-                                    current["heures"], current["tarifs"], current.get("description")]):
-                    current["titre_vocal"] = tts_jota(current.get("titre",""))
-                    if current.get("description"):
-                        current["description_vocal"] = tts_jota(heure_vocale(current["description"]))
-                    # vocaliser les heures (élément par élément)
-                    current["heures_vocal"] = [heure_vocale(h) for h in current["heures"]]
-                    # date_spoken propre
-                    if current.get("date") and current.get("date_fin"):
-                        current["date_spoken"] = f"du {spoken_date(current['date'])} au {spoken_date(current['date_fin'])}"
-                    elif current.get("date"):
-                        current["date_spoken"] = spoken_date(current["date"])
-                    items.append(current)
-
-                # Nouveau bloc
-                d1, d2 = detect_date_block(line)
-                titre = line
-                # si la date est sur la même ligne, l’enlever du titre
-                if d1 or d2:
-                    # retirer le premier motif de date de la ligne
-                    titre = re.sub(rf"(?i)\bdu\s+\d{{1,2}}\s+au\s+\d{{1,2}}\s+{MONTH_WORD}(?:\s+\d{{4}})?\b", "", titre)
-                    titre = re.sub(rf"(?i)\b\d{{1,2}}\s+et\s+\d{{1,2}}\s+{MONTH_WORD}(?:\s+\d{{4}})?\b", "", titre)
-                    titre = re.sub(rf"(?i)\b\d{{1,2}}\s+{MONTH_WORD}(?:\s+\d{{4}})?\b", "", titre)
-                    titre = re.sub(r"(?i)\b\d{1,2}[\/\-.]\d{1,2}(?:[\/\-.]\d{2,4})?\b", "", titre)
-                    titre = titre.strip(" ,;:.-")
-
-                typ = classify_type(titre or line)
-                current = {
-                    "type": typ,
-                    "titre": titre[:240] if titre else typ.title(),
-                    "date": d1,
-                    "date_fin": d2,
-                    "date_spoken": "",
-                    "heures": [],
-                    "heures_vocal": [],
-                    "tarifs": [],
-                    "description": "",
-                    "sessions": []  # dates additionnelles (listes type "21 septembre", etc.)
-                }
-                continue
-
-            # Si pas de bloc en cours, ignorer la ligne
-            if not current:
-                continue
-
-            # Dans un bloc : chercher dates → remplir ou pousser en sessions
+# ---------------- Payload ----------------
+def _payload_from_page(page: Page) -> dict:
+    lines = extract_lines(page.soup)
+
+    items = []
+    current = None
+
+    for raw in lines:
+        line = raw.strip()
+
+        if is_noise(line):
+            continue
+
+        # Démarrage d'un nouveau bloc UNIQUEMENT sur mot-clé
+        if KEYWORDS.search(line):
+            # Finaliser le précédent si non vide
+            if current and any([current.get("date"), current.get("date_fin"),
+                                current["heures"], current["tarifs"], current.get("description")]):
+                current["titre_vocal"] = tts_jota(current.get("titre",""))
+                if current.get("description"):
+                    current["description_vocal"] = tts_jota(heure_vocale(current["description"]))
+                # vocaliser les heures (élément par élément)
+                current["heures_vocal"] = [heure_vocale(h) for h in current["heures"]]
+                # date_spoken propre
+                if current.get("date") and current.get("date_fin"):
+                    current["date_spoken"] = f"du {spoken_date(current['date'])} au {spoken_date(current['date_fin'])}"
+                elif current.get("date"):
+                    current["date_spoken"] = spoken_date(current["date"])
+                items.append(current)
+
+            # Nouveau bloc
             d1, d2 = detect_date_block(line)
+            titre = line
+            # si la date est sur la même ligne, l’enlever du titre
             if d1 or d2:
-                if not current["date"]:
-                    current["date"] = d1
-                elif not current["date_fin"] and d2:
-                    current["date_fin"] = d2
+                # retirer le premier motif de date de la ligne
+                titre = re.sub(rf"(?i)\bdu\s+\d{{1,2}}\s+au\s+\d{{1,2}}\s+{MONTH_WORD}(?:\s+\d{{4}})?\b", "", titre)
+                titre = re.sub(rf"(?i)\b\d{{1,2}}\s+et\s+\d{{1,2}}\s+{MONTH_WORD}(?:\s+\d{{4}})?\b", "", titre)
+                titre = re.sub(rf"(?i)\b\d{{1,2}}\s+{MONTH_WORD}(?:\s+\d{{4}})?\b", "", titre)
+                titre = re.sub(r"(?i)\b\d{1,2}[\/\-.]\d{1,2}(?:[\/\-.]\d{2,4})?\b", "", titre)
+                titre = titre.strip(" ,;:.-")
+
+            typ = classify_type(titre or line)
+            current = {
+                "type": typ,
+                "titre": titre[:240] if titre else typ.title(),
+                "date": d1,
+                "date_fin": d2,
+                "date_spoken": "",
+                "heures": [],
+                "heures_vocal": [],
+                "tarifs": [],
+                "description": "",
+                "sessions": []  # dates additionnelles (listes type "21 septembre", etc.)
+            }
+            continue
+
+        # Si pas de bloc en cours, ignorer la ligne
+        if not current:
+            continue
+
+        # Dans un bloc : chercher dates → remplir ou pousser en sessions
+        d1, d2 = detect_date_block(line)
+        if d1 or d2:
+            if not current["date"]:
+                current["date"] = d1
+            elif not current["date_fin"] and d2:
+                current["date_fin"] = d2
+            else:
+                # dates additionnelles (sessions)
+                if d2:
+                    current["sessions"].append({"date": d1, "date_fin": d2})
                 else:
-                    # dates additionnelles (sessions)
-                    if d2:
-                        current["sessions"].append({"date": d1, "date_fin": d2})
-                    else:
-                        current["sessions"].append({"date": d1})
-                continue
-
-            # Heures → en petites unités propres
-            hrs = heures_from_line(line)
-            if hrs:
-                for h in hrs:
-                    if h not in current["heures"]:
-                        current["heures"].append(h)
-                continue
-
-            # Tarifs
-            if RE_TARIF_LINE.search(line) or (RE_PRICE_ANY.search(line) and len(line) < 220):
-                if line not in current["tarifs"]:
-                    current["tarifs"].append(line)
-                continue
-
-            # Description
-            if not is_noise(line):
-                if len(current["description"]) < 1000:
-                    current["description"] = (current["description"] + " " + line).strip()
-
-        # Finaliser le dernier bloc
-        if current and any([current.get("date"), current.get("date_fin"),
-                            current["heures"], current["tarifs"], current.get("description")]):
-            current["titre_vocal"] = tts_jota(current.get("titre",""))
-            if current.get("description"):
-                current["description_vocal"] = tts_jota(heure_vocale(current["description"]))
-            current["heures_vocal"] = [heure_vocale(h) for h in current["heures"]]
-            if current.get("date") and current.get("date_fin"):
-                current["date_spoken"] = f"du {spoken_date(current['date'])} au {spoken_date(current['date_fin'])}"
-            elif current.get("date"):
-                current["date_spoken"] = spoken_date(current["date"])
-            items.append(current)
-
-        # Nettoyage / filtrage final
-        cleaned = []
-        seen = set()
-        for it in items:
-            # garder seulement les blocs avec type reconnu ET (date|heures|tarifs)
-            if it["type"] not in {"stage","master class","atelier","atelier d'immersion","evenement"}:
-                continue
-            if not (it.get("date") or it.get("date_fin") or it["heures"] or it["tarifs"]):
-                continue
-            key = (it["type"], it.get("titre","")[:160], it.get("date",""), it.get("date_fin",""))
-            if key in seen:
-                continue
-            seen.add(key)
-            cleaned.append(it)
-
-        return jsonify({"source": SRC, "count": len(cleaned), "items": cleaned})
+                    current["sessions"].append({"date": d1})
+            continue
+
+        # Heures → en petites unités propres
+        hrs = heures_from_line(line)
+        if hrs:
+            for h in hrs:
+                if h not in current["heures"]:
+                    current["heures"].append(h)
+            continue
+
+        # Tarifs
+        if RE_TARIF_LINE.search(line) or (RE_PRICE_ANY.search(line) and len(line) < 220):
+            if line not in current["tarifs"]:
+                current["tarifs"].append(line)
+            continue
+
+        # Description
+        if not is_noise(line):
+            if len(current["description"]) < 1000:
+                current["description"] = (current["description"] + " " + line).strip()
+
+    # Finaliser le dernier bloc
+    if current and any([current.get("date"), current.get("date_fin"),
+                        current["heures"], current["tarifs"], current.get("description")]):
+        current["titre_vocal"] = tts_jota(current.get("titre",""))
+        if current.get("description"):
+            current["description_vocal"] = tts_jota(heure_vocale(current["description"]))
+        current["heures_vocal"] = [heure_vocale(h) for h in current["heures"]]
+        if current.get("date") and current.get("date_fin"):
+            current["date_spoken"] = f"du {spoken_date(current['date'])} au {spoken_date(current['date_fin'])}"
+        elif current.get("date"):
+            current["date_spoken"] = spoken_date(current["date"])
+        items.append(current)
+
+    # Nettoyage / filtrage final
+    cleaned = []
+    seen = set()
+    for it in items:
+        # garder seulement les blocs avec type reconnu ET (date|heures|tarifs)
+        if it["type"] not in {"stage","master class","atelier","atelier d'immersion","evenement"}:
+            continue
+        if not (it.get("date") or it.get("date_fin") or it["heures"] or it["tarifs"]):
+            continue
+        key = (it["type"], it.get("titre","")[:160], it.get("date",""), it.get("date_fin",""))
+        if key in seen:
+            continue
+        seen.add(key)
+        cleaned.append(it)
+
+    return {"source": SRC, "count": len(cleaned), "items": cleaned}
+
+def build_payload() -> dict:
+    return fetch_and_build(SRC, _payload_from_page)
+
+async def build_payload_async() -> dict:
+    """Même payload, GET amont non bloquant (point d'entrée ASGI, main.py)."""
+    return await fetch_and_build_async(SRC, _payload_from_page)
+
+register("infos-stage", CACHE_KEY, build_payload, TTL)
+
+def to_events(payload: dict) -> list[dict]:
+    """Événements normalisés (store unifié) : un par session quand le stage en a plusieurs."""
+    out = []
+    for it in payload.get("items", []):
+        sessions = it.get("sessions") or [{"date": it.get("date"), "date_fin": it.get("date_fin")}]
+        for s in sessions:
+            out.append(make_event("stage", it.get("titre", ""), s.get("date"), s.get("date_fin"),
+                                  type=it.get("type"), heure=", ".join(it.get("heures", [])),
+                                  description=it.get("description", "")))
+    return out
+
+def request_cache_key() -> str:
+    return cache_key("infos-stage", request.args.to_dict(flat=True), allowed=CACHE_PARAMS)
+
+def wants_plain_text(accept: str | None) -> bool:
+    """Le client (voicebot) préfère text/plain à JSON ; Accept absent ou */* → JSON."""
+    best = parse_accept_header(accept or None, MIMEAccept).best_match(("application/json", "text/plain"))
+    return best == "text/plain"
+
+def plain_text_headers(meta: dict) -> dict:
+    return {
+        "Content-Type": "text/plain; charset=utf-8",
+        "X-Cache-Fresh": "true" if meta["fresh"] else "false",
+        "X-Cache-Age": str(meta["age_seconds"]),
+        "Vary": "Accept, Accept-Encoding",
+    }
+
+def plain_text_error(error: Exception) -> tuple[str, dict]:
+    """Erreur au format négocié : texte lisible par le voicebot plutôt qu'un JSON."""
+    headers = {"Content-Type": "text/plain; charset=utf-8", "Vary": "Accept, Accept-Encoding"}
+    return f"Les stages sont indisponibles pour le moment ({error}).", headers
+
+def render_plain_text(payload: dict) -> str:
+    """Version texte (voicebot) rendue depuis le parse structuré : un paragraphe par stage."""
+    blocks = []
+    for it in payload.get("items", []):
+        lines = [it.get("titre", "")]
+        if it.get("date_spoken") or it.get("date"):
+            lines.append(f"Dates : {it.get('date_spoken') or it.get('date')}")
+        if it.get("heures"):
+            lines.append("Horaires : " + ", ".join(it["heures"]))
+        lines.extend(it.get("tarifs", []))
+        if it.get("description"):
+            lines.append(it["description"])
+        blocks.append("\n".join(l for l in lines if l))
+    return normalize_text("\n\n".join(blocks))
 
+# ---------------- Endpoint ----------------
+@bp.get("/infos-stage")
+def infos_stage():
+    # même URL, même cache et même parse : texte pour le voicebot (Accept: text/plain), JSON sinon
+    plain = wants_plain_text(request.headers.get("Accept"))
+    try:
+        key = request_cache_key()
+        payload, meta = cached_payload(key, build_payload, TTL)
+        if plain:
+            return Response(render_plain_text(payload), headers=plain_text_headers(meta))
+        resp = json_response(key, payload, meta)
+        resp.headers["Vary"] = "Accept, Accept-Encoding"
+        return resp
     except Exception as e:
+        if plain:
+            body, headers = plain_text_error(e)
+            return Response(body, status=500, headers=headers)
         return jsonify({"source": SRC, "error": str(e)}), 500
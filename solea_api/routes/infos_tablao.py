@@ -1,21 +1,36 @@
 # solea_api/routes/infos_tablao.py
 from flask import Blueprint, jsonify, request
+import asyncio
+import os
 import re
+from concurrent.futures import ThreadPoolExecutor, wait
 from datetime import date, datetime, timedelta, timezone
 from urllib.parse import urljoin
 from bs4 import NavigableString
 
 from ..utils import (
-    fetch_html, soup_from_html, normalize_text, sanitize_for_voice,
+    fetch_and_build, Page, normalize_text, sanitize_for_voice,
     extract_time_from_text, ddmmyyyy_to_spoken,
-    cache_key, cache_get, cache_set, cache_meta, remplacer_h_par_heure
+    cache_key, cached_payload, json_response, classify_type, remplacer_h_par_heure
 )
+from ..refresh import register
+from ..aio import fetch_and_build_async, cached_payload_async
+from ..events import parse_query, filtered_payload, make_event
 
 bp = Blueprint("infos_tablao", __name__)
 
 BASE = "https://www.centresolea.org"
 SRC  = f"{BASE}/"  # on part de la home et on suit les liens /events/… contenant “tablao”
+CACHE_PARAMS: tuple[str, ...] = ()   # paramètres de requête qui comptent dans la clé (aucun : payload unique)
+CACHE_KEY = cache_key("infos-tablao")
+TTL = 180
 
+# Pages /events/… téléchargées en parallèle (pool borné) avec une échéance par lot
+EVENT_WORKERS = int(os.environ.get("SOLEA_TABLAO_WORKERS", "6"))
+EVENT_DEADLINE = float(os.environ.get("SOLEA_TABLAO_DEADLINE", "8"))
+_EVENT_POOL = ThreadPoolExecutor(max_workers=EVENT_WORKERS, thread_name_prefix="solea-tablao")
+# Cache par page événement, indépendant de la liste (revalidée par ETag/Last-Modified à expiration)
+EVENT_TTL = int(os.environ.get("SOLEA_TABLAO_EVENT_TTL", str(6 * 3600)))
 
 def _nz(s):
     return s if isinstance(s, str) else ""
@@ -140,13 +155,36 @@ def _parse_event_page(url: str):
     """
     Retourne (titre, dates[], heure, lieu) pour une page /events/… Wix.
     On s'appuie sur le bloc “Heure et lieu” qui contient toujours la date avec l'année.
+    Résultat mis en cache par URL (EVENT_TTL) : une page publiée ne change presque jamais.
     """
+    key = cache_key("tablao-event", {"url": url})
+
+    def build():
+        titre, dates, hr, lieu = fetch_and_build(url, _parse_event_doc)
+        return {"titre": titre, "dates": dates, "heure": hr, "lieu": lieu}
+
+    try:
+        ev, _meta = cached_payload(key, build, EVENT_TTL)
+    except Exception:
+        return "", [], "", ""
+    return ev["titre"], list(ev["dates"]), ev["heure"], ev["lieu"]
+
+async def _parse_event_page_async(url: str):
+    """_parse_event_page sans bloquer (même clé de cache, même EVENT_TTL)."""
+    key = cache_key("tablao-event", {"url": url})
+
+    async def build():
+        titre, dates, hr, lieu = await fetch_and_build_async(url, _parse_event_doc)
+        return {"titre": titre, "dates": dates, "heure": hr, "lieu": lieu}
+
     try:
-        html = fetch_html(url)
-        soup = soup_from_html(html)
+        ev, _meta = await cached_payload_async(key, build, EVENT_TTL)
     except Exception:
         return "", [], "", ""
+    return ev["titre"], list(ev["dates"]), ev["heure"], ev["lieu"]
 
+def _parse_event_doc(page: Page):
+    soup = page.soup
     full = _norm(soup.get_text("\n", strip=True))
 
     # Titre: prioriser H1
@@ -197,88 +235,147 @@ def _find_tablao_event_links(home_soup):
             urls.add(absu)
     return sorted(urls)
 
-# ------------------------------------------------------------------------------
-@bp.get("/infos-tablao")
-def infos_tablao():
-    key = cache_key("infos-tablao", request.args.to_dict(flat=True))
-    entry = cache_get(key)
+def _event_links_from_page(page: Page) -> list[str]:
+    return _find_tablao_event_links(page.soup)
 
-    try:
-        # 1) Home -> liens “/events/…tablao…”
-        html = fetch_html(SRC)
-        soup = soup_from_html(html)
-        event_links = _find_tablao_event_links(soup)
-
-        items, seen = [], set()
-
-        # 2) Pour chaque page événement, parser
-        for url in event_links:
-            titre, dates, hr, lieu = _parse_event_page(url)
-            if not titre:
-                # fallback: titre depuis l'ancre (si pas de H1)
-                titre = "Tablao"
-
-            # Si pas de date trouvée, ignorer (on veut uniquement les prochains tablaos)
-            if not dates:
-                continue
+def _parse_event_pages(urls: list[str], deadline: float | None = EVENT_DEADLINE) -> tuple[dict[str, tuple], int]:
+    """
+    Parse les pages événement en parallèle. Renvoie (pages parsées, nombre de retardataires) :
+    les pages qui ne finissent pas avant `deadline` secondes sont ignorées pour ce lot (elles
+    continuent en fond et leur résultat, mis en cache par URL, servira au prochain passage).
+    deadline=None : on attend toutes les pages.
+    """
+    if not urls:
+        return {}, 0
+    futures = {_EVENT_POOL.submit(_parse_event_page, u): u for u in urls}
+    done, late = wait(futures, timeout=deadline)
+    return {futures[f]: f.result() for f in done}, len(late)
+
+async def _parse_event_pages_async(urls: list[str], deadline: float | None = EVENT_DEADLINE) -> tuple[dict[str, tuple], int]:
+    """Pendant asynchrone : une tâche par page, même échéance (les retardataires finissent en fond)."""
+    if not urls:
+        return {}, 0
+    tasks = {asyncio.ensure_future(_parse_event_page_async(u)): u for u in urls}
+    done, late = await asyncio.wait(tasks, timeout=deadline)
+    return {tasks[t]: t.result() for t in done}, len(late)
+
+# ------------------------------------------------------------------------------
+def build_payload(deadline: float | None = EVENT_DEADLINE) -> dict:
+    # 1) Home -> liens “/events/…tablao…”
+    event_links = fetch_and_build(SRC, _event_links_from_page)
+    # 2) Pages événement parsées en parallèle (deadline=None : toutes, ex. enregistrement)
+    return _payload_from_events(event_links, *_parse_event_pages(event_links, deadline))
+
+async def build_payload_async(deadline: float | None = EVENT_DEADLINE) -> dict:
+    """Même payload, GET amont non bloquants (point d'entrée ASGI, main.py)."""
+    event_links = await fetch_and_build_async(SRC, _event_links_from_page)
+    return _payload_from_events(event_links, *await _parse_event_pages_async(event_links, deadline))
+
+def _payload_from_events(event_links: list[str], parsed: dict[str, tuple], missing: int = 0) -> dict:
+    items, seen = [], set()
+
+    # on garde l'ordre des liens
+    for url in event_links:
+        if url not in parsed:
+            continue  # trop lente pour ce lot
+        titre, dates, hr, lieu = parsed[url]
+        if not titre:
+            # fallback: titre depuis l'ancre (si pas de H1)
+            titre = "Tablao"
+
+        # Si pas de date trouvée, ignorer (on veut uniquement les prochains tablaos)
+        if not dates:
+            continue
 
-            # 3) Filtre “à venir” (>= aujourd’hui, fuseau local)
-            today = datetime.now().date()
-            for dd in dates:
-                try:
-                    d, m, y = [int(x) for x in dd.split("/")]
-                    d_obj = date(y, m, d)
-                except Exception:
-                    continue
-                if d_obj < today:
-                    continue
-
-                keyi = (dd, titre.lower()[:160])
-                if keyi in seen:
-                    continue
-                seen.add(keyi)
-
-                items.append({
-                    "type": "tablao",
-                    "date": dd,
-                    "date_spoken": ddmmyyyy_to_spoken(dd),
-                    "heure": hr,
-                    "heure_vocal": remplacer_h_par_heure(hr),
-                    "titre": sanitize_for_voice(titre),
-                    "lieu": sanitize_for_voice(lieu),
-                    "url": url
-                })
-
-        # 4) Tri chronologique
-        def _k(e):
+        # 3) Filtre “à venir” (>= aujourd’hui, fuseau local)
+        today = datetime.now().date()
+        for dd in dates:
             try:
-                dd, mm, yy = e["date"].split("/")
-                return (int(yy), int(mm), int(dd))
+                d, m, y = [int(x) for x in dd.split("/")]
+                d_obj = date(y, m, d)
             except Exception:
-                return (9999, 12, 31)
-        items.sort(key=_k)
-
-        # 5) Version vocale
-        tablaos_vocal = []
-        for e in items:
-            parts = [f"Tablao le {e['date_spoken']}"]
-            if e.get("heure_vocal"):
-                parts.append(f"à {e['heure_vocal']}")
-            if e.get("lieu"):
-                parts.append(f"au {e['lieu']}")
-            parts.append(f": {e['titre']}")
-            tablaos_vocal.append(sanitize_for_voice(" ".join(parts)))
-
-        payload = {
-            "source": SRC,
-            "count": len(items),
-            "tablaos": items,
-            "tablaos_vocal": tablaos_vocal
-        }
-        cache_set(key, payload, ttl_seconds=180)
-        return jsonify({**payload, "cache": cache_meta(True, entry)})
+                continue
+            if d_obj < today:
+                continue
 
+            keyi = (dd, titre.lower()[:160])
+            if keyi in seen:
+                continue
+            seen.add(keyi)
+
+            items.append({
+                "type": "tablao",
+                "date": dd,
+                "date_spoken": ddmmyyyy_to_spoken(dd),
+                "heure": hr,
+                "heure_vocal": remplacer_h_par_heure(hr),
+                "titre": sanitize_for_voice(titre),
+                "lieu": sanitize_for_voice(lieu),
+                "url": url
+            })
+
+    # 4) Tri chronologique
+    def _k(e):
+        try:
+            dd, mm, yy = e["date"].split("/")
+            return (int(yy), int(mm), int(dd))
+        except Exception:
+            return (9999, 12, 31)
+    items.sort(key=_k)
+
+    # 5) Version vocale
+    tablaos_vocal = []
+    for e in items:
+        parts = [f"Tablao le {e['date_spoken']}"]
+        if e.get("heure_vocal"):
+            parts.append(f"à {e['heure_vocal']}")
+        if e.get("lieu"):
+            parts.append(f"au {e['lieu']}")
+        parts.append(f": {e['titre']}")
+        tablaos_vocal.append(sanitize_for_voice(" ".join(parts)))
+
+    payload = {
+        "source": SRC,
+        "count": len(items),
+        "tablaos": items,
+        "tablaos_vocal": tablaos_vocal
+    }
+    if missing:
+        # liste incomplète : signalée au client, gardée peu de temps en cache (utils.PARTIAL_TTL)
+        payload["partiel"] = True
+        payload["manquants"] = missing
+    return payload
+
+register("infos-tablao", CACHE_KEY, build_payload, TTL)
+
+def to_events(payload: dict) -> list[dict]:
+    """Événements normalisés (store unifié)."""
+    return [
+        make_event("tablao", e.get("titre", ""), e.get("date"), type=e.get("type"),
+                   heure=e.get("heure"), lieu=e.get("lieu"), url=e.get("url"))
+        for e in payload.get("tablaos", [])
+    ]
+
+# Index des événements pour les requêtes par date / type (construit une fois par payload en cache)
+EVENT_INDEX = {
+    "field": "tablaos",
+    "start_of": lambda e: e.get("date"),
+    "type_of": lambda e: e.get("type") or classify_type(e.get("titre")),
+    "parallel": ("tablaos_vocal",),
+}
+
+@bp.get("/infos-tablao")
+def infos_tablao():
+    # paramètres invalides → 400 ; une erreur de construction (même ValueError) → 500
+    try:
+        query = parse_query(request.args)   # ?from= &to= &type= &limit= &next=
+    except ValueError as e:
+        return jsonify({"erreur": str(e)}), 400
+    try:
+        key = cache_key("infos-tablao", request.args.to_dict(flat=True), allowed=CACHE_PARAMS)
+        payload, meta = cached_payload(key, build_payload, TTL)
+        if query:
+            key, payload = filtered_payload(key, payload, query, **EVENT_INDEX)
+        return json_response(key, payload, meta)
     except Exception as e:
-        if entry:
-            return jsonify({**entry["data"], "cache": cache_meta(False, entry)})
         return jsonify({"erreur": str(e)}), 500
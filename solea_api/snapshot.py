@@ -0,0 +1,81 @@
+# solea_api/snapshot.py
+"""
+Instantané disque des derniers payloads valides (cours, agenda, stages, tablaos).
+
+Après un déploiement ou un réveil (plan gratuit Render), le cache mémoire est vide :
+sans instantané, les premiers appels attendent un scrape complet. Ici, chaque payload
+suivi est réécrit sur disque à chaque mise en cache (écriture atomique : fichier
+temporaire + os.replace), puis rechargé au démarrage (`utils.load_snapshot`, appelé
+par create_app) avec son horodatage d'origine : il est servi avec son âge réel
+(fresh=false s'il a dépassé son TTL) pendant que le rafraîchissement tourne en fond.
+Le TTL dur reste la borne : un instantané qui l'a dépassé n'est servi que pendant
+SOLEA_SNAPSHOT_GRACE secondes après le chargement.
+
+SOLEA_SNAPSHOT=0 pour couper ; SOLEA_SNAPSHOT_DIR pour le répertoire ;
+SOLEA_SNAPSHOT_MAX_AGE (secondes) : au-delà, un instantané est ignoré.
+"""
+from __future__ import annotations
+import hashlib, json, logging, os, tempfile, time
+from typing import Iterator
+
+log = logging.getLogger(__name__)
+
+SNAPSHOT_ENABLED = os.environ.get("SOLEA_SNAPSHOT", "1") != "0"
+SNAPSHOT_DIR = os.environ.get("SOLEA_SNAPSHOT_DIR", "/tmp/solea-snapshot")
+SNAPSHOT_MAX_AGE = int(os.environ.get("SOLEA_SNAPSHOT_MAX_AGE", str(7 * 24 * 3600)))
+SNAPSHOT_GRACE = int(os.environ.get("SOLEA_SNAPSHOT_GRACE", "300"))
+
+# clés de cache persistées (déclarées par refresh.register)
+_TRACKED: set[str] = set()
+
+def track(key: str) -> None:
+    _TRACKED.add(key)
+
+def is_tracked(key: str) -> bool:
+    return SNAPSHOT_ENABLED and key in _TRACKED
+
+def _path(key: str) -> str:
+    name = hashlib.sha1(key.encode("utf-8")).hexdigest()[:20]
+    return os.path.join(SNAPSHOT_DIR, f"{name}.json")
+
+def save(key: str, entry: dict) -> bool:
+    """Écrit l'entrée de façon atomique ; False (et un log) si le disque refuse, sans jamais lever."""
+    if not is_tracked(key):
+        return False
+    record = {"key": key, "data": entry["data"], "ts": entry["ts"],
+              "ttl": entry["ttl"], "hard_ttl": entry.get("hard_ttl", entry["ttl"])}
+    tmp = None
+    try:
+        os.makedirs(SNAPSHOT_DIR, exist_ok=True)
+        fd, tmp = tempfile.mkstemp(prefix=".snap-", suffix=".tmp", dir=SNAPSHOT_DIR)
+        with os.fdopen(fd, "w", encoding="utf-8") as f:
+            json.dump(record, f, ensure_ascii=False, separators=(",", ":"))
+        os.replace(tmp, _path(key))
+        return True
+    except Exception:
+        log.exception("snapshot %s: écriture impossible", key)
+        if tmp and os.path.exists(tmp):
+            try:
+                os.unlink(tmp)
+            except OSError:
+                pass
+        return False
+
+def load(max_age: float | None = None) -> Iterator[tuple[str, dict]]:
+    """(clé, entrée) pour chaque instantané suivi, lisible et pas trop vieux."""
+    if not SNAPSHOT_ENABLED:
+        return
+    max_age = SNAPSHOT_MAX_AGE if max_age is None else max_age
+    now = time.time()
+    for key in sorted(_TRACKED):
+        try:
+            with open(_path(key), encoding="utf-8") as f:
+                rec = json.load(f)
+        except FileNotFoundError:
+            continue
+        except Exception:
+            log.warning("snapshot %s: fichier illisible, ignoré", key)
+            continue
+        if rec.get("key") != key or now - rec.get("ts", 0) > max_age:
+            continue
+        yield key, {"data": rec["data"], "ts": rec["ts"], "ttl": rec["ttl"], "hard_ttl": rec["hard_ttl"]}
@@ -1,10 +1,25 @@
 # solea_api/utils.py
 from __future__ import annotations
-import re, json, time, os
-from datetime import datetime
+import re, json, time, os, threading, hashlib, zlib
+from collections import OrderedDict
+from datetime import datetime, date
+from contextlib import contextmanager
+from functools import cached_property
+from html import unescape
 from typing import Any
 import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
 from bs4 import BeautifulSoup, Tag, NavigableString
+from bs4.element import CData, PreformattedString
+from flask import Response, request
+from werkzeug.http import parse_accept_header, parse_etags, quote_etag
+
+from .cache import make_cache
+from . import snapshot, replay
+from .metrics import (
+    STAGE_SECONDS, UPSTREAM_SECONDS, UPSTREAM_RESPONSES, UPSTREAM_ERRORS, FETCH_FALLBACK, CACHE_REQUESTS,
+)
 
 try:
     from zoneinfo import ZoneInfo
@@ -32,32 +47,377 @@ HEADERS_B = {
     "Accept-Language": "fr-FR,fr;q=0.9,en;q=0.8",
 }
 
+# Pool HTTP (keep-alive) : réglable par variables d'environnement
+HTTP_POOL_CONNECTIONS = int(os.environ.get("SOLEA_HTTP_POOL_CONNECTIONS", "4"))   # nb d'hôtes gardés
+HTTP_POOL_MAXSIZE = int(os.environ.get("SOLEA_HTTP_POOL_MAXSIZE", "16"))          # connexions par hôte
+HTTP_RETRIES = int(os.environ.get("SOLEA_HTTP_RETRIES", "2"))
+
+# GET conditionnel (ETag / Last-Modified) : remplace les cache-busters "?cb=" si actif
+REVALIDATE = os.environ.get("SOLEA_REVALIDATE", "1") != "0"
+REVALIDATE_MAX_URLS = 256
+
+# Mémo des parsings par empreinte du HTML (débarrassé des parties volatiles)
+PARSE_MEMO = os.environ.get("SOLEA_PARSE_MEMO", "1") != "0"
+
 # =========================
-# Cache mémoire simple
+# Cache mémoire simple (stale-while-revalidate)
 # =========================
-_CACHE: dict[str, dict[str, Any]] = {}
+# ttl      = TTL "souple" : au-delà, l'entrée est périmée mais encore servie (et rafraîchie en fond)
+# hard_ttl = TTL "dur"    : au-delà, on ne la sert plus (sauf repli si le scrape échoue)
+HARD_TTL_FACTOR = int(os.environ.get("SOLEA_HARD_TTL_FACTOR", "10"))
+CACHE_MAX_ENTRIES = int(os.environ.get("SOLEA_CACHE_MAX_ENTRIES", "256"))
+CACHE_MAX_BYTES = int(os.environ.get("SOLEA_CACHE_MAX_BYTES", str(32 * 1024 * 1024)))
+# payload marqué "partiel" (pages manquantes à l'échéance) : TTL court, jamais dans l'instantané
+PARTIAL_TTL = int(os.environ.get("SOLEA_PARTIAL_TTL", "15"))
 
-def cache_key(name: str, params: dict | None = None) -> str:
+# SOLEA_CACHE_BACKEND=sqlite : un seul cache pour tous les workers gunicorn (fichier SOLEA_CACHE_PATH)
+CACHE_BACKEND = os.environ.get("SOLEA_CACHE_BACKEND", "memory")
+CACHE_PATH = os.environ.get("SOLEA_CACHE_PATH", "/tmp/solea-cache.sqlite3")
+
+_CACHE = make_cache(CACHE_BACKEND, CACHE_PATH, max_entries=CACHE_MAX_ENTRIES, max_bytes=CACHE_MAX_BYTES)
+_REFRESHING: set[str] = set()
+_REFRESHING_LOCK = threading.Lock()
+
+def cache_key(name: str, params: dict | None = None, allowed=None) -> str:
+    """`allowed` : liste blanche des paramètres de requête qui comptent dans la clé (None = tous)."""
     params = params or {}
+    if allowed is not None:
+        params = {k: v for k, v in params.items() if k in allowed}
     return name + "|" + json.dumps(params, sort_keys=True, ensure_ascii=False)
 
-def cache_set(key: str, data: dict, ttl_seconds: int = 60) -> None:
-    _CACHE[key] = {"data": data, "ts": time.time(), "ttl": ttl_seconds}
+def cache_set(key: str, data: dict, ttl_seconds: int = 60, hard_ttl_seconds: int | None = None) -> None:
+    partial = is_partial(data)
+    if partial and ttl_seconds > PARTIAL_TTL:
+        ttl_seconds, hard_ttl_seconds = PARTIAL_TTL, None
+    if hard_ttl_seconds is None:
+        hard_ttl_seconds = ttl_seconds * HARD_TTL_FACTOR
+    entry = {"data": data, "ts": time.time(), "ttl": ttl_seconds,
+             "hard_ttl": max(hard_ttl_seconds, ttl_seconds)}
+    _CACHE.set(key, entry)
+    if snapshot.is_tracked(key) and not partial:
+        snapshot.save(key, entry)
 
-def cache_get(key: str):
+def is_partial(data) -> bool:
+    """Payload construit sans toutes ses pages (échéance dépassée) : à reconstruire vite."""
+    return isinstance(data, dict) and bool(data.get("partiel"))
+
+def cache_get(key: str, allow_stale: bool = False):
+    """Entrée encore fraîche ; avec allow_stale, aussi une entrée périmée mais sous le TTL dur."""
     entry = _CACHE.get(key)
     if not entry:
         return None
-    if (time.time() - entry["ts"]) > entry["ttl"]:
+    age = time.time() - entry["ts"]
+    if age > entry["ttl"] and not (allow_stale and age <= entry.get("hard_ttl", entry["ttl"])):
         return None
     return entry
 
-def cache_meta(fresh: bool, prev_entry):
+def cache_is_fresh(entry) -> bool:
+    return bool(entry) and (time.time() - entry["ts"]) <= entry["ttl"]
+
+def cache_meta(fresh: bool, entry=None):
+    """Métadonnées renvoyées au client ; `entry` = entrée servie (None si payload tout juste construit)."""
     return {
         "fresh": fresh,
         "generated_at": datetime.now(ZoneInfo(DEFAULT_TZ) if ZoneInfo else None).isoformat(),
-        "age_seconds": 0 if fresh or not prev_entry else int(time.time() - prev_entry["ts"])
+        "age_seconds": int(time.time() - entry["ts"]) if entry else 0
+    }
+
+def merged_meta(metas: list[dict]) -> dict:
+    """Métadonnées d'une réponse composée de plusieurs entrées : fraîche si toutes le sont, âge de la plus vieille."""
+    return {
+        "fresh": all(m["fresh"] for m in metas),
+        "generated_at": datetime.now(ZoneInfo(DEFAULT_TZ) if ZoneInfo else None).isoformat(),
+        "age_seconds": max((m["age_seconds"] for m in metas), default=0),
+    }
+
+_SNAPSHOT_STATE = {"loaded": False}
+_SNAPSHOT_LOCK = threading.Lock()
+
+def load_snapshot() -> int:
+    """
+    Recharge l'instantané disque dans le cache (démarrage, une fois par process) ; renvoie
+    le nombre d'entrées installées. L'horodatage d'origine est gardé (âge réel, fresh=false
+    au-delà du TTL) ; le TTL dur n'est prolongé que d'une courte grâce depuis le chargement
+    (SNAPSHOT_GRACE), le temps du premier rafraîchissement.
+    """
+    with _SNAPSHOT_LOCK:
+        if _SNAPSHOT_STATE["loaded"]:
+            return 0
+        _SNAPSHOT_STATE["loaded"] = True
+    n = 0
+    now = time.time()
+    for key, entry in snapshot.load():
+        current = _CACHE.get(key)
+        if current and current["ts"] >= entry["ts"]:
+            continue
+        entry["hard_ttl"] = max(entry["hard_ttl"], (now - entry["ts"]) + snapshot.SNAPSHOT_GRACE)
+        _CACHE.set(key, entry)
+        n += 1
+    return n
+
+# Single-flight : les requêtes concurrentes sur une même clé attendent le calcul en cours
+class _Flight:
+    __slots__ = ("done", "result", "error")
+
+    def __init__(self):
+        self.done = threading.Event()
+        self.result = None
+        self.error: BaseException | None = None
+
+_FLIGHTS: dict[str, _Flight] = {}
+_FLIGHTS_LOCK = threading.Lock()
+
+def single_flight(key: str, fn):
+    """Exécute fn() une seule fois pour `key` à un instant donné ; les appels concurrents partagent son résultat (ou son exception)."""
+    with _FLIGHTS_LOCK:
+        flight = _FLIGHTS.get(key)
+        leader = flight is None
+        if leader:
+            flight = _FLIGHTS[key] = _Flight()
+    if not leader:
+        flight.done.wait()
+        if flight.error is not None:
+            raise flight.error
+        return flight.result
+    try:
+        flight.result = fn()
+        return flight.result
+    except BaseException as e:
+        flight.error = e
+        raise
+    finally:
+        with _FLIGHTS_LOCK:
+            _FLIGHTS.pop(key, None)
+        flight.done.set()
+
+def _build_and_store(key: str, build, ttl_seconds: int, hard_ttl_seconds: int | None):
+    def run():
+        data = build()
+        cache_set(key, data, ttl_seconds, hard_ttl_seconds)
+        return data
+    return single_flight(key, run)
+
+def _revalidate_in_background(key: str, build, ttl_seconds: int, hard_ttl_seconds: int | None) -> bool:
+    """Lance build() dans un thread ; au plus un rafraîchissement en vol par clé."""
+    with _REFRESHING_LOCK:
+        if key in _REFRESHING:
+            return False
+        _REFRESHING.add(key)
+
+    def run():
+        try:
+            _build_and_store(key, build, ttl_seconds, hard_ttl_seconds)
+        except Exception:
+            pass  # on garde l'entrée périmée, le prochain appel retentera
+        finally:
+            with _REFRESHING_LOCK:
+                _REFRESHING.discard(key)
+
+    threading.Thread(target=run, name=f"solea-swr:{key}", daemon=True).start()
+    return True
+
+# Contournement des caches pour le thread courant (profilage : on mesure un vrai scrape)
+_BYPASS = threading.local()
+
+@contextmanager
+def bypass_caches():
+    """Dans ce bloc (et ce thread) : ni cache applicatif, ni GET conditionnel, ni mémo de parsing."""
+    prev = getattr(_BYPASS, "on", False)
+    _BYPASS.on = True
+    try:
+        yield
+    finally:
+        _BYPASS.on = prev
+
+def caches_bypassed() -> bool:
+    return getattr(_BYPASS, "on", False)
+
+def cached_payload(key: str, build, ttl_seconds: int = 60, hard_ttl_seconds: int | None = None):
+    """
+    Renvoie (payload, meta) :
+      - entrée fraîche → servie telle quelle ;
+      - entrée périmée mais sous le TTL dur → servie tout de suite (fresh=false) pendant
+        qu'un unique rafraîchissement tourne en fond ;
+      - sinon build() (une seule fois pour tous les appels concurrents) ; si build()
+        échoue, repli sur la dernière valeur connue.
+    """
+    if caches_bypassed():
+        return build(), cache_meta(True)
+    name = key.split("|", 1)[0]   # libellé de métrique : nom de la clé, sans les paramètres
+    entry = cache_get(key, allow_stale=True)
+    if entry:
+        if cache_is_fresh(entry):
+            CACHE_REQUESTS.inc(name, "hit")
+            return entry["data"], cache_meta(True, entry)
+        CACHE_REQUESTS.inc(name, "stale")
+        _revalidate_in_background(key, build, ttl_seconds, hard_ttl_seconds)
+        return entry["data"], cache_meta(False, entry)
+    CACHE_REQUESTS.inc(name, "miss")
+    prev = _CACHE.get(key)
+    try:
+        data = _build_and_store(key, build, ttl_seconds, hard_ttl_seconds)
+    except Exception:
+        if prev:
+            return prev["data"], cache_meta(False, prev)
+        raise
+    return data, cache_meta(True)
+
+# =========================
+# Projection des payloads (?fields=, ?compact)
+# =========================
+# La projection se calcule à partir de l'unique payload complet en cache (la clé de cache
+# ne dépend pas de fields/compact) et son résultat est mémorisé par (clé, projection).
+# fields : chemins séparés par des virgules ; "a.b" garde b dans a (ou dans chaque élément
+# si a est une liste). compact : retire les doublons vocaux (*_vocal), les lignes brutes
+# (*_lignes) et les valeurs vides.
+COMPACT_DROP_SUFFIXES = ("_vocal", "_lignes")
+NO_PROJECTION: tuple = ((), False)
+
+def request_projection(args=None) -> tuple[tuple[str, ...], bool]:
+    """(champs triés, compact) lus dans `args` (défaut : requête Flask courante) ; NO_PROJECTION si rien demandé."""
+    if args is None:
+        args = request.args
+    raw = args.get("fields") or ""
+    fields = tuple(sorted({f.strip() for f in raw.split(",") if f.strip()}))
+    compact = (args.get("compact") or "").lower() in ("1", "true", "yes", "oui") \
+        or ("compact" in args and not args.get("compact"))
+    return fields, compact
+
+def _fields_tree(fields) -> dict:
+    tree: dict = {}
+    for f in fields:
+        node = tree
+        for part in f.split("."):
+            node = node.setdefault(part, {})
+    return tree
+
+def _select(value, tree: dict):
+    if not tree:
+        return value
+    if isinstance(value, list):
+        return [_select(v, tree) for v in value]
+    if isinstance(value, dict):
+        return {k: _select(value[k], sub) for k, sub in tree.items() if k in value}
+    return value
+
+def _compact(value):
+    if isinstance(value, list):
+        return [_compact(v) for v in value if v not in ("", None, [], {})]
+    if isinstance(value, dict):
+        return {k: _compact(v) for k, v in value.items()
+                if not k.endswith(COMPACT_DROP_SUFFIXES) and v not in ("", None, [], {})}
+    return value
+
+def project_payload(payload: dict, fields=(), compact: bool = False) -> dict:
+    out = _select(payload, _fields_tree(fields)) if fields else payload
+    return _compact(out) if compact else out
+
+# (clé, projection) -> (payload source, vue projetée)
+_PROJECTIONS: OrderedDict[tuple, tuple[dict, dict]] = OrderedDict()
+_PROJECTIONS_LOCK = threading.Lock()
+
+def projected(key: str, payload: dict, projection=NO_PROJECTION) -> dict:
+    """Vue projetée de `payload`, recalculée seulement quand le payload en cache change."""
+    if projection == NO_PROJECTION:
+        return payload
+    mkey = (key, projection)
+    with _PROJECTIONS_LOCK:
+        memo = _PROJECTIONS.get(mkey)
+        if memo is not None and memo[0] is payload:
+            _PROJECTIONS.move_to_end(mkey)
+            return memo[1]
+    view = project_payload(payload, *projection)
+    with _PROJECTIONS_LOCK:
+        _PROJECTIONS[mkey] = (payload, view)
+        while len(_PROJECTIONS) > CACHE_MAX_ENTRIES:
+            _PROJECTIONS.popitem(last=False)
+    return view
+
+# =========================
+# Réponses JSON pré-sérialisées (gzip + ETag)
+# =========================
+# Le payload en cache est sérialisé une seule fois (et son préfixe gzip compressé une seule
+# fois) ; à chaque requête on ne sérialise que les petites métadonnées "cache", collées en
+# fin d'objet. L'ETag porte sur le payload seul : il est donc faible (W/), puisque les octets
+# envoyés varient avec les métadonnées et l'encodage (gzip ou non) pour un même contenu.
+GZIP_MIN_BYTES = 512
+GZIP_LEVEL = 6
+
+class _Body:
+    __slots__ = ("payload", "prefix", "etag", "gz_head", "gz_state")
+
+    def __init__(self, payload: dict):
+        with STAGE_SECONDS.time("serialize"):
+            self._serialize(payload)
+
+    def _serialize(self, payload: dict) -> None:
+        raw = json.dumps(payload, ensure_ascii=False, separators=(",", ":"), sort_keys=True).encode("utf-8")
+        self.payload = payload   # garde la référence : l'identité sert de clé de validité
+        # '{...}' → '{...,"cache":' ; on ajoute ensuite meta + '}'
+        self.prefix = raw[:-1] + (b',"cache":' if len(raw) > 2 else b'"cache":')
+        self.etag = hashlib.blake2b(raw, digest_size=16).hexdigest()
+        self.gz_state = zlib.compressobj(GZIP_LEVEL, zlib.DEFLATED, 31)   # 31 = conteneur gzip
+        self.gz_head = self.gz_state.compress(self.prefix)
+
+    def render(self, tail: bytes, gzip: bool) -> bytes:
+        if not gzip:
+            return self.prefix + tail
+        co = self.gz_state.copy()   # reprend la compression après le préfixe, sans le recompresser
+        return self.gz_head + co.compress(tail) + co.flush()
+
+_BODIES: OrderedDict[str, _Body] = OrderedDict()
+_BODIES_LOCK = threading.Lock()
+
+def _body_for(key: str, payload: dict) -> _Body:
+    with _BODIES_LOCK:
+        body = _BODIES.get(key)
+        if body is not None and body.payload is payload:
+            _BODIES.move_to_end(key)
+            return body
+    body = _Body(payload)
+    with _BODIES_LOCK:
+        _BODIES[key] = body
+        while len(_BODIES) > CACHE_MAX_ENTRIES:
+            _BODIES.popitem(last=False)
+    return body
+
+def encoded_json(key: str, payload: dict, meta: dict, args, if_none_match: str = "",
+                 accept_encoding: str = "") -> tuple[int, bytes, dict]:
+    """
+    (statut, corps, en-têtes) de la réponse JSON `{**payload, "cache": meta}`, indépendamment
+    du framework : sert json_response (Flask) et le point d'entrée ASGI (main.py).
+    """
+    projection = request_projection(args)
+    if projection != NO_PROJECTION:
+        payload = projected(key, payload, projection)
+        key = f"{key}#{json.dumps(projection)}"
+    body = _body_for(key, payload)
+    headers = {
+        "ETag": quote_etag(body.etag, weak=True),
+        "X-Cache-Fresh": "true" if meta.get("fresh") else "false",
+        "X-Cache-Age": str(meta.get("age_seconds", 0)),
+        "Vary": "Accept-Encoding",
     }
+    if parse_etags(if_none_match or None).contains_weak(body.etag):   # comparaison faible (If-None-Match)
+        return 304, b"", headers
+    tail = json.dumps(meta, ensure_ascii=False, separators=(",", ":")).encode("utf-8") + b"}"
+    gzip = parse_accept_header(accept_encoding or None).quality("gzip") > 0 and len(body.prefix) >= GZIP_MIN_BYTES
+    headers["Content-Type"] = "application/json"
+    if gzip:
+        headers["Content-Encoding"] = "gzip"
+    return 200, body.render(tail, gzip), headers
+
+def json_response(key: str, payload: dict, meta: dict, args=None) -> Response:
+    """
+    Réponse JSON `{**payload, "cache": meta}` depuis les octets mémorisés pour `key`
+    (et pour la projection ?fields= / ?compact demandée) : 304 si If-None-Match
+    correspond, gzip si le client l'accepte. `args` remplace request.args pour la
+    projection ({} : payload déjà projeté).
+    """
+    status, body, headers = encoded_json(key, payload, meta, request.args if args is None else args,
+                                         request.headers.get("If-None-Match", ""),
+                                         request.headers.get("Accept-Encoding", ""))
+    return Response(body, status=status, headers=headers)
 
 # =========================
 # Texte & Dates
@@ -172,30 +532,334 @@ def parse_date_any(s: str) -> str:
 # =========================
 # HTTP helpers
 # =========================
-def fetch_html(url: str) -> str:
+def soup_from_html(html: str) -> BeautifulSoup:
+    soup = BeautifulSoup(html or "", "lxml")
+    for br in soup.find_all("br"):
+        br.replace_with("\n")
+    return soup
+
+# Test "page maigre" sans construire d'arbre : on retire scripts/styles/commentaires puis les balises
+_RE_INVISIBLE = re.compile(r"<!--.*?-->|<(script|style|template)\b[^>]*>.*?</\1\s*>", re.IGNORECASE | re.DOTALL)
+_RE_TAG = re.compile(r"<[^>]*>")
+
+def visible_text_length(html: str) -> int:
+    """Longueur approx. du texte visible (équivalent de get_text(" ", strip=True) normalisé)."""
+    txt = _RE_TAG.sub(" ", _RE_INVISIBLE.sub(" ", html or ""))
+    return len(" ".join(unescape(txt).replace(NBSP, " ").split()))
+
+class Page:
+    """
+    Page téléchargée : HTML brut + arbre lxml et JSON-LD, calculés une seule fois
+    (à la demande) et partagés par tout le pipeline d'une route.
+    """
+    def __init__(self, url: str, html: str):
+        self.url = url
+        self.html = html or ""
+
+    @cached_property
+    def soup(self) -> BeautifulSoup:
+        with STAGE_SECONDS.time("parse"):
+            return soup_from_html(self.html)
+
+    @cached_property
+    def ld_events(self) -> list[dict]:
+        return extract_ldjson_events(self.html)
+
+_SESSION: requests.Session | None = None
+_SESSION_LOCK = threading.Lock()
+
+def _build_session() -> requests.Session:
+    retry = Retry(
+        total=HTTP_RETRIES, connect=HTTP_RETRIES, read=HTTP_RETRIES,
+        backoff_factor=0.3,
+        status_forcelist=(500, 502, 503, 504),
+        allowed_methods=frozenset({"GET", "HEAD"}),
+        raise_on_status=False,
+    )
+    adapter = HTTPAdapter(
+        pool_connections=HTTP_POOL_CONNECTIONS,
+        pool_maxsize=HTTP_POOL_MAXSIZE,
+        max_retries=retry,
+        pool_block=False,
+    )
+    s = requests.Session()
+    s.mount("https://", adapter)
+    s.mount("http://", adapter)
+    return s
+
+def http_session() -> requests.Session:
+    """Session partagée (un pool keep-alive par hôte), créée à la demande."""
+    global _SESSION
+    if _SESSION is None:
+        with _SESSION_LOCK:
+            if _SESSION is None:
+                _SESSION = _build_session()
+    return _SESSION
+
+def http_get(url: str, headers: dict | None = None, timeout=REQ_TIMEOUT) -> requests.Response:
+    """GET via le pool partagé (réutilise DNS/TCP/TLS entre les scrapes) ; enregistrement / rejeu : voir replay.py."""
+    variant = "B" if headers and headers.get("User-Agent") == HEADERS_B["User-Agent"] else "A"
+    t0 = time.perf_counter()
     try:
-        r = requests.get(url, headers=HEADERS_A, timeout=REQ_TIMEOUT)
+        if replay.REPLAY_MODE == "replay":
+            r = replay.replay_response(url, headers)
+        else:
+            r = http_session().get(replay.upstream_url(url), headers=headers, timeout=timeout)
+    except Exception as e:
+        UPSTREAM_ERRORS.inc(type(e).__name__)
+        raise
+    finally:
+        UPSTREAM_SECONDS.observe(time.perf_counter() - t0, variant)
+    UPSTREAM_RESPONSES.inc(str(r.status_code))
+    if replay.REPLAY_MODE == "record":
+        replay.record(url, r)
+    return r
+
+def _with_validators(headers: dict, validators: dict | None) -> dict:
+    if not validators:
+        return headers
+    h = dict(headers)
+    if validators.get("etag"):
+        h["If-None-Match"] = validators["etag"]
+    if validators.get("last_modified"):
+        h["If-Modified-Since"] = validators["last_modified"]
+    return h
+
+def _remember_validators(r: requests.Response, validators: dict | None) -> None:
+    if validators is None:
+        return
+    validators["etag"] = r.headers.get("ETag") or ""
+    validators["last_modified"] = r.headers.get("Last-Modified") or ""
+
+def fetch_html(url: str, validators: dict | None = None) -> str | None:
+    with STAGE_SECONDS.time("fetch"):
+        return _fetch_html(url, validators)
+
+def _fetch_html(url: str, validators: dict | None = None) -> str | None:
+    """
+    Télécharge une page (HEADERS_A, puis HEADERS_B si page trop maigre ou erreur).
+    Si `validators` est fourni ({"etag", "last_modified"}), la requête est conditionnelle :
+    renvoie None sur 304, sinon le dict est mis à jour avec les validateurs de la réponse.
+    """
+    try:
+        r = http_get(url, headers=_with_validators(HEADERS_A, validators), timeout=REQ_TIMEOUT)
+        if r.status_code == 304 and validators:
+            return None
         r.raise_for_status()
         if r.encoding is None:
             r.encoding = "utf-8"
         txt = r.text
-        if len(normalize_text(BeautifulSoup(txt, "lxml").get_text(" ", strip=True))) < 200:
-            r2 = requests.get(url, headers=HEADERS_B, timeout=(REQ_TIMEOUT[0], max(REQ_TIMEOUT[1], 14)))
+        if visible_text_length(txt) < 200:
+            FETCH_FALLBACK.inc("thin")
+            r2 = http_get(url, headers=HEADERS_B, timeout=(REQ_TIMEOUT[0], max(REQ_TIMEOUT[1], 14)))
             r2.raise_for_status()
             r2.encoding = r2.encoding or "utf-8"
+            _remember_validators(r2, validators)
             return r2.text
+        _remember_validators(r, validators)
         return txt
     except Exception:
-        r = requests.get(url, headers=HEADERS_B, timeout=(REQ_TIMEOUT[0], max(REQ_TIMEOUT[1], 14)))
+        FETCH_FALLBACK.inc("error")
+        r = http_get(url, headers=HEADERS_B, timeout=(REQ_TIMEOUT[0], max(REQ_TIMEOUT[1], 14)))
         r.raise_for_status()
         r.encoding = r.encoding or "utf-8"   # <-- fix: ne plus référencer r2
+        _remember_validators(r, validators)
         return r.text
 
-def soup_from_html(html: str) -> BeautifulSoup:
-    soup = BeautifulSoup(html or "", "lxml")
-    for br in soup.find_all("br"):
-        br.replace_with("\n")
-    return soup
+def fetch_page(url: str) -> Page:
+    return Page(url, fetch_html(url))
+
+# Parties du HTML qui changent à chaque rendu sans changer le contenu (Wix : nonces CSP,
+# identifiants de requête/session, horodatages de rendu, cache-busters)
+VOLATILE_PATTERNS = [
+    re.compile(r"<!--.*?-->", re.DOTALL),
+    re.compile(r'\bnonce="[^"]*"', re.IGNORECASE),
+    re.compile(r'"(?:requestId|request_id|visitorId|sessionId|svSession|ssrRequestId|'
+               r'ssrTimestamp|renderTimestamp|timestamp|timeStamp|ts|hs|ctToken|xsrfToken|'
+               r'siteRevisionTimestamp|serverTiming)"\s*:\s*(?:"[^"]*"|\d+)'),
+    re.compile(r"\b1[5-9]\d{11}\b"),              # epoch en millisecondes
+    re.compile(r"[?&](?:cb|_|t|ts)=\d+"),
+]
+_CB_PARAM = re.compile(r"([?&])cb=\d+&?")
+
+def content_digest(html: str) -> str:
+    """Empreinte du HTML une fois retirées les parties volatiles (VOLATILE_PATTERNS)."""
+    for rx in VOLATILE_PATTERNS:
+        html = rx.sub("", html)
+    return hashlib.blake2b(html.encode("utf-8", "replace"), digest_size=16).hexdigest()
+
+# (url sans cache-buster, constructeur) -> (empreinte, résultat) : dernier parsing de chaque page
+_PARSE_MEMO: OrderedDict[tuple[str, str], tuple[str, Any]] = OrderedDict()
+_PARSE_MEMO_LOCK = threading.Lock()
+_PARSE_STATS = {"hits": 0, "misses": 0}
+
+def _memo_key(url: str, build) -> tuple[str, str]:
+    url = _CB_PARAM.sub(r"\1", url).rstrip("?&")
+    return url, f"{getattr(build, '__module__', '')}.{getattr(build, '__qualname__', repr(build))}"
+
+def _timed_build(page: Page, build):
+    page.soup   # parse mesuré à part (tous les constructeurs lisent la soup)
+    with STAGE_SECONDS.time("extract"):
+        return build(page)
+
+def build_memoized(page: Page, build):
+    """
+    build(page), sauf si le HTML a la même empreinte qu'au dernier passage : on renvoie
+    alors le résultat déjà construit, sans re-parser. La date du jour entre dans
+    l'empreinte (certains parsings déduisent l'année scolaire de la date courante).
+    """
+    if not PARSE_MEMO or caches_bypassed():
+        return _timed_build(page, build)
+    key = _memo_key(page.url, build)
+    digest = content_digest(page.html) + date.today().isoformat()
+    with _PARSE_MEMO_LOCK:
+        memo = _PARSE_MEMO.get(key)
+        if memo is not None and memo[0] == digest:
+            _PARSE_MEMO.move_to_end(key)
+            _PARSE_STATS["hits"] += 1
+            return memo[1]
+        _PARSE_STATS["misses"] += 1
+    result = _timed_build(page, build)
+    with _PARSE_MEMO_LOCK:
+        _PARSE_MEMO[key] = (digest, result)
+        _PARSE_MEMO.move_to_end(key)
+        while len(_PARSE_MEMO) > REVALIDATE_MAX_URLS:
+            _PARSE_MEMO.popitem(last=False)
+    return result
+
+def parse_memo_stats() -> dict:
+    with _PARSE_MEMO_LOCK:
+        hits, misses = _PARSE_STATS["hits"], _PARSE_STATS["misses"]
+        return {"enabled": PARSE_MEMO, "hits": hits, "misses": misses,
+                "hit_ratio": round(hits / (hits + misses), 3) if hits + misses else None,
+                "entries": len(_PARSE_MEMO)}
+
+# (url sans cache-buster, constructeur) -> {"etag", "last_modified", "result", "day", "html"} :
+# dernier résultat construit pour chaque page et chaque constructeur (un 304 ne renvoie que le
+# résultat du même build), avec son jour de construction et le HTML (compressé) dont il vient
+_REVALIDATED: OrderedDict[tuple[str, str], dict[str, Any]] = OrderedDict()
+_REVALIDATED_LOCK = threading.Lock()
+
+def revalidation_state(url: str, build) -> tuple[dict | None, dict]:
+    """(dernier passage, validateurs à envoyer) pour un GET conditionnel de `url` construit par `build`."""
+    with _REVALIDATED_LOCK:
+        prev = _REVALIDATED.get(_memo_key(url, build))
+    validators = {"etag": prev["etag"], "last_modified": prev["last_modified"]} if prev else {}
+    return prev, validators
+
+def reusable_result(prev: dict) -> bool:
+    """Sur 304 : le résultat mémorisé ne sert tel quel que le jour où il a été construit
+    (années scolaires, filtres « à venir » dépendent de la date du jour)."""
+    return prev["day"] == date.today().isoformat()
+
+def revalidated_html(prev: dict) -> str:
+    """HTML de la dernière réponse 200 : reconstruction sans re-télécharger après un 304."""
+    return zlib.decompress(prev["html"]).decode("utf-8")
+
+def remember_revalidated(url: str, build, validators: dict, result, html: str) -> None:
+    """Mémorise `result` avec les validateurs de la réponse (oublie la page si elle n'en a pas)."""
+    key = _memo_key(url, build)
+    with _REVALIDATED_LOCK:
+        if validators.get("etag") or validators.get("last_modified"):
+            _REVALIDATED[key] = {**validators, "result": result, "day": date.today().isoformat(),
+                                 "html": zlib.compress(html.encode("utf-8"))}
+            _REVALIDATED.move_to_end(key)
+            while len(_REVALIDATED) > REVALIDATE_MAX_URLS:
+                _REVALIDATED.popitem(last=False)
+        else:
+            _REVALIDATED.pop(key, None)
+
+def fetch_and_build(url: str, build, conditional: bool | None = None):
+    """
+    Renvoie build(Page) pour `url`. En mode conditionnel, on envoie If-None-Match /
+    If-Modified-Since avec les validateurs du dernier passage ; sur 304, on renvoie
+    directement le résultat déjà construit le même jour (aucun parsing), sinon on le
+    reconstruit depuis le HTML mémorisé (sans re-télécharger). Sur 200, un HTML identique au
+    précédent (à des parties volatiles près) n'est pas re-parsé non plus (build_memoized).
+    """
+    if conditional is None:
+        conditional = REVALIDATE
+    if not conditional or caches_bypassed():
+        return build_memoized(fetch_page(url), build)
+
+    prev, validators = revalidation_state(url, build)
+    html = fetch_html(url, validators)
+    if html is None:
+        if prev and reusable_result(prev):
+            return prev["result"]
+        html = revalidated_html(prev) if prev else fetch_html(url)
+
+    result = build_memoized(Page(url, html), build)
+    remember_revalidated(url, build, validators, result, html)
+    return result
+
+# =========================
+# HTML → lignes (une passe, feuilles de texte)
+# =========================
+SKIP_TAGS = {"script", "style", "noscript", "iframe", "svg", "template", "head"}
+BLOCK_TAGS = {
+    "address", "article", "aside", "blockquote", "body", "dd", "details", "div", "dl", "dt",
+    "fieldset", "figcaption", "figure", "footer", "form", "h1", "h2", "h3", "h4", "h5", "h6",
+    "header", "hr", "html", "li", "main", "nav", "ol", "p", "pre", "section", "summary",
+    "table", "tbody", "thead", "tfoot", "tr", "ul",
+}
+CELL_TAGS = {"td", "th"}
+_CELL = object()   # séparateur de cellule dans le tampon d'une ligne
+
+def _flush_line(buf: list, lines: list[str]) -> None:
+    if not buf:
+        return
+    cells, cur = [], []
+    for part in buf:
+        if part is _CELL:
+            cells.append(" ".join(cur)); cur = []
+        else:
+            cur.append(part)
+    cells.append(" ".join(cur))
+    buf.clear()
+    t = normalize_text(" | ".join(c for c in cells if c))
+    if t:
+        lines.append(t)
+
+def extract_block_lines(root) -> list[str]:
+    """
+    Lignes de texte d'un arbre BeautifulSoup en UNE passe : chaque bout de texte est
+    émis une seule fois, dans la ligne du bloc (p, div, li, h1…) qui le contient
+    directement. Les frontières de blocs et les <br> (ou les "\n" laissés par
+    soup_from_html) coupent les lignes ; les cellules d'un <tr> sont jointes par " | ".
+    Les textes d'une même ligne sont joints par un espace, comme get_text(" ", strip=True).
+    """
+    lines: list[str] = []
+    buf: list = []
+    stack = [(root, False)]
+    while stack:
+        node, closing = stack.pop()
+        if closing:
+            _flush_line(buf, lines)
+            continue
+        if isinstance(node, NavigableString):
+            if isinstance(node, PreformattedString) and not isinstance(node, CData):
+                continue  # commentaires, doctype…
+            t = node.strip()
+            if t:
+                buf.append(t)
+            elif "\n" in node:
+                _flush_line(buf, lines)
+            continue
+        name = (node.name or "").lower()
+        if name in SKIP_TAGS:
+            continue
+        if name == "br":
+            _flush_line(buf, lines)
+            continue
+        if name in BLOCK_TAGS:
+            _flush_line(buf, lines)
+            stack.append((node, True))
+        elif name in CELL_TAGS and buf:
+            buf.append(_CELL)
+        stack.extend((child, False) for child in reversed(node.contents))
+    _flush_line(buf, lines)
+    return lines
 
 # =========================
 # Heures (regex)
@@ -264,13 +928,18 @@ def classify_type(*texts) -> str:
 # =========================
 # JSON-LD helper
 # =========================
+RE_LDJSON = re.compile(
+    r"<script\b[^>]*type\s*=\s*[\"']?application/ld\+json[\"']?[^>]*>(.*?)</script\s*>",
+    re.IGNORECASE | re.DOTALL
+)
+
 def extract_ldjson_events(html: str) -> list[dict]:
+    """Events JSON-LD lus directement dans le HTML brut (pas de parse BeautifulSoup)."""
     out = []
     try:
-        soup = BeautifulSoup(html or "", "lxml")
-        for tag in soup.find_all("script", {"type": "application/ld+json"}):
+        for raw in RE_LDJSON.findall(html or ""):
             try:
-                data = json.loads(tag.text)
+                data = json.loads(raw)
             except Exception:
                 continue
             candidates = [data] if isinstance(data, dict) else (data if isinstance(data, list) else [])
@@ -0,0 +1,7 @@
+# tests/conftest.py
+import os
+
+# pas d'instantané disque ni de thread de rafraîchissement pendant les tests
+# (les tests qui en ont besoin les activent explicitement)
+os.environ.setdefault("SOLEA_SNAPSHOT", "0")
+os.environ.setdefault("SOLEA_REFRESH", "0")
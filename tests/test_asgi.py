@@ -0,0 +1,95 @@
+# tests/test_asgi.py
+import asyncio
+
+import httpx
+import pytest
+
+from solea_api import create_app, utils
+from solea_api.main import app
+from solea_api.routes.infos_all import SECTIONS
+
+PAYLOADS = {
+    "cours": {"source": "cours", "cours": [{"jour": "lundi", "heure": "19h", "titre": "Débutants"}]},
+    "agenda": {"source": "agenda", "count": 2, "evenements": [
+        {"date_bold": "10 mars", "date_start": "10/03/2030", "date_end": "10/03/2030",
+         "texte": "Tablao flamenco avec Ana Pérez"},
+        {"date_bold": "5 mars", "date_start": "05/03/2030", "date_end": "06/03/2030",
+         "texte": "Stage de bulerías"},
+    ]},
+    "stage": {"source": "stage", "count": 1, "items": [
+        {"titre": "Stage de bulerías", "type": "stage", "date": "05/03/2030", "date_fin": "06/03/2030",
+         "date_spoken": "5 mars 2030", "heures": ["10h-12h"], "tarifs": [], "description": ""},
+    ]},
+    "tablao": {"source": "tablao", "count": 1, "tablaos": [
+        {"type": "tablao", "date": "10/03/2030", "heure": "20h30", "titre": "Tablao Ana Pérez",
+         "lieu": "Marseille", "url": "https://example.test/events/tablao"},
+    ], "tablaos_vocal": ["Tablao le 10 mars 2030"]},
+}
+
+@pytest.fixture(autouse=True)
+def sections(monkeypatch):
+    for name, mod in SECTIONS.items():
+        async def build_async(name=name, **_kw):
+            return PAYLOADS[name]
+        monkeypatch.setattr(mod, "build_payload", lambda name=name, **_kw: PAYLOADS[name])
+        monkeypatch.setattr(mod, "build_payload_async", build_async)
+        utils._CACHE.pop(mod.CACHE_KEY)
+    yield
+    for mod in SECTIONS.values():
+        utils._CACHE.pop(mod.CACHE_KEY)
+
+def asgi_get(path: str, **headers) -> httpx.Response:
+    async def run():
+        async with httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://test") as client:
+            return await client.get(path, headers=headers)
+    return asyncio.run(run())
+
+def _without_meta(body: dict) -> dict:
+    return {k: v for k, v in body.items() if k != "cache"}
+
+@pytest.mark.parametrize("path", [
+    "/infos-cours", "/infos-agenda", "/infos-stage", "/infos-tablao", "/infos-all",
+    "/infos-all?sections=stage,tablao&compact=1", "/infos-agenda?type=stage&limit=1",
+    "/infos-tablao?from=2030-03-01", "/events", "/events?type=tablao",
+])
+def test_asgi_matches_flask(path):
+    flask = create_app().test_client().get(path)
+    asgi = asgi_get(path)
+    assert asgi.status_code == flask.status_code == 200
+    assert _without_meta(asgi.json()) == _without_meta(flask.get_json())
+    assert asgi.headers["ETag"] == flask.headers["ETag"]
+
+def test_asgi_conditional_get_and_gzip():
+    first = asgi_get("/infos-all")
+    assert asgi_get("/infos-all", **{"If-None-Match": first.headers["ETag"]}).status_code == 304
+    gz = asgi_get("/events", **{"Accept-Encoding": "gzip"})
+    assert gz.status_code == 200 and gz.json()["count"] >= 2   # httpx décompresse
+
+def test_asgi_stage_plain_text_and_errors(monkeypatch):
+    r = asgi_get("/infos-stage", Accept="text/plain")
+    assert r.status_code == 200 and r.headers["content-type"].startswith("text/plain")
+    assert r.text.startswith("Stage de bulerías\nDates : 5 mars 2030")
+
+    async def boom(**_kw):
+        raise RuntimeError("amont indisponible")
+    monkeypatch.setattr(SECTIONS["stage"], "build_payload_async", boom)
+    utils._CACHE.pop(SECTIONS["stage"].CACHE_KEY)
+    r = asgi_get("/infos-stage", Accept="text/plain")
+    assert r.status_code == 500 and "amont indisponible" in r.text
+    assert asgi_get("/infos-stage").json()["error"] == "amont indisponible"
+
+def test_asgi_bad_query_400_and_build_error_500(monkeypatch):
+    assert asgi_get("/infos-tablao?limit=abc").status_code == 400
+    assert asgi_get("/events?from=demain").status_code == 400
+
+    async def bad(**_kw):
+        raise ValueError("page amont inattendue")
+    monkeypatch.setattr(SECTIONS["agenda"], "build_payload_async", bad)
+    utils._CACHE.pop(SECTIONS["agenda"].CACHE_KEY)
+    r = asgi_get("/infos-agenda?type=stage")
+    assert r.status_code == 500 and r.json()["erreur"] == "page amont inattendue"
+
+def test_asgi_misc_routes():
+    assert asgi_get("/").text.startswith("API Centre")
+    assert asgi_get("/infos-stage-solea").status_code == 410
+    assert asgi_get("/infos-all?sections=inconnue").status_code == 400
@@ -0,0 +1,114 @@
+# tests/test_event_index.py
+from datetime import date, timedelta
+
+import pytest
+
+from solea_api import create_app, utils
+from solea_api.events import EventIndex, parse_day, parse_query
+from solea_api.routes import infos_agenda, infos_tablao
+
+ITEMS = [
+    {"titre": "Tablao A", "date": "10/03/2030", "type": "tablao"},
+    {"titre": "Stage long", "date": "01/03/2030", "fin": "12/03/2030", "type": "stage"},
+    {"titre": "Stage court", "date": "05/03/2030", "fin": "06/03/2030", "type": "stage"},
+    {"titre": "Tablao B", "date": "20/03/2030", "type": "tablao"},
+    {"titre": "Sans date", "date": "", "type": "tablao"},
+    {"titre": "Tablao C", "date": "20/03/2030", "type": "tablao"},
+]
+
+def _index() -> EventIndex:
+    return EventIndex(ITEMS, start_of=lambda e: e["date"], end_of=lambda e: e.get("fin"),
+                      type_of=lambda e: e["type"])
+
+def _titles(positions) -> list[str]:
+    return [ITEMS[p]["titre"] for p in positions]
+
+def d(s: str) -> int:
+    return parse_day(s)
+
+def test_no_bounds_sorted_by_start_then_undated():
+    assert _titles(_index().query()) == ["Stage long", "Stage court", "Tablao A", "Tablao B",
+                                         "Tablao C", "Sans date"]
+
+def test_from_and_to_are_inclusive():
+    idx = _index()
+    assert _titles(idx.query(lo=d("20/03/2030"))) == ["Tablao B", "Tablao C"]
+    assert _titles(idx.query(hi=d("05/03/2030"))) == ["Stage long", "Stage court"]
+    assert _titles(idx.query(lo=d("10/03/2030"), hi=d("10/03/2030"))) == ["Stage long", "Tablao A"]
+
+def test_multi_day_event_overlapping_lower_bound_is_kept():
+    idx = _index()
+    # commencé le 01/03, fini le 12/03 : recouvre [12/03, …] mais pas [13/03, …]
+    assert "Stage long" in _titles(idx.query(lo=d("12/03/2030")))
+    assert "Stage long" not in _titles(idx.query(lo=d("13/03/2030")))
+    # le stage court (05→06/03) est exclu dès le 07/03
+    assert "Stage court" not in _titles(idx.query(lo=d("07/03/2030")))
+
+def test_undated_events_only_without_date_bounds():
+    idx = _index()
+    assert "Sans date" not in _titles(idx.query(lo=d("01/01/2030")))
+    assert "Sans date" in _titles(idx.query(type_="tablao"))
+
+def test_type_filter_and_unknown_type():
+    idx = _index()
+    assert _titles(idx.query(type_="stage")) == ["Stage long", "Stage court"]
+    assert idx.query(type_="inconnu") == []
+    assert idx.types == ["tablao", "stage"]
+
+def test_limit_is_applied_after_sorting():
+    idx = _index()
+    assert _titles(idx.query(limit=2)) == ["Stage long", "Stage court"]
+    assert _titles(idx.query(lo=d("10/03/2030"), type_="tablao", limit=1)) == ["Tablao A"]
+    # la limite complète avec les non datés sans dépasser
+    assert len(idx.query(type_="tablao", limit=4)) == 4
+
+def test_parse_query_bounds_limit_and_next():
+    assert parse_query({}) is None
+    q = parse_query({"from": "2030-03-01", "to": "31/03/2030", "type": "Stage", "limit": "5"})
+    assert q == {"from": d("01/03/2030"), "to": d("31/03/2030"), "type": "stage", "limit": 5}
+    q = parse_query({"next": "3", "limit": "2"})
+    assert q["limit"] == 2 and q["from"] == date.today().toordinal()
+    past = (date.today() - timedelta(days=30)).isoformat()
+    assert parse_query({"next": "1", "from": past})["from"] == date.today().toordinal()
+
+@pytest.mark.parametrize("args", [{"from": "31/02/2030"}, {"to": "demain"}, {"limit": "0"},
+                                  {"limit": "abc"}, {"next": "-1"}])
+def test_parse_query_rejects_invalid_values(args):
+    with pytest.raises(ValueError):
+        parse_query(args)
+
+# =========================
+# Routes filtrées (/infos-agenda, /infos-tablao)
+# =========================
+@pytest.fixture
+def client():
+    for mod in (infos_agenda, infos_tablao):
+        utils._CACHE.pop(mod.CACHE_KEY)
+    yield create_app().test_client()
+    for mod in (infos_agenda, infos_tablao):
+        utils._CACHE.pop(mod.CACHE_KEY)
+
+@pytest.mark.parametrize("path", ["/infos-agenda", "/infos-tablao"])
+def test_invalid_query_is_a_400_without_scraping(client, monkeypatch, path):
+    mod = infos_agenda if "agenda" in path else infos_tablao
+    monkeypatch.setattr(mod, "build_payload", lambda: pytest.fail("scrape inattendu"))
+    r = client.get(f"{path}?from=31/02/2030")
+    assert r.status_code == 400 and "erreur" in r.get_json()
+
+@pytest.mark.parametrize("path", ["/infos-agenda", "/infos-tablao"])
+def test_value_error_while_building_is_a_500(client, monkeypatch, path):
+    mod = infos_agenda if "agenda" in path else infos_tablao
+
+    def build():
+        raise ValueError("page amont inattendue")
+    monkeypatch.setattr(mod, "build_payload", build)
+    r = client.get(f"{path}?type=tablao")
+    assert r.status_code == 500 and r.get_json()["erreur"] == "page amont inattendue"
+
+def test_filtered_tablao_route(client, monkeypatch):
+    items = [{"titre": t, "date": dd, "type": "tablao"} for t, dd in
+             (("Tablao A", "10/03/2030"), ("Tablao B", "20/03/2030"))]
+    monkeypatch.setattr(infos_tablao, "build_payload", lambda: {
+        "source": "test", "count": 2, "tablaos": items, "tablaos_vocal": ["a", "b"]})
+    body = client.get("/infos-tablao?from=2030-03-15").get_json()
+    assert [e["titre"] for e in body["tablaos"]] == ["Tablao B"] and body["tablaos_vocal"] == ["b"]
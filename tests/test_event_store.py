@@ -0,0 +1,69 @@
+# tests/test_event_store.py
+import pytest
+
+from solea_api import create_app
+from solea_api.events import event_store, make_event, merge_events, title_tokens, _same_title
+from solea_api.routes import infos_events
+
+def test_same_day_similar_titles_are_merged():
+    agenda = [make_event("agenda", "Tablao flamenco avec Ana Pérez et invités", "10/03/2030")]
+    tablao = [make_event("tablao", "Tablao Flamenco : Ana Perez", "10/03/2030", heure="20h30",
+                         lieu="Marseille", url="https://example.test/events/tablao")]
+    [ev] = merge_events(agenda, tablao)
+    assert ev["sources"] == ["tablao", "agenda"]
+    assert ev["heure"] == "20h30" and ev["url"].endswith("/tablao")
+
+def test_different_titles_or_days_stay_apart():
+    a = [make_event("agenda", "Stage de bulerías", "10/03/2030")]
+    b = [make_event("stage", "Cours de cajón", "10/03/2030")]
+    c = [make_event("tablao", "Stage de bulerías", "11/03/2030")]
+    assert len(merge_events(a, b, c)) == 3
+
+def test_empty_titles_never_match():
+    assert _same_title(frozenset(), frozenset()) is False
+    assert _same_title(title_tokens("Tablao"), frozenset()) is False
+    a = [make_event("agenda", "", "10/03/2030")]
+    b = [make_event("stage", "", "10/03/2030")]
+    c = [make_event("tablao", "Centre Solea", "10/03/2030")]   # que des mots vides
+    assert len(merge_events(a, b, c)) == 3
+
+def test_higher_ranked_source_wins_and_others_fill_gaps():
+    agenda = [make_event("agenda", "Stage intensif de soleá por bulerías", "05/03/2030",
+                         "06/03/2030", description="Texte de l'agenda", lieu="Salle 1")]
+    stage = [make_event("stage", "Stage intensif soleá por bulerías", "05/03/2030", "07/03/2030",
+                        type="stage")]
+    [ev] = merge_events(agenda, stage)          # ordre des listes sans importance
+    assert ev["sources"] == ["stage", "agenda"]
+    assert ev["titre"] == "Stage intensif soleá por bulerías" and ev["date_end"] == "07/03/2030"
+    assert ev["description"] == "Texte de l'agenda" and ev["lieu"] == "Salle 1"
+
+def test_merge_sorts_by_day_with_undated_last_and_leaves_inputs_untouched():
+    src = [make_event("agenda", "Sans date"), make_event("agenda", "Plus tard", "20/03/2030"),
+           make_event("agenda", "Plus tôt", "01/03/2030")]
+    out = merge_events(src, [make_event("tablao", "Plus tôt", "01/03/2030")])
+    assert [e["titre"] for e in out] == ["Plus tôt", "Plus tard", "Sans date"]
+    assert src[2]["sources"] == ["agenda"]
+
+def test_event_store_is_rebuilt_only_when_a_payload_changes():
+    calls = []
+
+    def to_events(payload):
+        calls.append(1)
+        return [make_event("agenda", payload["titre"], "10/03/2030")]
+    p1, p2 = {"titre": "Un"}, {"titre": "Deux"}
+    first = event_store([("agenda", p1, to_events), ("stage", p2, to_events)])
+    assert event_store([("agenda", p1, to_events), ("stage", p2, to_events)]) is first
+    assert len(calls) == 2
+    assert event_store([("agenda", {"titre": "Un"}, to_events), ("stage", p2, to_events)]) is not first
+
+def test_events_route_400_for_bad_params_and_500_for_build_errors(monkeypatch):
+    client = create_app().test_client()
+    monkeypatch.setattr(infos_events, "fetch_sections", lambda names, timeout: pytest.fail("scrape inattendu"))
+    assert client.get("/events?limit=abc").status_code == 400
+
+    def store_error(results, errors):
+        raise ValueError("payload inattendu")
+    monkeypatch.setattr(infos_events, "fetch_sections", lambda names, timeout: ({"agenda": ({}, {})}, {}))
+    monkeypatch.setattr(infos_events, "events_payload", store_error)
+    r = client.get("/events?limit=2")
+    assert r.status_code == 500 and r.get_json()["erreur"] == "payload inattendu"
@@ -0,0 +1,33 @@
+# tests/test_extract_lines.py
+from solea_api.utils import extract_block_lines, soup_from_html
+
+def lines(html: str) -> list[str]:
+    return extract_block_lines(soup_from_html(html))
+
+def test_nested_blocks_emit_each_text_once():
+    html = "<div><div><div><p>Stage de <b>flamenco</b></p><p>Avec Ana</p></div></div></div>"
+    assert lines(html) == ["Stage de flamenco", "Avec Ana"]
+
+def test_text_directly_in_an_outer_block_gets_its_own_line():
+    html = "<div>Avant<div>Dedans</div>Après</div>"
+    assert lines(html) == ["Avant", "Dedans", "Après"]
+
+def test_br_and_newlines_split_lines():
+    assert lines("<p>Samedi 10h<br>Dimanche 11h</p>") == ["Samedi 10h", "Dimanche 11h"]
+    assert lines("<p><span>Un</span>\n<span>Deux</span></p>") == ["Un", "Deux"]
+
+def test_inline_elements_are_joined_with_a_space():
+    assert lines("<p><span>Tarif</span><span>:</span> <em>60 €</em></p>") == ["Tarif : 60 €"]
+
+def test_table_cells_are_joined_by_a_pipe():
+    html = "<table><tr><th>Jour</th><th>Heure</th></tr><tr><td>Lundi</td><td></td><td>19h</td></tr></table>"
+    assert lines(html) == ["Jour | Heure", "Lundi | 19h"]
+
+def test_scripts_styles_comments_and_head_are_skipped():
+    html = ("<html><head><title>Titre</title><style>p{}</style></head><body>"
+            "<script>var x = 1;</script><!-- note --><p>Visible</p><noscript>JS</noscript></body></html>")
+    assert lines(html) == ["Visible"]
+
+def test_whitespace_is_normalized_and_empty_blocks_dropped():
+    html = "<div>  Beaucoup  d'espaces   </div><div>   </div><p></p>"
+    assert lines(html) == ["Beaucoup d'espaces"]
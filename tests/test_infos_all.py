@@ -0,0 +1,59 @@
+# tests/test_infos_all.py
+import gzip, json
+
+import pytest
+
+from solea_api import create_app, utils
+from solea_api.routes import infos_all
+from solea_api.routes.infos_all import SECTIONS
+
+def _payload(name: str) -> dict:
+    return {"source": name, "items": [{"titre": f"{name} {i}", "titre_vocal": "x" * 64} for i in range(20)]}
+
+@pytest.fixture
+def client(monkeypatch):
+    for name, mod in SECTIONS.items():
+        utils._CACHE.pop(mod.CACHE_KEY)
+        monkeypatch.setattr(mod, "build_payload", lambda name=name: _payload(name))
+    yield create_app().test_client()
+    for mod in SECTIONS.values():
+        utils._CACHE.pop(mod.CACHE_KEY)
+
+def test_infos_all_has_etag_304_gzip_and_meta(client):
+    r = client.get("/infos-all", headers={"Accept-Encoding": "gzip"})
+    assert r.status_code == 200 and r.headers["Content-Encoding"] == "gzip"
+    body = json.loads(gzip.decompress(r.data))
+    assert set(body["sections"]) == set(SECTIONS)
+    assert body["sections"]["cours"] == _payload("cours")
+    assert set(body["cache"]["sections"]) == set(SECTIONS) and "fresh" in body["cache"]
+
+    again = client.get("/infos-all")
+    assert again.headers["ETag"] == r.headers["ETag"]   # l'ETag ne suit que les données
+    assert client.get("/infos-all", headers={"If-None-Match": r.headers["ETag"]}).status_code == 304
+
+def test_infos_all_projects_each_section_once(client):
+    r = client.get("/infos-all?sections=cours,stage&compact=1")
+    body = r.get_json()
+    assert set(body["sections"]) == {"cours", "stage"}
+    assert body["sections"]["stage"]["items"][0] == {"titre": "stage 0"}
+    assert r.headers["ETag"] != client.get("/infos-all?sections=cours,stage").headers["ETag"]
+
+def test_infos_all_reports_failed_sections(client, monkeypatch):
+    def boom():
+        raise RuntimeError("amont indisponible")
+    monkeypatch.setattr(SECTIONS["tablao"], "build_payload", boom)
+    body = client.get("/infos-all").get_json()
+    assert "tablao" not in body["sections"] and body["erreurs"] == {"tablao": "amont indisponible"}
+
+    for mod in SECTIONS.values():
+        monkeypatch.setattr(mod, "build_payload", boom)
+        utils._CACHE.pop(mod.CACHE_KEY)
+    assert client.get("/infos-all").status_code == 503
+
+def test_body_is_reused_while_sections_are_unchanged():
+    results = {n: (_payload(n), utils.cache_meta(True)) for n in ("cours", "agenda")}
+    k1, b1, _ = infos_all.sections_payload(["cours", "agenda"], results, {})
+    k2, b2, m2 = infos_all.sections_payload(["cours", "agenda"], results, {})
+    assert k1 == k2 and b1 is b2 and set(m2["sections"]) == {"cours", "agenda"}
+    results["cours"] = (_payload("cours"), utils.cache_meta(True))
+    assert infos_all.sections_payload(["cours", "agenda"], results, {})[1] is not b1
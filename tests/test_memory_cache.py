@@ -0,0 +1,41 @@
+# tests/test_memory_cache.py
+import time
+
+from solea_api.cache import MemoryCache, entry_size
+
+def _entry(data, ttl: int = 60) -> dict:
+    return {"data": data, "ts": time.time(), "ttl": ttl, "hard_ttl": ttl * 10}
+
+def test_memory_cache_evicts_lru_over_byte_budget():
+    blob = "x" * 100
+    size = entry_size(blob)
+    c = MemoryCache(max_entries=100, max_bytes=size * 2)
+    c.set("a", _entry(blob))
+    c.set("b", _entry(blob))
+    c.get("a")                   # a devient la plus récente
+    c.set("c", _entry(blob))     # dépasse le budget : b (la moins récente) sort
+    assert "a" in c and "c" in c and "b" not in c
+    assert c.stats()["bytes"] <= size * 2
+    assert c.stats()["evictions"] == 1
+
+def test_memory_cache_keeps_an_oversized_entry_alone():
+    c = MemoryCache(max_entries=100, max_bytes=10)
+    c.set("a", _entry("petit"))
+    c.set("big", _entry("x" * 100))
+    assert c.keys() == ["big"]
+
+def test_memory_cache_evicts_over_entry_count_and_sweeps_expired():
+    c = MemoryCache(max_entries=2, max_bytes=10**6)
+    for k in ("a", "b", "c"):
+        c.set(k, _entry(k))
+    assert c.keys() == ["b", "c"]
+    c.get("b")["ts"] -= 10_000
+    assert c.sweep() == 1 and c.keys() == ["c"]
+
+def test_memory_cache_replacing_a_key_keeps_the_byte_count_exact():
+    c = MemoryCache(max_entries=10, max_bytes=10**6)
+    c.set("a", _entry("x" * 50))
+    c.set("a", _entry("x" * 10))
+    assert c.stats()["bytes"] == entry_size("x" * 10)
+    c.pop("a")
+    assert c.stats()["bytes"] == 0 and len(c) == 0
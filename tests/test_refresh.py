@@ -0,0 +1,34 @@
+# tests/test_refresh.py
+import os
+
+from solea_api import refresh
+
+def test_lock_defaults_to_a_file_in_the_temp_dir():
+    assert refresh.REFRESH_LOCK.endswith("solea-refresh.lock")
+
+def test_only_one_holder_of_the_refresh_lock(monkeypatch, tmp_path):
+    monkeypatch.setattr(refresh, "REFRESH_LOCK", str(tmp_path / "refresh.lock"))
+    monkeypatch.setitem(refresh._STATE, "lock_fd", None)
+    assert refresh._acquire_leadership() is True
+    leader_fd = refresh._STATE["lock_fd"]
+    try:
+        # un autre worker : nouveau descripteur sur le même fichier → verrou refusé
+        refresh._STATE["lock_fd"] = None
+        assert refresh._acquire_leadership() is False
+        assert refresh._STATE["lock_fd"] is None
+    finally:
+        os.close(leader_fd)
+
+def test_refresh_now_installs_payload_and_keeps_old_one_on_failure(monkeypatch):
+    from solea_api import utils
+    key = utils.cache_key("test-refresh-job")
+    payloads = iter([{"v": 1}])
+
+    def build():
+        return next(payloads)   # StopIteration au second appel : échec du scrape
+
+    monkeypatch.setitem(refresh._JOBS, "test-job", {"key": key, "build": build, "ttl": 60, "every": 30, "last": 0.0})
+    assert refresh.refresh_now("test-job") is True
+    assert utils.cache_get(key)["data"] == {"v": 1}
+    assert refresh.refresh_now("test-job") is False
+    assert utils.cache_get(key)["data"] == {"v": 1}
@@ -0,0 +1,72 @@
+# tests/test_replay.py
+import os
+
+import pytest
+import requests
+
+from solea_api import replay, utils
+from solea_api.routes import infos_cours, infos_agenda, infos_stage, infos_tablao
+
+URL = "https://www.centresolea.org/stages"
+
+@pytest.fixture
+def fixtures(tmp_path, monkeypatch):
+    monkeypatch.setattr(replay, "FIXTURES_DIR", str(tmp_path))
+    return tmp_path
+
+def _response(body: str, status: int = 200, **headers) -> requests.Response:
+    r = requests.Response()
+    r.status_code, r._content, r.encoding = status, body.encode("utf-8"), "utf-8"
+    r.headers.update(headers)
+    return r
+
+def test_fixture_name_ignores_host_and_cache_buster():
+    name = replay.fixture_name(URL)
+    assert name.startswith("stages-")
+    assert replay.fixture_name("http://127.0.0.1:8765/stages?cb=123") == name
+    assert replay.fixture_name(URL + "?page=2") != name
+
+def test_upstream_url_redirects_only_upstream_hosts(monkeypatch):
+    monkeypatch.setattr(replay, "UPSTREAM", "http://127.0.0.1:8765")
+    assert replay.upstream_url(URL + "?x=1") == "http://127.0.0.1:8765/stages?x=1"
+    assert replay.upstream_url("https://example.test/a") == "https://example.test/a"
+
+def test_record_then_replay_with_conditional_get(fixtures):
+    replay.record(URL, _response("<p>stages</p>", **{"Content-Type": "text/html"}))
+    replay.record(URL + "?absent=1", _response("erreur", status=500))   # seuls les 200 sont gardés
+    assert sorted(os.listdir(fixtures)) == [replay.fixture_name(URL) + ext for ext in (".html", ".json")]
+
+    r = replay.replay_response(URL)
+    assert r.status_code == 200 and r.text == "<p>stages</p>"
+    etag = r.headers["ETag"]   # dérivé du corps quand la page n'en avait pas
+    assert replay.replay_response(URL, {"If-None-Match": etag}).status_code == 304
+    with pytest.raises(requests.ConnectionError):
+        replay.replay_response(URL + "?absent=1")
+
+def test_http_get_reads_fixtures_in_replay_mode(fixtures, monkeypatch):
+    replay.record(URL, _response("<p>rejoué</p>", ETag='"v1"'))
+    monkeypatch.setattr(replay, "REPLAY_MODE", "replay")
+    assert utils.http_get(URL).text == "<p>rejoué</p>"
+    assert utils.http_get(URL, headers={"If-None-Match": '"v1"'}).status_code == 304
+
+def test_record_all_waits_for_every_tablao_page(fixtures, monkeypatch):
+    calls = {}
+    for mod in (infos_cours, infos_agenda, infos_stage):
+        monkeypatch.setattr(mod, "build_payload", lambda mod=mod, **kw: calls.setdefault(mod.__name__, kw))
+    monkeypatch.setattr(infos_tablao, "build_payload", lambda **kw: calls.setdefault("tablao", kw))
+    monkeypatch.setattr(replay, "REPLAY_MODE", "")
+    replay.record_all()
+    assert calls["tablao"] == {"deadline": None}
+    assert calls[infos_cours.__name__] == {} and replay.REPLAY_MODE == "record"
+
+def test_tablao_build_without_deadline_keeps_late_pages(monkeypatch):
+    seen = []
+
+    def parse_pages(urls, deadline):
+        seen.append(deadline)
+        return {}, 0
+    monkeypatch.setattr(infos_tablao, "fetch_and_build", lambda url, build: [])
+    monkeypatch.setattr(infos_tablao, "_parse_event_pages", parse_pages)
+    infos_tablao.build_payload(deadline=None)
+    infos_tablao.build_payload()
+    assert seen == [None, infos_tablao.EVENT_DEADLINE]
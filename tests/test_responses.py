@@ -0,0 +1,61 @@
+# tests/test_responses.py
+import gzip, json
+
+from solea_api.utils import encoded_json, GZIP_MIN_BYTES
+
+META = {"fresh": True, "generated_at": "2030-01-01T00:00:00", "age_seconds": 0}
+
+def _payload(n: int = GZIP_MIN_BYTES) -> dict:
+    return {"source": "test", "items": ["x" * 16] * (n // 16 + 1)}
+
+def _decoded(body: bytes, headers: dict) -> dict:
+    if headers.get("Content-Encoding") == "gzip":
+        body = gzip.decompress(body)
+    return json.loads(body)
+
+def test_gzip_when_accepted():
+    payload = _payload()
+    status, body, headers = encoded_json("t-gzip", payload, META, {}, "", "gzip, deflate")
+    assert status == 200
+    assert headers["Content-Encoding"] == "gzip"
+    assert _decoded(body, headers) == {**payload, "cache": META}
+
+def test_no_gzip_when_refused_by_q0():
+    payload = _payload()
+    for accept in ("gzip;q=0", "identity, *;q=0", "gzip;q=0, *", ""):
+        status, body, headers = encoded_json("t-q0", payload, META, {}, "", accept)
+        assert status == 200
+        assert "Content-Encoding" not in headers, accept
+        assert json.loads(body) == {**payload, "cache": META}
+
+def test_no_gzip_for_small_bodies():
+    status, body, headers = encoded_json("t-small", {"a": 1}, META, {}, "", "gzip")
+    assert "Content-Encoding" not in headers
+    assert json.loads(body) == {"a": 1, "cache": META}
+
+def test_weak_etag_shared_by_encodings_and_304():
+    payload = _payload()
+    _, _, plain = encoded_json("t-etag", payload, META, {}, "", "")
+    _, _, gz = encoded_json("t-etag", payload, META, {}, "", "gzip")
+    assert plain["ETag"].startswith('W/"')
+    assert plain["ETag"] == gz["ETag"]
+    for inm in (plain["ETag"], plain["ETag"][2:], f'"other", {plain["ETag"]}', "*"):
+        status, body, _ = encoded_json("t-etag", payload, META, {}, inm, "gzip")
+        assert (status, body) == (304, b""), inm
+    status, _, _ = encoded_json("t-etag", payload, META, {}, '"other"', "gzip")
+    assert status == 200
+
+def test_etag_follows_payload_not_meta():
+    payload = _payload()
+    _, _, h1 = encoded_json("t-meta", payload, META, {}, "", "")
+    _, _, h2 = encoded_json("t-meta", payload, {**META, "fresh": False, "age_seconds": 42}, {}, "", "")
+    _, _, h3 = encoded_json("t-meta", {**payload, "source": "autre"}, META, {}, "", "")
+    assert h1["ETag"] == h2["ETag"] != h3["ETag"]
+    assert h2["X-Cache-Fresh"] == "false" and h2["X-Cache-Age"] == "42"
+
+def test_projection_gets_its_own_etag():
+    payload = {"source": "test", "items": [{"a": 1, "a_vocal": "un"}]}
+    _, full, h_full = encoded_json("t-proj", payload, META, {}, "", "")
+    _, compact, h_compact = encoded_json("t-proj", payload, META, {"compact": "1"}, "", "")
+    assert h_full["ETag"] != h_compact["ETag"]
+    assert json.loads(compact)["items"] == [{"a": 1}]
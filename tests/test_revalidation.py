@@ -0,0 +1,85 @@
+# tests/test_revalidation.py
+import asyncio
+from datetime import date
+
+from solea_api import utils
+
+HTML = "<html><body><p>contenu</p></body></html>"
+
+def _fake_fetch_html(calls):
+    """Serveur amont minimal : 304 dès que le client envoie l'ETag, sinon 200 + ETag."""
+    def fetch_html(url, validators=None):
+        calls.append(dict(validators or {}))
+        if validators and validators.get("etag") == '"v1"':
+            return None
+        if validators is not None:
+            validators["etag"], validators["last_modified"] = '"v1"', ""
+        return HTML
+    return fetch_html
+
+def build_a(page):
+    return "A"
+
+def build_b(page):
+    return "B"
+
+def test_304_returns_result_of_same_builder(monkeypatch):
+    calls = []
+    monkeypatch.setattr(utils, "fetch_html", _fake_fetch_html(calls))
+    url = "https://example.test/revalidation-builders"
+    assert utils.fetch_and_build(url, build_a, conditional=True) == "A"
+    assert utils.fetch_and_build(url, build_b, conditional=True) == "B"
+    # revalidation : 304 pour les deux, chacun récupère son propre résultat
+    assert utils.fetch_and_build(url, build_a, conditional=True) == "A"
+    assert utils.fetch_and_build(url, build_b, conditional=True) == "B"
+    assert calls[2].get("etag") == '"v1"' and calls[3].get("etag") == '"v1"'
+
+class _Day:
+    """utils.date remplacé : today() renvoie un jour réglable."""
+    def __init__(self, d):
+        self.d = d
+
+    def install(self, monkeypatch):
+        day = self
+
+        class FakeDate(date):
+            @classmethod
+            def today(cls):
+                return day.d
+        monkeypatch.setattr(utils, "date", FakeDate)
+
+def build_dated(page):
+    return (page.soup.get_text(" ", strip=True), utils.date.today().isoformat())
+
+def test_304_reuses_result_only_on_the_day_it_was_built(monkeypatch):
+    calls, day = [], _Day(date(2030, 3, 1))
+    day.install(monkeypatch)
+    monkeypatch.setattr(utils, "fetch_html", _fake_fetch_html(calls))
+    url = "https://example.test/revalidation-day"
+
+    first = utils.fetch_and_build(url, build_dated, conditional=True)
+    assert first == ("contenu", "2030-03-01")
+    assert utils.fetch_and_build(url, build_dated, conditional=True) is first   # 304, même jour
+
+    day.d = date(2030, 3, 2)
+    again = utils.fetch_and_build(url, build_dated, conditional=True)           # 304, jour suivant
+    assert again == ("contenu", "2030-03-02")
+    # reconstruit depuis le HTML mémorisé : aucun GET non conditionnel
+    assert len(calls) == 3 and all(c.get("etag") == '"v1"' for c in calls[1:])
+    assert utils.fetch_and_build(url, build_dated, conditional=True) is again
+
+def test_async_304_rebuilds_on_a_new_day(monkeypatch):
+    from solea_api import aio
+    calls, day = [], _Day(date(2030, 3, 1))
+    day.install(monkeypatch)
+    fake = _fake_fetch_html(calls)
+
+    async def fetch_html_async(url, validators=None):
+        return fake(url, validators)
+    monkeypatch.setattr(aio, "fetch_html_async", fetch_html_async)
+    url = "https://example.test/revalidation-day-async"
+
+    assert asyncio.run(aio.fetch_and_build_async(url, build_dated, conditional=True))[1] == "2030-03-01"
+    day.d = date(2030, 3, 2)
+    assert asyncio.run(aio.fetch_and_build_async(url, build_dated, conditional=True))[1] == "2030-03-02"
+    assert len(calls) == 2 and calls[1].get("etag") == '"v1"'
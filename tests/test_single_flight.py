@@ -0,0 +1,72 @@
+# tests/test_single_flight.py
+import itertools, threading, time
+
+from solea_api import utils
+
+_KEYS = itertools.count()
+
+def _key(name: str) -> str:
+    return utils.cache_key(f"test-{name}-{next(_KEYS)}")
+
+def _concurrently(n: int, fn) -> list:
+    barrier, results = threading.Barrier(n), [None] * n
+
+    def run(i):
+        barrier.wait()
+        try:
+            results[i] = fn()
+        except Exception as e:
+            results[i] = e
+
+    threads = [threading.Thread(target=run, args=(i,)) for i in range(n)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join(5)
+    return results
+
+def test_single_flight_runs_one_build_for_concurrent_callers():
+    key, calls = _key("flight"), []
+
+    def build():
+        calls.append(1)
+        time.sleep(0.2)
+        return {"v": len(calls)}
+
+    results = _concurrently(8, lambda: utils.single_flight(key, build))
+    assert len(calls) == 1
+    assert all(r == {"v": 1} for r in results)
+
+def test_single_flight_shares_the_exception():
+    key, calls = _key("flight-err"), []
+
+    def build():
+        calls.append(1)
+        time.sleep(0.2)
+        raise RuntimeError("boom")
+
+    results = _concurrently(6, lambda: utils.single_flight(key, build))
+    assert len(calls) == 1
+    assert all(isinstance(r, RuntimeError) for r in results)
+
+def test_cold_cached_payload_builds_once():
+    key, calls = _key("cold"), []
+
+    def build():
+        calls.append(1)
+        time.sleep(0.2)
+        return {"v": 1}
+
+    results = _concurrently(8, lambda: utils.cached_payload(key, build, 60, 600)[0])
+    assert len(calls) == 1
+    assert all(r == {"v": 1} for r in results)
+
+def test_single_flight_forgets_the_key_once_done():
+    key, calls = _key("flight-again"), []
+
+    def build():
+        calls.append(1)
+        return len(calls)
+
+    assert utils.single_flight(key, build) == 1
+    assert utils.single_flight(key, build) == 2   # pas de résultat figé après la fin du vol
@@ -0,0 +1,64 @@
+# tests/test_snapshot.py
+import os, time
+
+import pytest
+
+from solea_api import snapshot, utils
+
+@pytest.fixture
+def snap(tmp_path, monkeypatch):
+    """Instantané actif dans un répertoire temporaire, clé suivie, cache et garde remis à zéro."""
+    monkeypatch.setattr(snapshot, "SNAPSHOT_ENABLED", True)
+    monkeypatch.setattr(snapshot, "SNAPSHOT_DIR", str(tmp_path))
+    monkeypatch.setattr(snapshot, "_TRACKED", set())
+    monkeypatch.setitem(utils._SNAPSHOT_STATE, "loaded", False)
+    key = utils.cache_key("test-snapshot")
+    snapshot.track(key)
+    yield key
+    utils._CACHE.pop(key)
+
+def _entry(data, age: float, ttl: int = 60, hard: int = 600) -> dict:
+    return {"data": data, "ts": time.time() - age, "ttl": ttl, "hard_ttl": hard}
+
+def test_cache_set_writes_and_load_reads_back(snap):
+    utils.cache_set(snap, {"v": 1}, 60, 600)
+    assert os.listdir(snapshot.SNAPSHOT_DIR) == [os.path.basename(snapshot._path(snap))]
+    [(key, entry)] = list(snapshot.load())
+    assert key == snap and entry["data"] == {"v": 1} and entry["ttl"] == 60
+
+def test_untracked_keys_are_not_written(snap):
+    assert snapshot.save(utils.cache_key("test-non-suivie"), _entry({"v": 1}, 0)) is False
+    assert os.listdir(snapshot.SNAPSHOT_DIR) == []
+
+def test_too_old_or_unreadable_snapshots_are_ignored(snap):
+    snapshot.save(snap, _entry({"v": 1}, age=1000))
+    assert list(snapshot.load(max_age=500)) == []
+    with open(snapshot._path(snap), "w", encoding="utf-8") as f:
+        f.write("{pas du json")
+    assert list(snapshot.load()) == []
+
+def test_load_snapshot_keeps_the_real_age(snap):
+    snapshot.save(snap, _entry({"v": 1}, age=120))
+    utils._CACHE.pop(snap)
+    assert utils.load_snapshot() == 1
+    data, meta = utils.cached_payload(snap, lambda: {"v": 2}, 60, 600)
+    assert data == {"v": 1} and meta["fresh"] is False and meta["age_seconds"] >= 120
+
+def test_expired_snapshot_is_served_only_for_the_grace_period(snap, monkeypatch):
+    monkeypatch.setattr(snapshot, "SNAPSHOT_GRACE", 30)
+    snapshot.save(snap, _entry({"v": 1}, age=1000))   # au-delà du TTL dur (600)
+    utils._CACHE.pop(snap)
+    assert utils.load_snapshot() == 1
+    entry = utils._CACHE.get(snap)
+    assert 1000 + 29 <= entry["hard_ttl"] <= 1000 + 31
+    assert utils.cache_get(snap, allow_stale=True) is not None
+    entry["ts"] -= 60                                  # la grâce est écoulée
+    assert utils.cache_get(snap, allow_stale=True) is None
+
+def test_load_snapshot_runs_once_and_never_overwrites_newer_entries(snap):
+    snapshot.save(snap, _entry({"v": "disque"}, age=120))
+    utils._CACHE.set(snap, _entry({"v": "mémoire"}, age=0))
+    assert utils.load_snapshot() == 0
+    assert utils._CACHE.get(snap)["data"] == {"v": "mémoire"}
+    utils._CACHE.pop(snap)
+    assert utils.load_snapshot() == 0                  # déjà chargé dans ce process
@@ -0,0 +1,43 @@
+# tests/test_sqlite_cache.py
+import time
+
+from solea_api.cache import SQLiteCache
+
+def _entry(data, ttl: int = 60) -> dict:
+    return {"data": data, "ts": time.time(), "ttl": ttl, "hard_ttl": ttl * 10}
+
+def test_sqlite_cache_is_shared_between_instances(tmp_path):
+    path = str(tmp_path / "cache.sqlite3")
+    w1, w2 = SQLiteCache(path), SQLiteCache(path)
+    w1.set("k", _entry({"v": 1}))
+    assert w2.get("k")["data"] == {"v": 1}
+    w2.pop("k")
+    assert w1.get("k") is None
+
+def test_sqlite_decoded_memo_follows_rows_changed_by_another_worker(tmp_path):
+    path = str(tmp_path / "cache.sqlite3")
+    w1, w2 = SQLiteCache(path), SQLiteCache(path)
+    w1.set("k", _entry({"v": 1}))
+    assert w2.get("k")["data"] == {"v": 1}
+    w1.set("k", {**_entry({"v": 2}), "ts": time.time() + 1})
+    assert w2.get("k")["data"] == {"v": 2}   # ts différent : relu, pas le mémo
+    w1.pop("k")
+    assert w2.get("k") is None
+    assert "k" not in w2._decoded             # ligne disparue : mémo libéré
+
+def test_sqlite_decoded_memo_is_bounded(tmp_path):
+    path = str(tmp_path / "cache.sqlite3")
+    writer, reader = SQLiteCache(path, max_entries=100), SQLiteCache(path, max_entries=3)
+    for i in range(10):
+        writer.set(f"k{i}", _entry({"v": i}))
+    for i in range(10):
+        assert reader.get(f"k{i}")["data"] == {"v": i}
+    assert len(reader._decoded) == 3
+    assert reader._decoded.keys() == ["k7", "k8", "k9"]
+
+def test_sqlite_cache_evicts_oldest_rows(tmp_path):
+    c = SQLiteCache(str(tmp_path / "cache.sqlite3"), max_entries=2)
+    for i, k in enumerate("abc"):
+        c.set(k, {**_entry(k), "ts": time.time() + i})
+    assert c.keys() == ["b", "c"] and "a" not in c._decoded
+    assert c.stats()["evictions"] == 1
@@ -0,0 +1,36 @@
+# tests/test_stage_text.py
+import pytest
+
+from solea_api import create_app, utils
+from solea_api.routes import infos_stage
+
+PAYLOAD = {"source": infos_stage.SRC, "count": 1, "items": [
+    {"titre": "Stage Bulerías", "date": "10/03/2030", "date_spoken": "10 mars 2030",
+     "heures": ["10h-12h"], "tarifs": ["Tarif : 60 €"], "description": ""},
+]}
+
+@pytest.fixture
+def client():
+    utils._CACHE.pop(infos_stage.CACHE_KEY)
+    yield create_app().test_client()
+    utils._CACHE.pop(infos_stage.CACHE_KEY)
+
+def test_plain_text_is_rendered_from_the_structured_parse(client, monkeypatch):
+    monkeypatch.setattr(infos_stage, "build_payload", lambda: PAYLOAD)
+    r = client.get("/infos-stage", headers={"Accept": "text/plain"})
+    assert r.status_code == 200 and r.mimetype == "text/plain"
+    assert r.get_data(as_text=True) == ("Stage Bulerías\nDates : 10 mars 2030\n"
+                                        "Horaires : 10h-12h\nTarif : 60 €")
+    assert client.get("/infos-stage").get_json()["items"] == PAYLOAD["items"]
+
+def test_errors_follow_the_negotiated_format(client, monkeypatch):
+    def build():
+        raise RuntimeError("amont indisponible")
+    monkeypatch.setattr(infos_stage, "build_payload", build)
+
+    r = client.get("/infos-stage", headers={"Accept": "text/plain"})
+    assert r.status_code == 500 and r.mimetype == "text/plain"
+    assert "amont indisponible" in r.get_data(as_text=True)
+
+    r = client.get("/infos-stage", headers={"Accept": "application/json"})
+    assert r.status_code == 500 and r.get_json()["error"] == "amont indisponible"
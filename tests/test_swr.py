@@ -0,0 +1,93 @@
+# tests/test_swr.py
+import itertools, threading, time
+
+import pytest
+
+from solea_api import utils
+
+_KEYS = itertools.count()
+
+def _key(name: str) -> str:
+    return utils.cache_key(f"test-{name}-{next(_KEYS)}")
+
+def _age(key: str, seconds: float) -> None:
+    """Vieillit l'entrée en place (cache mémoire) sans attendre."""
+    utils._CACHE.get(key)["ts"] -= seconds
+
+def _wait_for(cond, timeout: float = 2.0) -> bool:
+    deadline = time.time() + timeout
+    while time.time() < deadline:
+        if cond():
+            return True
+        time.sleep(0.01)
+    return False
+
+def test_fresh_entry_is_served_without_build():
+    key = _key("fresh")
+    utils.cache_set(key, {"v": 1}, 60, 600)
+    data, meta = utils.cached_payload(key, lambda: pytest.fail("build inattendu"), 60, 600)
+    assert data == {"v": 1} and meta["fresh"] is True
+
+def test_soft_stale_serves_old_value_and_rebuilds_once():
+    key = _key("swr")
+    utils.cache_set(key, {"v": 1}, 60, 600)
+    _age(key, 120)   # au-delà du TTL, sous le TTL dur
+    release, calls = threading.Event(), []
+
+    def build():
+        calls.append(1)
+        release.wait(2)
+        return {"v": 2}
+
+    for _ in range(5):
+        data, meta = utils.cached_payload(key, build, 60, 600)
+        assert data == {"v": 1} and meta["fresh"] is False
+    release.set()
+    assert _wait_for(lambda: utils.cache_get(key) is not None)
+    assert utils.cache_get(key)["data"] == {"v": 2}
+    assert len(calls) == 1
+
+def test_hard_expired_entry_blocks_on_build():
+    key = _key("hard")
+    utils.cache_set(key, {"v": 1}, 60, 600)
+    _age(key, 1000)   # au-delà du TTL dur
+    data, meta = utils.cached_payload(key, lambda: {"v": 2}, 60, 600)
+    assert data == {"v": 2} and meta["fresh"] is True
+
+def test_hard_expired_falls_back_to_last_value_when_build_fails():
+    key = _key("fallback")
+    utils.cache_set(key, {"v": 1}, 60, 600)
+    _age(key, 1000)
+
+    def build():
+        raise RuntimeError("amont indisponible")
+
+    data, meta = utils.cached_payload(key, build, 60, 600)
+    assert data == {"v": 1} and meta["fresh"] is False
+
+def test_miss_without_previous_value_raises():
+    def build():
+        raise RuntimeError("amont indisponible")
+
+    with pytest.raises(RuntimeError):
+        utils.cached_payload(_key("miss"), build, 60, 600)
+
+def test_stale_entry_is_replaced_by_the_background_refresh():
+    key = _key("swr-swap")
+    utils.cache_set(key, {"v": 1}, 60, 600)
+    _age(key, 120)
+    data, meta = utils.cached_payload(key, lambda: {"v": 2}, 60, 600)
+    assert data == {"v": 1} and meta["fresh"] is False
+    assert _wait_for(lambda: utils.cache_get(key) is not None)
+    data, meta = utils.cached_payload(key, lambda: pytest.fail("build inattendu"), 60, 600)
+    assert data == {"v": 2} and meta["fresh"] is True
+
+def test_hard_ttl_defaults_to_a_multiple_of_the_soft_ttl():
+    key = _key("hard-default")
+    utils.cache_set(key, {"v": 1}, 60)
+    entry = utils._CACHE.get(key)
+    assert entry["hard_ttl"] == 60 * utils.HARD_TTL_FACTOR
+    _age(key, 60 * utils.HARD_TTL_FACTOR - 5)
+    assert utils.cache_get(key, allow_stale=True) is not None
+    _age(key, 10)
+    assert utils.cache_get(key, allow_stale=True) is None
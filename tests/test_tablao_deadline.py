@@ -0,0 +1,63 @@
+# tests/test_tablao_deadline.py
+import asyncio, threading
+from datetime import date, timedelta
+
+from solea_api import snapshot, utils
+from solea_api.routes import infos_tablao
+
+DAY = (date.today() + timedelta(days=7)).strftime("%d/%m/%Y")
+URLS = ["https://example.test/events/tablao-1", "https://example.test/events/tablao-lent"]
+
+def _page(url):
+    return (f"Tablao {url[-1]}", [DAY], "20h30", "Marseille")
+
+def test_late_pages_are_counted_and_flag_the_payload(monkeypatch):
+    release = threading.Event()
+
+    def parse(url):
+        if url.endswith("lent"):
+            release.wait(2)
+        return _page(url)
+    monkeypatch.setattr(infos_tablao, "_parse_event_page", parse)
+    try:
+        parsed, missing = infos_tablao._parse_event_pages(URLS, deadline=0.2)
+    finally:
+        release.set()
+    assert list(parsed) == [URLS[0]] and missing == 1
+
+    payload = infos_tablao._payload_from_events(URLS, parsed, missing)
+    assert payload["count"] == 1
+    assert payload["partiel"] is True and payload["manquants"] == 1
+
+def test_complete_batch_is_not_flagged(monkeypatch):
+    monkeypatch.setattr(infos_tablao, "_parse_event_page", _page)
+    parsed, missing = infos_tablao._parse_event_pages(URLS, deadline=2)
+    payload = infos_tablao._payload_from_events(URLS, parsed, missing)
+    assert missing == 0 and payload["count"] == 2 and "partiel" not in payload
+
+def test_async_late_pages_are_counted(monkeypatch):
+    async def parse(url):
+        if url.endswith("lent"):
+            await asyncio.sleep(1)
+        return _page(url)
+    monkeypatch.setattr(infos_tablao, "_parse_event_page_async", parse)
+
+    async def run():
+        return await infos_tablao._parse_event_pages_async(URLS, deadline=0.1)
+    parsed, missing = asyncio.run(run())
+    assert list(parsed) == [URLS[0]] and missing == 1
+
+def test_partial_payload_gets_a_short_ttl_and_no_snapshot(monkeypatch):
+    saved = []
+    monkeypatch.setattr(snapshot, "is_tracked", lambda key: True)
+    monkeypatch.setattr(snapshot, "save", lambda key, entry: saved.append(key))
+    key = utils.cache_key("test-partiel")
+
+    utils.cache_set(key, {"count": 1, "partiel": True, "manquants": 2}, 180)
+    entry = utils._CACHE.get(key)
+    assert entry["ttl"] == utils.PARTIAL_TTL
+    assert entry["hard_ttl"] == utils.PARTIAL_TTL * utils.HARD_TTL_FACTOR
+    assert saved == []
+
+    utils.cache_set(key, {"count": 2}, 180)
+    assert utils._CACHE.get(key)["ttl"] == 180 and saved == [key]
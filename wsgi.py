@@ -1,3 +1,6 @@
 # wsgi.py
 from solea_api import create_app
+from solea_api.refresh import start_refresher
+
 app = create_app()
+start_refresher()  # garde les payloads chauds en tâche de fond (SOLEA_REFRESH=0 pour couper)